@@ -183,10 +183,11 @@ class AccountDBManager(TypedObjectManager, UserManager):
             matches = self.filter(**query)
         if not matches:
             # try alias match
-            matches = self.filter(
-                db_tags__db_tagtype__iexact="alias",
-                **{"db_tags__db_key__iexact" if exact else "db_tags__db_key__icontains": ostring},
-            )
+            if exact:
+                alias_query = {"db_tags__db_key": ostring.lower()}
+            else:
+                alias_query = {"db_tags__db_key__icontains": ostring}
+            matches = self.filter(db_tags__db_tagtype="alias", **alias_query)
         return matches
 
     def create_account(
@@ -49,6 +49,8 @@ _IN_GAME_ERRORS = settings.IN_GAME_ERRORS
 
 __all__ = ("cmdhandler", "InterruptCommand")
 _GA = object.__getattribute__
+# merged cmdsets, keyed by the versions of the cmdsets merged. Each is kept
+# alive by the cmdset handler of the caller it was last merged for.
 _CMDSET_MERGE_CACHE = WeakValueDictionary()
 
 # tracks recursive calls by each caller
@@ -357,9 +359,18 @@ def get_and_merge_cmdsets(
                     location = None
                 if location:
                     # Gather all cmdsets stored on objects in the room and
-                    # also in the caller's inventory and the location itself
+                    # also in the caller's inventory and the location itself. We
+                    # skip objects that we know have no cmdsets to offer.
+                    location_providers = location.contents_cache.get_cmdset_providers()
+                    obj_providers = obj.contents_cache.get_cmdset_providers()
                     local_objlist = yield (
-                        location.contents_get(exclude=obj) + obj.contents_get() + [location]
+                        [
+                            lobj
+                            for lobj in location.contents_get(exclude=obj)
+                            if lobj.pk in location_providers
+                        ]
+                        + [lobj for lobj in obj.contents_get() if lobj.pk in obj_providers]
+                        + [location]
                     )
                     local_objlist = [o for o in local_objlist if not o._is_deleted]
                     for lobj in local_objlist:
@@ -447,11 +458,9 @@ def get_and_merge_cmdsets(
 
         if cmdsets:
             # faster to do tuple on list than to build tuple directly
-            mergehash = tuple([id(cmdset) for cmdset in cmdsets])
-            if mergehash in _CMDSET_MERGE_CACHE:
-                # cached merge exist; use that
-                cmdset = _CMDSET_MERGE_CACHE[mergehash]
-            else:
+            mergehash = tuple([cmdset._version for cmdset in cmdsets])
+            cmdset = _CMDSET_MERGE_CACHE.get(mergehash)
+            if cmdset is None:
                 # we group and merge all same-prio cmdsets separately (this avoids
                 # order-dependent clashes in certain cases, such as
                 # when duplicates=True)
@@ -475,6 +484,8 @@ def get_and_merge_cmdsets(
                 cmdset.merged_from = cmdsets
                 # cache
                 _CMDSET_MERGE_CACHE[mergehash] = cmdset
+            # the caller keeps its latest merge alive (and nothing else does)
+            caller.cmdset.merged_cache = cmdset
         else:
             cmdset = None
         for cset in (cset for cset in local_obj_cmdsets if cset):
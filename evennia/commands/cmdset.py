@@ -27,6 +27,7 @@ Set theory.
 
 """
 
+from itertools import count
 from weakref import WeakKeyDictionary
 
 from django.utils.translation import gettext as _
@@ -35,6 +36,9 @@ from evennia.utils.utils import inherits_from, is_iter
 
 __all__ = ("CmdSet",)
 
+# unique (never reused) version stamps, renewed whenever a cmdset's commands change
+_CMDSET_VERSIONS = count(1)
+
 
 class _CmdSetMeta(type):
     """
@@ -220,6 +224,8 @@ class CmdSet(object, metaclass=_CmdSetMeta):
         # this is set only on merged sets, in cmdhandler.py, in order to
         # track, list and debug mergers correctly.
         self.merged_from = []
+        # identifies this cmdset and its current commands in the merge-cache
+        self._version = next(_CMDSET_VERSIONS)
 
         # initialize system
         self.at_cmdset_creation()
@@ -565,6 +571,7 @@ class CmdSet(object, metaclass=_CmdSetMeta):
             # extra run to make sure to avoid doublets
             commands = list(set(commands))
         self.commands = commands
+        self._version = next(_CMDSET_VERSIONS)
 
     def remove(self, cmd):
         """
@@ -594,6 +601,7 @@ class CmdSet(object, metaclass=_CmdSetMeta):
                 pass
         else:
             self.commands = [oldcmd for oldcmd in self.commands if oldcmd != cmd]
+        self._version = next(_CMDSET_VERSIONS)
 
     def get(self, cmd):
         """
@@ -675,6 +683,7 @@ class CmdSet(object, metaclass=_CmdSetMeta):
             else:
                 unique[cmd.key] = cmd
         self.commands = list(unique.values())
+        self._version = next(_CMDSET_VERSIONS)
 
     def get_all_cmd_keys_and_aliases(self, caller=None):
         """
@@ -300,6 +300,9 @@ class CmdSetHandler(object):
         # cmdsets in-code, when the game runs, this field is kept up-to-date by
         # the cmdsethandler's get_and_merge_cmdsets!
         self.current = None
+        # the last cmdset merged by the cmdhandler for this object as a caller. This
+        # keeps it alive in the cmdhandler's (weak) merge cache.
+        self.merged_cache = None
         # this holds a history of CommandSets
         self.cmdset_stack = [_EmptyCmdSet(cmdsetobj=self.obj)]
         # this tracks which mergetypes are actually in play in the stack
@@ -423,6 +426,20 @@ class CmdSetHandler(object):
                 continue
             self.mergetype_stack.append(new_current.actual_mergetype)
         self.current = new_current
+        self._invalidate_location_cache()
+
+    def _invalidate_location_cache(self):
+        """
+        Let the contents cache of our object's location know that our cmdsets
+        changed. Locations not in memory have no cache to invalidate.
+
+        """
+        location_id = getattr(self.obj, "db_location_id", None)
+        if location_id:
+            location = self.obj.get_cached_instance(location_id)
+            contents_cache = location and location.__dict__.get("contents_cache")
+            if contents_cache:
+                contents_cache.invalidate_cmdset_providers()
 
     def add(self, cmdset, emit_to_obj=None, persistent=False, default_cmdset=False, **kwargs):
         """
@@ -418,7 +418,9 @@ class CmdHelp(COMMAND_DEFAULT_CLASS):
         # get all file-based help entries, checking perms
         file_help_topics = {topic.key.lower().strip(): topic for topic in FILE_HELP_ENTRIES.all()}
         # get db-based help entries, checking perms
-        db_help_topics = {topic.key.lower().strip(): topic for topic in HelpEntry.objects.all()}
+        db_help_topics = {
+            topic.key.lower().strip(): topic for topic in HelpEntry.objects.all_cached()
+        }
         if mode == "list":
             # check the view lock for all help entries/commands and determine key
             cmd_help_topics = {
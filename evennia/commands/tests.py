@@ -988,7 +988,10 @@ class TestOptionTransferReplace(TestCase):
 # test cmdhandler functions
 
 
+import gc
 import sys
+import weakref
+from unittest.mock import patch
 
 from evennia.commands import cmdhandler
 from twisted.trial.unittest import TestCase as TwistedTestCase
@@ -1137,6 +1140,72 @@ class TestGetAndMergeCmdSets(TwistedTestCase, BaseEvenniaTest):
         deferred.addCallback(_callback)
         return deferred
 
+    def _get_merged_cmdset(self, caller):
+        "Helper to get the merged cmdset of caller (this runs synchronously)"
+        _, command_objects_list, _, _, error_to = cmdhandler.generate_cmdset_providers(caller)
+        result = []
+        cmdhandler.get_and_merge_cmdsets(
+            caller, command_objects_list, "object", "", error_to
+        ).addCallback(result.append)
+        return result[0]
+
+    def test_local_obj_cmdsets(self):
+        room_providers = self.room1.contents_cache.get_cmdset_providers()
+        self.assertNotIn(self.obj1.pk, room_providers)
+
+        self.set_cmdsets(self.obj1, self.cmdset_a)
+        room_providers = self.room1.contents_cache.get_cmdset_providers()
+        self.assertIn(self.obj1.pk, room_providers)
+
+        cmdset = self._get_merged_cmdset(self.char1)
+        self.assertIn("a", [cmd.key for cmd in cmdset.commands])
+        # unchanged cmdsets re-use the cached merge
+        self.assertIs(self._get_merged_cmdset(self.char1), cmdset)
+
+        # changing the commands of a cmdset in-place leads to a new merge
+        self.cmdset_a.remove("a")
+        cmdset = self._get_merged_cmdset(self.char1)
+        self.assertNotIn("a", [cmd.key for cmd in cmdset.commands])
+        self.assertIn("b", [cmd.key for cmd in cmdset.commands])
+
+        self.obj1.cmdset.remove("A")
+        self.assertNotIn(self.obj1.pk, self.room1.contents_cache.get_cmdset_providers())
+        cmdset = self._get_merged_cmdset(self.char1)
+        self.assertNotIn("b", [cmd.key for cmd in cmdset.commands])
+
+    def test_cmdset_providers_invalidation(self):
+        self.room1.contents_cache.get_cmdset_providers()
+        self.room2.contents_cache.get_cmdset_providers()
+        # cmdset changes elsewhere don't affect the cached providers of room1
+        self.obj2.location = self.room2
+        self.room1.contents_cache.get_cmdset_providers()
+        self.set_cmdsets(self.obj2, self.cmdset_a)
+        self.assertIsNotNone(self.room1.contents_cache._cmdset_providers)
+        self.assertIsNone(self.room2.contents_cache._cmdset_providers)
+        self.assertIn(self.obj2.pk, self.room2.contents_cache.get_cmdset_providers())
+
+    def test_merge_cache_weak(self):
+        from evennia.utils.idmapper.models import evict_cache
+
+        self.set_cmdsets(self.obj1, self.cmdset_a)
+        cmdset = self._get_merged_cmdset(self.char1)
+        self.assertIs(self.char1.cmdset.merged_cache, cmdset)
+        self.assertIn(cmdset, cmdhandler._CMDSET_MERGE_CACHE.values())
+
+        # evicting entities from the idmapper drops the merges kept alive by callers
+        evict_cache(keep=1.0)
+        self.assertIs(self.char1.cmdset.merged_cache, cmdset)
+        self.char1.get_cached_instance(self.char1.id)
+        with patch("evennia.utils.idmapper.models._is_pinned", return_value=False):
+            evict_cache(keep=0.5)
+        self.assertIsNone(self.char1.cmdset.merged_cache)
+
+        # nothing else keeps the merge alive
+        ref = weakref.ref(cmdset)
+        del cmdset
+        gc.collect()
+        self.assertIsNone(ref())
+
     def test_command_replace_different_aliases(self):
         cmdset_ee = _CmdSetEe_Ef()
         self.assertEqual(len(cmdset_ee.commands), 1)
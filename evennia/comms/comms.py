@@ -14,6 +14,7 @@ from evennia.comms.managers import ChannelManager
 from evennia.comms.models import ChannelDB
 from evennia.typeclasses.models import TypeclassBase
 from evennia.utils import create, logger
+from evennia.utils.dbserialize import get_pending_save
 from evennia.utils.utils import inherits_from, make_iter
 
 
@@ -245,10 +246,50 @@ class DefaultChannel(ChannelDB, metaclass=TypeclassBase):
     def banlist(self):
         return self.db.ban_list or []
 
+    def _get_cached_set(self, attrname):
+        """
+        Get the contents of a list-Attribute (like `mute_list`) as a set. This
+        is cached until the Attribute changes, so it can be checked for
+        every subscriber without unpickling the Attribute each time. While
+        the Attribute has batched/deferred changes not yet saved (see
+        `evennia.utils.dbserialize.batch_saves`), the cache is bypassed.
+
+        Args:
+            attrname (str): The name of the Attribute.
+
+        Returns:
+            frozenset: The entities in the Attribute.
+
+        """
+        attr = self.attributes.get(attrname, return_obj=True)
+        if attr and get_pending_save(attr) is not None:
+            # changed in-place, but db_value is not updated yet
+            return frozenset(attr.value)
+        db_value = attr.db_value if attr else None
+        cache = getattr(self, "_attribute_set_cache", None)
+        if cache is None:
+            cache = self._attribute_set_cache = {}
+        cached = cache.get(attrname)
+        if cached and cached[0] is db_value:
+            return cached[1]
+        entities = frozenset(attr.value or ()) if attr else frozenset()
+        cache[attrname] = (db_value, entities)
+        return entities
+
+    def _clear_cached_set(self, attrname):
+        """
+        Clear the set-cache of a list-Attribute after changing it.
+
+        Args:
+            attrname (str): The name of the Attribute.
+
+        """
+        getattr(self, "_attribute_set_cache", {}).pop(attrname, None)
+
     @property
     def wholist(self):
         subs = self.subscriptions.all()
-        muted = list(self.mutelist)
+        muted = self._get_cached_set("mute_list")
         listening = [ob for ob in subs if ob.is_connected and ob not in muted]
         if subs:
             # display listening subscribers in bold
@@ -278,10 +319,11 @@ class DefaultChannel(ChannelDB, metaclass=TypeclassBase):
                 muted.
 
         """
-        mutelist = self.mutelist
-        if subscriber not in mutelist:
+        if subscriber not in self._get_cached_set("mute_list"):
+            mutelist = self.mutelist
             mutelist.append(subscriber)
             self.db.mute_list = mutelist
+            self._clear_cached_set("mute_list")
             return True
         return False
 
@@ -300,9 +342,9 @@ class DefaultChannel(ChannelDB, metaclass=TypeclassBase):
                 unmuted.
 
         """
-        mutelist = self.mutelist
-        if subscriber in mutelist:
-            mutelist.remove(subscriber)
+        if subscriber in self._get_cached_set("mute_list"):
+            self.mutelist.remove(subscriber)
+            self._clear_cached_set("mute_list")
             return True
         return False
 
@@ -322,10 +364,11 @@ class DefaultChannel(ChannelDB, metaclass=TypeclassBase):
             bool: True if banning was successful, False if target was already
                 banned.
         """
-        banlist = self.banlist
-        if target not in banlist:
+        if target not in self._get_cached_set("ban_list"):
+            banlist = self.banlist
             banlist.append(target)
             self.db.ban_list = banlist
+            self._clear_cached_set("ban_list")
             return True
         return False
 
@@ -344,10 +387,10 @@ class DefaultChannel(ChannelDB, metaclass=TypeclassBase):
             bool: True if unbanning was successful, False if target was not
                 previously banned.
         """
-        banlist = list(self.banlist)
-        if target in banlist:
-            banlist = [banned for banned in banlist if banned != target]
+        if target in self._get_cached_set("ban_list"):
+            banlist = [banned for banned in self.banlist if banned != target]
             self.db.ban_list = banlist
+            self._clear_cached_set("ban_list")
             return True
         return False
 
@@ -367,7 +410,7 @@ class DefaultChannel(ChannelDB, metaclass=TypeclassBase):
 
         """
         # check access
-        if subscriber in self.banlist or not self.access(subscriber, "listen"):
+        if subscriber in self._get_cached_set("ban_list") or not self.access(subscriber, "listen"):
             return False
         # pre-join hook
         connect = self.pre_join_channel(subscriber)
@@ -641,7 +684,9 @@ class DefaultChannel(ChannelDB, metaclass=TypeclassBase):
         else:
             receivers = self.subscriptions.all()
         if not bypass_mute:
-            receivers = [receiver for receiver in receivers if receiver not in self.mutelist]
+            muted = self._get_cached_set("mute_list")
+            if muted:
+                receivers = [receiver for receiver in receivers if receiver not in muted]
 
         send_kwargs = {"senders": senders, "bypass_mute": bypass_mute, **kwargs}
 
@@ -650,24 +695,45 @@ class DefaultChannel(ChannelDB, metaclass=TypeclassBase):
         if message in (None, False):
             return
 
+        self.distribute_message_to(message, receivers, **send_kwargs)
+
+        # post-send hook
+        self.at_post_msg(message, **send_kwargs)
+
+    def distribute_message_to(self, message, receivers, **kwargs):
+        """
+        Deliver a message to many receivers. This is called by `msg` with all
+        receivers at once, after filtering them for online/mute status. It
+        can be overridden to deliver to all receivers in bulk.
+
+        Args:
+            message (str): The message to send, as returned from `at_pre_msg`.
+            receivers (iterable): The Accounts/Objects to receive the message.
+            **kwargs (any): Keywords passed on from `msg`, including `senders`
+                and `bypass_mute`.
+
+        Notes:
+            By default this calls, for each receiver,
+            `receiver.at_pre_channel_msg`, `receiver.channel_msg` and
+            `receiver.at_post_channel_msg`. An error for one receiver is
+            logged and does not stop delivery to the others.
+
+        """
         for receiver in receivers:
             # send to each individual subscriber
 
             try:
-                recv_message = receiver.at_pre_channel_msg(message, self, **send_kwargs)
+                recv_message = receiver.at_pre_channel_msg(message, self, **kwargs)
                 if recv_message in (None, False):
-                    return
+                    continue
 
-                receiver.channel_msg(recv_message, self, **send_kwargs)
+                receiver.channel_msg(recv_message, self, **kwargs)
 
-                receiver.at_post_channel_msg(recv_message, self, **send_kwargs)
+                receiver.at_post_channel_msg(recv_message, self, **kwargs)
 
             except Exception:
                 logger.log_trace(f"Error sending channel message to {receiver}.")
 
-        # post-send hook
-        self.at_post_msg(message, **send_kwargs)
-
     def at_post_msg(self, message, **kwargs):
         """
         This is called after sending to *all* valid recipients. It is normally
@@ -20,6 +20,7 @@ necessary to easily be able to delete connections on the fly).
 """
 
 from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.utils import timezone
 
@@ -184,6 +185,7 @@ class Msg(SharedMemoryModel):
 
     class Meta(object):
         "Define Django meta options"
+
         verbose_name = "Msg"
 
     @lazy_property
@@ -649,8 +651,6 @@ class SubscriptionHandler:
         subs = []
         recache_needed = False
         for obj in self.all():
-            from django.core.exceptions import ObjectDoesNotExist
-
             try:
                 if not obj.is_connected:
                     continue
@@ -712,6 +712,7 @@ class ChannelDB(TypedObject):
 
     class Meta:
         "Define Django meta options"
+
         verbose_name = "Channel"
         verbose_name_plural = "Channels"
 
@@ -1,7 +1,10 @@
+from unittest.mock import MagicMock
+
 from django.test import SimpleTestCase
 
 from evennia import DefaultChannel
 from evennia.commands.default.comms import CmdChannel
+from evennia.utils.dbserialize import batch_saves
 from evennia.utils.create import create_message
 from evennia.utils.test_resources import BaseEvenniaTest
 
@@ -86,3 +89,74 @@ class ChannelWholistTests(BaseEvenniaTest):
         expected = "Obj, |wChar|n"
         result = self.default_channel.wholist
         self.assertEqual(expected, result)
+
+
+class ChannelMuteBanTests(BaseEvenniaTest):
+    def setUp(self):
+        super().setUp()
+        self.default_channel, _ = DefaultChannel.create(
+            "teatalk", description="A place to talk about tea."
+        )
+        # the test accounts are not connected
+        self.default_channel.send_to_online_only = False
+        self.default_channel.connect(self.account)
+        self.default_channel.connect(self.account2)
+
+    def test_mute_set_follows_changes(self):
+        channel = self.default_channel
+        self.assertEqual(channel._get_cached_set("mute_list"), frozenset())
+        self.assertTrue(channel.mute(self.account))
+        self.assertFalse(channel.mute(self.account))
+        self.assertEqual(channel._get_cached_set("mute_list"), {self.account})
+        self.assertTrue(channel.unmute(self.account))
+        self.assertFalse(channel.unmute(self.account))
+        self.assertEqual(channel._get_cached_set("mute_list"), frozenset())
+        # changing the Attribute directly is also picked up
+        channel.db.mute_list = [self.account2]
+        self.assertEqual(channel._get_cached_set("mute_list"), {self.account2})
+        self.assertEqual(channel.mutelist, [self.account2])
+
+    def test_msg_skips_muted(self):
+        self.default_channel.mute(self.account2)
+        self.account.channel_msg = MagicMock()
+        self.account2.channel_msg = MagicMock()
+        self.default_channel.msg("Hello!")
+        self.account.channel_msg.assert_called_once()
+        self.account2.channel_msg.assert_not_called()
+
+    def test_msg_abort_for_one_receiver(self):
+        # aborting for one receiver should not stop delivery to the others
+        self.account.channel_msg = MagicMock()
+        self.account2.channel_msg = MagicMock()
+        self.account.at_pre_channel_msg = MagicMock(return_value=None)
+        self.account2.at_pre_channel_msg = MagicMock(return_value=None)
+        self.default_channel.msg("Hello!")
+        self.account.at_pre_channel_msg.assert_called_once()
+        self.account2.at_pre_channel_msg.assert_called_once()
+        self.account.channel_msg.assert_not_called()
+        self.account2.channel_msg.assert_not_called()
+
+    def test_ban_blocks_connect(self):
+        channel = self.default_channel
+        self.assertTrue(channel.ban(self.char1))
+        self.assertFalse(channel.ban(self.char1))
+        self.assertFalse(channel.connect(self.char1))
+        self.assertTrue(channel.unban(self.char1))
+        self.assertTrue(channel.connect(self.char1))
+
+    def test_batched_changes(self):
+        channel = self.default_channel
+        channel.db.mute_list = []
+        channel.db.ban_list = []
+        self.assertEqual(channel._get_cached_set("mute_list"), frozenset())
+        self.account.channel_msg = MagicMock()
+        self.account2.channel_msg = MagicMock()
+        with batch_saves():
+            # changed in-place, not yet saved to the Attribute
+            channel.db.mute_list.append(self.account2)
+            channel.db.ban_list.append(self.char1)
+            channel.msg("Hello!")
+            self.assertFalse(channel.connect(self.char1))
+        self.account.channel_msg.assert_called_once()
+        self.account2.channel_msg.assert_not_called()
+        self.assertEqual(channel._get_cached_set("mute_list"), {self.account2})
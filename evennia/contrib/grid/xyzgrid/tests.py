@@ -4,12 +4,17 @@ Tests for the XYZgrid system.
 
 """
 
+from glob import glob
+from os import remove
+from os.path import isfile
+from os.path import join as pathjoin
 from random import randint
 from unittest import mock
 
 from django.test import TestCase
 from parameterized import parameterized
 
+from evennia.objects.objects import DefaultRoom
 from evennia.utils.test_resources import BaseEvenniaCommandTest, BaseEvenniaTest
 
 from . import commands, xymap, xymap_legend, xyzgrid, xyzroom
@@ -403,6 +408,7 @@ class _MapTest(BaseEvenniaTest):
     def setUp(self):
         """Set up grid and map"""
         super().setUp()
+        xyzroom.XYZ_INDEX.reset()
         self.grid, err = xyzgrid.XYZGrid.create("testgrid")
         self.grid.add_maps(self.map_data)
         self.map = self.grid.get_map(self.map_data["zcoord"])
@@ -1209,6 +1215,88 @@ class TestMap11(_MapTest):
         self.assertEqual(xyzroom.XYZExit.objects.all().count(), 6)
 
 
+class TestMapPathfinding(TestCase):
+    """
+    Test on-demand pathfinding and the re-use of baked pathfinding solutions.
+
+    """
+
+    def setUp(self):
+        self.grid = TestMapStressTest._get_grid(self, 6, 6)
+        self.coords = [((0, 0), (5, 5)), ((5, 0), (0, 5)), ((2, 3), (4, 1))]
+
+    def tearDown(self):
+        for filename in glob(pathjoin(xymap._CACHE_DIR, "pathfinding_testbake_*.npy")):
+            remove(filename)
+
+    def test_on_demand(self):
+        all_pairs_map = xymap.XYMap({"map": self.grid}, Z=None)
+        all_pairs_map.parse()
+        all_pairs_map.calculate_path_matrix()
+
+        on_demand_map = xymap.XYMap({"map": self.grid}, Z=None)
+        on_demand_map.max_nodes_all_pairs_pathfinding = 10
+        on_demand_map.pathfinding_cache_size = 2
+        on_demand_map.parse()
+        on_demand_map.calculate_path_matrix()
+        self.assertIsNone(on_demand_map.pathfinding_routes)
+
+        for start, end in self.coords:
+            directions, path = on_demand_map.get_shortest_path(start, end)
+            expected_directions, expected_path = all_pairs_map.get_shortest_path(start, end)
+            self.assertEqual(directions, expected_directions)
+            self.assertEqual(len(path), len(expected_path))
+        self.assertEqual(len(on_demand_map.pathfinding_routes_cache), 2)
+
+    def test_baked_solution(self):
+        mapobj = xymap.XYMap({"map": self.grid}, Z="testbake")
+        mapobj.parse()
+        mapobj.calculate_path_matrix()
+        expected = mapobj.get_shortest_path(*self.coords[0])[0]
+
+        mapobj = xymap.XYMap({"map": self.grid}, Z="testbake")
+        mapobj.parse()
+        with mock.patch("evennia.contrib.grid.xyzgrid.xymap.dijkstra") as mock_dijkstra:
+            mapobj.calculate_path_matrix()
+            mock_dijkstra.assert_not_called()
+        self.assertEqual(mapobj.get_shortest_path(*self.coords[0])[0], expected)
+
+        # a changed map replaces the old solution
+        mapobj = xymap.XYMap({"map": TestMapStressTest._get_grid(self, 5, 5)}, Z="testbake")
+        mapobj.parse()
+        mapobj.calculate_path_matrix()
+        self.assertEqual(len(glob(pathjoin(xymap._CACHE_DIR, "pathfinding_testbake_*.npy"))), 1)
+
+    def test_baked_solution_cleanup(self):
+        other_filename = pathjoin(
+            xymap._CACHE_DIR, "pathfinding_testbake_other_" + "0" * 32 + ".npy"
+        )
+        legacy_filename = pathjoin(xymap._CACHE_DIR, "testbake.P")
+        for filename in (other_filename, legacy_filename):
+            with open(filename, "w") as fil:
+                fil.write("dummy")
+
+        mapobj = xymap.XYMap({"map": self.grid}, Z="testbake")
+        mapobj.parse()
+        mapobj.calculate_path_matrix()
+        # the solution of the map with Z 'testbake_other' is kept
+        self.assertTrue(isfile(other_filename))
+        self.assertFalse(isfile(legacy_filename))
+        self.assertEqual(len(glob(pathjoin(xymap._CACHE_DIR, "pathfinding_testbake_*.npy"))), 2)
+
+    def test_custom_linkweights(self):
+        class _HeavyNode(xymap_legend.MapNode):
+            def linkweights(self, nnodes):
+                return super().linkweights(nnodes) * 10
+
+        mapobj = xymap.XYMap({"map": self.grid}, Z=None)
+        mapobj.parse()
+        for node in mapobj.node_index_map.values():
+            node.__class__ = _HeavyNode
+        mapobj.calculate_path_matrix()
+        self.assertEqual(set(mapobj.pathfinding_graph.data), {10})
+
+
 class TestMapStressTest(TestCase):
     """
     Performance test of map patfinder and visualizer.
@@ -1367,6 +1455,156 @@ class TestXYZGrid(BaseEvenniaTest):
         self.assertEqual(xyzroom.XYZExit.objects.all().count(), 8)
 
 
+class TestXYZIndex(BaseEvenniaTest):
+    """
+    Test the in-memory coordinate index used by the XYZ managers.
+
+    """
+
+    def setUp(self):
+        super().setUp()
+        xyzroom.XYZ_INDEX.reset()
+        self.room00, _ = xyzroom.XYZRoom.create("room00", xyz=(0, 0, "map1"))
+        self.room10, _ = xyzroom.XYZRoom.create("room10", xyz=(1, 0, "map1"))
+        self.room33, _ = xyzroom.XYZRoom.create("room33", xyz=(3, 3, "map1"))
+        self.room00b, _ = xyzroom.XYZRoom.create("room00b", xyz=(0, 0, "Map2"))
+        self.exit, _ = xyzroom.XYZExit.create(
+            "east", xyz=(0, 0, "map1"), xyz_destination=(1, 0, "map1")
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        xyzroom.XYZ_INDEX.reset()
+
+    def test_filter_xyz(self):
+        XYZRoom, XYZExit = xyzroom.XYZRoom, xyzroom.XYZExit
+        self.assertEqual(list(XYZRoom.objects.filter_xyz(xyz=(0, 0, "map1"))), [self.room00])
+        self.assertEqual(list(XYZRoom.objects.filter_xyz(xyz=(0, 0, "map2"))), [self.room00b])
+        self.assertEqual(
+            set(XYZRoom.objects.filter_xyz(xyz=("*", 0, "map1"))), {self.room00, self.room10}
+        )
+        self.assertEqual(
+            set(XYZRoom.objects.filter_xyz(xyz=(0, 0, "*"))), {self.room00, self.room00b}
+        )
+        self.assertFalse(XYZRoom.objects.filter_xyz(xyz=(5, 5, "map1")).exists())
+        self.assertEqual(list(XYZExit.objects.filter_xyz(xyz=(0, 0, "map1"))), [self.exit])
+        self.assertEqual(
+            list(XYZExit.objects.filter_xyz_exit(xyz_destination=(1, 0, "map1"))), [self.exit]
+        )
+        self.assertFalse(
+            XYZExit.objects.filter_xyz_exit(
+                xyz=(0, 0, "map1"), xyz_destination=(3, 3, "map1")
+            ).exists()
+        )
+
+    def test_get_xyz_from_memory(self):
+        # the index is already built and the rooms are in memory. The first lookup
+        # loads the tags of the rooms, to verify their coordinates.
+        xyzroom.XYZRoom.objects.get_xyz(xyz=(1, 0, "map1"))
+        xyzroom.XYZExit.objects.get_xyz_exit(xyz=(0, 0, "map1"), xyz_destination=(1, 0, "map1"))
+        with self.assertNumQueries(0):
+            self.assertEqual(xyzroom.XYZRoom.objects.get_xyz(xyz=(1, 0, "map1")), self.room10)
+            self.assertEqual(
+                xyzroom.XYZExit.objects.get_xyz_exit(
+                    xyz=(0, 0, "map1"), xyz_destination=(1, 0, "map1")
+                ),
+                self.exit,
+            )
+        with self.assertRaises(xyzroom.XYZRoom.DoesNotExist):
+            xyzroom.XYZRoom.objects.get_xyz(xyz=(5, 5, "map1"))
+
+    def test_area_and_radius(self):
+        XYZRoom = xyzroom.XYZRoom
+        self.assertEqual(
+            set(XYZRoom.objects.filter_xyz_area("map1", (0, 0), (1, 1))),
+            {self.room00, self.room10},
+        )
+        self.assertEqual(
+            set(XYZRoom.objects.filter_xyz_area("map1", (-5, -5), (5, 5))),
+            {self.room00, self.room10, self.room33},
+        )
+        self.assertEqual(
+            set(XYZRoom.objects.filter_xyz_radius((0, 0, "map1"), 1)), {self.room00, self.room10}
+        )
+        self.assertEqual(
+            set(XYZRoom.objects.filter_xyz_radius((0, 0, "map1"), 4)), {self.room00, self.room10}
+        )
+        self.assertEqual(
+            set(XYZRoom.objects.filter_xyz_radius((0, 0, "map1"), 5)),
+            {self.room00, self.room10, self.room33},
+        )
+
+    def test_exact_coordinates(self):
+        # like the Tag queries, X and Y must match exactly while Z is case-insensitive
+        self.assertEqual(xyzroom.XYZRoom.objects.get_xyz(xyz=("1", 0, "MAP1")), self.room10)
+        with self.assertRaises(xyzroom.XYZRoom.DoesNotExist):
+            xyzroom.XYZRoom.objects.get_xyz(xyz=("01", 0, "map1"))
+        self.assertFalse(xyzroom.XYZRoom.objects.filter_xyz(xyz=("*", " 0", "map1")).exists())
+
+    def test_created_elsewhere(self):
+        # created without XYZRoom.create, like from another process
+        room, _ = DefaultRoom.create(
+            "room22",
+            typeclass=xyzroom.XYZRoom,
+            tags=(
+                ("2", xyzroom.MAP_X_TAG_CATEGORY),
+                ("2", xyzroom.MAP_Y_TAG_CATEGORY),
+                ("map1", xyzroom.MAP_Z_TAG_CATEGORY),
+            ),
+        )
+        self.assertEqual(set(xyzroom.XYZRoom.objects.filter_xyz_radius((2, 2, "map1"), 1)), {room})
+        self.assertEqual(xyzroom.XYZRoom.objects.get_xyz(xyz=(2, 2, "map1")), room)
+        # now indexed; this loads its tags to verify them
+        self.assertEqual(xyzroom.XYZRoom.objects.get_xyz(xyz=(2, 2, "map1")), room)
+        with self.assertNumQueries(0):
+            self.assertEqual(xyzroom.XYZRoom.objects.get_xyz(xyz=(2, 2, "map1")), room)
+
+    def test_retagged(self):
+        # moved by changing its Tags directly, bypassing the index
+        self.room10.tags.remove("1", category=xyzroom.MAP_X_TAG_CATEGORY)
+        self.room10.tags.add("2", category=xyzroom.MAP_X_TAG_CATEGORY)
+        with self.assertRaises(xyzroom.XYZRoom.DoesNotExist):
+            xyzroom.XYZRoom.objects.get_xyz(xyz=(1, 0, "map1"))
+        self.assertNotIn(self.room10.id, xyzroom.XYZ_INDEX.filter())
+        self.assertEqual(xyzroom.XYZRoom.objects.get_xyz(xyz=(2, 0, "map1")), self.room10)
+
+        self.exit.tags.remove("1", category=xyzroom.MAP_XDEST_TAG_CATEGORY)
+        with self.assertRaises(xyzroom.XYZExit.DoesNotExist):
+            xyzroom.XYZExit.objects.get_xyz_exit(xyz=(0, 0, "map1"), xyz_destination=(1, 0, "map1"))
+
+    def test_query_size(self):
+        # the queries don't list the matching ids, so they don't grow with the map
+        def _nparams():
+            return [
+                len(query.query.sql_with_params()[1])
+                for query in (
+                    xyzroom.XYZRoom.objects.filter_xyz(xyz=("*", "*", "map1")),
+                    xyzroom.XYZRoom.objects.filter_xyz_area("map1", (-10, -10), (10, 10)),
+                    xyzroom.XYZRoom.objects.filter_xyz_radius((0, 0, "map1"), 10),
+                )
+            ]
+
+        nparams = _nparams()
+        for x in range(5):
+            xyzroom.XYZRoom.create(f"room{x}5", xyz=(x, 5, "map1"))
+        self.assertEqual(_nparams(), nparams)
+
+    def test_delete_and_rebuild(self):
+        self.room10.delete()
+        self.assertFalse(xyzroom.XYZRoom.objects.filter_xyz(xyz=(1, 0, "map1")).exists())
+        # the exit to the room was deleted with it
+        self.assertFalse(xyzroom.XYZExit.objects.filter_xyz(xyz=(0, 0, "map1")).exists())
+
+        xyzroom.XYZRoom.objects.filter_xyz(xyz=(3, 3, "map1")).delete()
+        self.assertFalse(xyzroom.XYZRoom.objects.filter_xyz(xyz=(3, 3, "map1")).exists())
+
+        # rebuilding from the database gives the same result
+        indexed = xyzroom.XYZ_INDEX.filter()
+        xyzroom.XYZ_INDEX.reset()
+        self.assertEqual(xyzroom.XYZ_INDEX.filter(), indexed)
+        self.assertEqual(indexed, {self.room00.id, self.room00b.id})
+
+
 # map transitions
 class Map12aTransition(xymap_legend.TransitionMapNode):
     symbol = "T"
@@ -93,14 +93,17 @@ See `./example.py` for a full grid example.
 ----
 """
 
-import pickle
-from collections import defaultdict
-from os import mkdir
+from collections import OrderedDict, defaultdict
+from glob import escape as glob_escape
+from glob import glob
+from hashlib import md5
+from os import mkdir, remove
 from os.path import isdir, isfile
 from os.path import join as pathjoin
 
 try:
-    from numpy import zeros
+    from numpy import load as np_load
+    from numpy import save as np_save
     from scipy.sparse import csr_matrix
     from scipy.sparse.csgraph import dijkstra
 except ImportError as err:
@@ -177,6 +180,11 @@ class XYMap:
 
     mapcorner_symbol = "+"
     max_pathfinding_length = 500
+    # maps with more nodes than this are not solved for all node-pairs up front;
+    # instead the paths from each start node are solved when first needed.
+    max_nodes_all_pairs_pathfinding = 2000
+    # how many start nodes' solved paths to keep in on-demand mode
+    pathfinding_cache_size = 500
     empty_symbol = " "
     # we normally only accept one single character for the legend key
     legend_key_exceptions = "\\"
@@ -245,13 +253,16 @@ class XYMap:
         # Dijkstra algorithm variables
         self.node_index_map = None
         self.dist_matrix = None
+        self.pathfinding_graph = None
         self.pathfinding_routes = None
+        # solved rows of start-node predecessors, when solving on demand
+        self.pathfinding_routes_cache = OrderedDict()
 
         self.pathfinder_baked_filename = None
         if Z:
             if not isdir(_CACHE_DIR):
                 mkdir(_CACHE_DIR)
-            self.pathfinder_baked_filename = pathjoin(_CACHE_DIR, f"{Z}.P")
+            self.pathfinder_baked_filename = pathjoin(_CACHE_DIR, f"pathfinding_{Z}")
 
         # load data and parse it
         self.reload()
@@ -605,50 +616,111 @@ class XYMap:
         Args:
             force (bool, optional): If the cache should always be rebuilt.
 
-        """
-        if not force and self.pathfinder_baked_filename and isfile(self.pathfinder_baked_filename):
-            # check if the solution for this grid was already solved previously.
+        Notes:
+            Maps with more than `.max_nodes_all_pairs_pathfinding` nodes are not solved here;
+            instead `get_shortest_path` solves (and caches) the paths from each start node
+            as needed.
 
-            mapstr, dist_matrix, pathfinding_routes = "", None, None
-            with open(self.pathfinder_baked_filename, "rb") as fil:
+        """
+        # build a sparse matrix representing the map graph, directly from the node links
+        nnodes = len(self.node_index_map)
+        rows, cols, weights = [], [], []
+        for inode, node in self.node_index_map.items():
+            if type(node).linkweights is not xymap_legend.MapNode.linkweights:
+                # respect a custom linkweights hook (this builds a full row)
+                link_graph = node.linkweights(nnodes)
+                links = (
+                    (inextnode, link_graph[inextnode]) for inextnode in link_graph.nonzero()[0]
+                )
+            else:
+                links = sorted(node.weights.items())
+            for inextnode, weight in links:
+                if weight:  # a zero weight means there is no link
+                    rows.append(inode)
+                    cols.append(int(inextnode))
+                    weights.append(weight)
+        self.pathfinding_graph = csr_matrix((weights, (rows, cols)), shape=(nnodes, nnodes))
+        self.pathfinding_routes_cache = OrderedDict()
+
+        if nnodes > self.max_nodes_all_pairs_pathfinding:
+            # too big to solve for all pairs - get_shortest_path will solve on demand
+            self.dist_matrix = self.pathfinding_routes = None
+            return
+
+        baked_filename = None
+        if self.pathfinder_baked_filename:
+            # the baked solution is only valid for this exact graph
+            graph = self.pathfinding_graph
+            maphash = md5(str(self.max_pathfinding_length).encode())
+            for array in (graph.indptr, graph.indices, graph.data):
+                maphash.update(array.tobytes())
+            baked_filename = f"{self.pathfinder_baked_filename}_{maphash.hexdigest()}.npy"
+
+            if not force and isfile(baked_filename):
+                # this grid was already solved previously - memory-map the stored solution
                 try:
-                    mapstr, dist_matrix, pathfinding_routes = pickle.load(fil)
+                    self.pathfinding_routes = np_load(baked_filename, mmap_mode="r")
+                    self.dist_matrix = None
+                    return
                 except Exception:
                     logger.log_trace()
-            if (
-                mapstr == self.mapstring
-                and dist_matrix is not None
-                and pathfinding_routes is not None
-            ):
-                # this is important - it means the map hasn't changed so
-                # we can re-use the stored data!
-                self.dist_matrix = dist_matrix
-                self.pathfinding_routes = pathfinding_routes
-
-        # build a matrix representing the map graph, with 0s as impassable areas
-
-        nnodes = len(self.node_index_map)
-        pathfinding_graph = zeros((nnodes, nnodes))
-        for inode, node in self.node_index_map.items():
-            pathfinding_graph[inode, :] = node.linkweights(nnodes)
-
-        # create a sparse matrix to represent link relationships from each node
-        pathfinding_matrix = csr_matrix(pathfinding_graph)
 
         # solve using Dijkstra's algorithm
         self.dist_matrix, self.pathfinding_routes = dijkstra(
-            pathfinding_matrix,
+            self.pathfinding_graph,
             directed=True,
             return_predecessors=True,
             limit=self.max_pathfinding_length,
         )
 
-        if self.pathfinder_baked_filename:
-            # try to cache the results
-            with open(self.pathfinder_baked_filename, "wb") as fil:
-                pickle.dump(
-                    (self.mapstring, self.dist_matrix, self.pathfinding_routes), fil, protocol=4
-                )
+        if baked_filename:
+            # try to cache the results, removing outdated solutions for this map (but not
+            # those of other maps whose Z starts with ours) and any old-style pickled solution
+            outdated = glob(
+                f"{glob_escape(self.pathfinder_baked_filename)}_{'[0-9a-f]' * 32}.npy"
+            ) + glob(glob_escape(pathjoin(_CACHE_DIR, f"{self.Z}.P")))
+            for old_filename in outdated:
+                try:
+                    remove(old_filename)
+                except OSError:
+                    logger.log_trace()
+            np_save(baked_filename, self.pathfinding_routes)
+
+    def _get_pathfinding_routes(self, istartnode):
+        """
+        Get the shortest-path predecessors of all nodes, as seen from a start node.
+
+        Args:
+            istartnode (int): The node-index of the start node.
+
+        Returns:
+            array: An array where index `i` is the index of the node to come from to
+            reach node `i` along the shortest path, or -9999 if there is no such node.
+
+        """
+        if self.pathfinding_graph is None:
+            self.calculate_path_matrix()
+
+        if self.pathfinding_routes is not None:
+            return self.pathfinding_routes[istartnode]
+
+        # solving on demand
+        cache = self.pathfinding_routes_cache
+        routes = cache.get(istartnode)
+        if routes is None:
+            _, routes = dijkstra(
+                self.pathfinding_graph,
+                directed=True,
+                indices=istartnode,
+                return_predecessors=True,
+                limit=self.max_pathfinding_length,
+            )
+            cache[istartnode] = routes
+            if len(cache) > self.pathfinding_cache_size:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(istartnode)
+        return routes
 
     def spawn_nodes(self, xy=("*", "*")):
         """
@@ -797,20 +869,17 @@ class XYMap:
                 f"{endnode}. They must both be MapNodes (not Links)"
             )
 
-        if self.pathfinding_routes is None:
-            self.calculate_path_matrix()
-
-        pathfinding_routes = self.pathfinding_routes
+        pathfinding_routes = self._get_pathfinding_routes(istartnode)
         node_index_map = self.node_index_map
 
         path = [endnode]
         directions = []
 
-        while pathfinding_routes[istartnode, inextnode] != -9999:
+        while pathfinding_routes[inextnode] != -9999:
             # the -9999 is set by algorithm for unreachable nodes or if trying
             # to go a node we are already at (the start node in this case since
             # we are working backwards).
-            inextnode = pathfinding_routes[istartnode, inextnode]
+            inextnode = pathfinding_routes[inextnode]
             nextnode = node_index_map[inextnode]
             shortest_route_to = nextnode.shortest_route_to_node[path[-1].node_index]
 
@@ -241,6 +241,9 @@ class MapNode:
         Notes:
             A node can at most have 8 connections (the cardinal directions).
 
+            The pathfinder reads `.weights` directly unless this method is overridden,
+            in which case it is called for every node when building the graph.
+
         """
         link_graph = zeros(nnodes)
         for node_index, weight in self.weights.items():
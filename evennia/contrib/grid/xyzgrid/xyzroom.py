@@ -7,10 +7,15 @@ used as stand-alone XYZ-coordinate-aware rooms.
 
 """
 
+from collections import defaultdict
+
 from django.conf import settings
-from django.db.models import Q
+from django.db.models import F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Cast
+from django.db.models.signals import post_delete
 
 from evennia.objects.manager import ObjectManager
+from evennia.objects.models import ObjectDB
 from evennia.objects.objects import DefaultExit, DefaultRoom
 
 # name of all tag categories. Note that the Z-coordinate is
@@ -27,6 +32,215 @@ GET_XYZGRID = None
 
 CLIENT_DEFAULT_WIDTH = settings.CLIENT_DEFAULT_WIDTH
 
+_WILDCARD = "*"
+
+# integer coordinate Tags, for area/radius queries
+_INT_COORD_REGEX = r"^-?[0-9]+$"
+
+
+def _to_tag_key(coord):
+    """
+    Convert a coordinate to the string it is stored as in its Tag.
+
+    """
+    return str(coord).strip().lower()
+
+
+def _int_coord_tag(category):
+    """
+    Query expression for the coordinate Tag of an object as an `int`, or `NULL` if the
+    coordinate is not an integer. Used with `.alias()` to compare coordinates in the database.
+
+    Args:
+        category (str): The Tag category of the coordinate.
+
+    """
+    return Cast(
+        Subquery(
+            ObjectDB.db_tags.through.objects.filter(
+                objectdb_id=OuterRef("pk"),
+                tag__db_category=category,
+                tag__db_key__regex=_INT_COORD_REGEX,
+            ).values("tag__db_key")[:1]
+        ),
+        IntegerField(),
+    )
+
+
+class XYZIndex:
+    """
+    In-memory index of the XYZ coordinates of all coordinate-aware objects, mapping each
+    (X, Y, Z) position to the ids of the objects there. Exits are also indexed on the
+    coordinate of their destination. This lets `get_xyz` and `get_xyz_exit` find objects
+    already in memory without querying the database.
+
+    The index is built from the coordinate Tags the first time it's used. It's then kept
+    current as `XYZRoom`/`XYZExit` objects are created (with their `.create` methods) and
+    deleted in this process, and learns objects created elsewhere (such as by
+    `evennia xyzgrid spawn`) as they are found in the database. If changing coordinate Tags
+    manually, call `.reset()` to have it rebuilt.
+
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the index, to be rebuilt from the database on next use.
+
+        """
+        # {z: {(x, y): {id, ...}}}, using the coordinates as stored in the Tags
+        self._xyz = None
+        self._xyz_destination = None
+        # {id: (xyz, xyz_destination)}
+        self._locations = None
+
+    def _build(self):
+        """
+        Build the index from the coordinate Tags in the database.
+
+        """
+        self._xyz = defaultdict(lambda: defaultdict(set))
+        self._xyz_destination = defaultdict(lambda: defaultdict(set))
+        self._locations = {}
+
+        coords = defaultdict(dict)
+        for obj_id, category, key in ObjectDB.db_tags.through.objects.filter(
+            tag__db_category__in=(
+                MAP_X_TAG_CATEGORY,
+                MAP_Y_TAG_CATEGORY,
+                MAP_Z_TAG_CATEGORY,
+                MAP_XDEST_TAG_CATEGORY,
+                MAP_YDEST_TAG_CATEGORY,
+                MAP_ZDEST_TAG_CATEGORY,
+            )
+        ).values_list("objectdb_id", "tag__db_category", "tag__db_key"):
+            coords[obj_id][category] = key
+
+        for obj_id, obj_coords in coords.items():
+            xyz = tuple(
+                obj_coords.get(category)
+                for category in (MAP_X_TAG_CATEGORY, MAP_Y_TAG_CATEGORY, MAP_Z_TAG_CATEGORY)
+            )
+            xyz_destination = tuple(
+                obj_coords.get(category)
+                for category in (
+                    MAP_XDEST_TAG_CATEGORY,
+                    MAP_YDEST_TAG_CATEGORY,
+                    MAP_ZDEST_TAG_CATEGORY,
+                )
+            )
+            self._add(
+                obj_id,
+                xyz if None not in xyz else None,
+                xyz_destination if None not in xyz_destination else None,
+            )
+
+    def _add(self, obj_id, xyz, xyz_destination):
+        if xyz:
+            xyz = tuple(_to_tag_key(coord) for coord in xyz)
+            self._xyz[xyz[2]][xyz[:2]].add(obj_id)
+        if xyz_destination:
+            xyz_destination = tuple(_to_tag_key(coord) for coord in xyz_destination)
+            self._xyz_destination[xyz_destination[2]][xyz_destination[:2]].add(obj_id)
+        self._locations[obj_id] = (xyz, xyz_destination)
+
+    def add(self, obj_id, xyz=None, xyz_destination=None):
+        """
+        Add a new object to the index, or update the coordinates of one already in it.
+
+        Args:
+            obj_id (int): The id of the object.
+            xyz (tuple, optional): The (X, Y, Z) coordinate of the object, if any.
+            xyz_destination (tuple, optional): The (X, Y, Z) coordinate an exit leads to, if any.
+
+        """
+        if self._locations is None:
+            # not built yet; the object will be picked up from the database
+            return
+        self.remove(obj_id)
+        self._add(obj_id, xyz, xyz_destination)
+
+    def remove(self, obj_id):
+        """
+        Remove a (deleted) object from the index.
+
+        Args:
+            obj_id (int): The id of the object.
+
+        """
+        if self._locations is None:
+            return
+        xyz, xyz_destination = self._locations.pop(obj_id, (None, None))
+        for index, coord in ((self._xyz, xyz), (self._xyz_destination, xyz_destination)):
+            if coord:
+                x, y, z = coord
+                ids = index[z][(x, y)]
+                ids.discard(obj_id)
+                if not ids:
+                    del index[z][(x, y)]
+                    if not index[z]:
+                        del index[z]
+
+    @staticmethod
+    def _match(index, xyz):
+        """
+        Find ids in an index matching a coordinate, where any element may be a wildcard. Like
+        the Tag queries of the managers, X and Y must match exactly, while Z is
+        case-insensitive.
+
+        """
+        x, y, z = xyz
+        x = x if x == _WILDCARD else str(x)
+        y = y if y == _WILDCARD else str(y)
+        zmaps = index.values() if z == _WILDCARD else [index.get(str(z).lower(), {})]
+
+        matches = set()
+        for zmap in zmaps:
+            if x != _WILDCARD and y != _WILDCARD:
+                matches.update(zmap.get((x, y), ()))
+            else:
+                for (ix, iy), ids in zmap.items():
+                    if (x == _WILDCARD or ix == x) and (y == _WILDCARD or iy == y):
+                        matches.update(ids)
+        return matches
+
+    def filter(self, xyz=None, xyz_destination=None):
+        """
+        Get the ids of all indexed objects at a coordinate.
+
+        Args:
+            xyz (tuple, optional): The (X, Y, Z) coordinate, where `'*'` acts as a wildcard.
+            xyz_destination (tuple, optional): If given, only include exits leading to this
+                (X, Y, Z) coordinate (which may also use wildcards).
+
+        Returns:
+            set: The ids of all matching objects. If no coordinates are given (or they are
+            all wildcards), this is all indexed objects.
+
+        """
+        if self._locations is None:
+            self._build()
+        wildcards = (_WILDCARD, _WILDCARD, _WILDCARD)
+        matches = None
+        for index, coord in ((self._xyz, xyz), (self._xyz_destination, xyz_destination)):
+            if coord is not None and tuple(coord) != wildcards:
+                found = self._match(index, coord)
+                matches = found if matches is None else matches & found
+        return set(self._locations) if matches is None else matches
+
+
+XYZ_INDEX = XYZIndex()
+
+
+def _remove_from_index(sender, instance=None, **kwargs):
+    if isinstance(instance, ObjectDB):
+        XYZ_INDEX.remove(instance.id)
+
+
+post_delete.connect(_remove_from_index, dispatch_uid="evennia.contrib.xyzgrid.xyzindex")
+
 
 class XYZManager(ObjectManager):
     """
@@ -75,6 +289,109 @@ class XYZManager(ObjectManager):
             )
         )
 
+    def _get_cached_match(self, ids, xyz, xyz_destination=None):
+        """
+        Get the single object among `ids`, without querying the database, if all of
+        them are already in memory and their coordinate Tags still match.
+
+        Args:
+            ids (set): Object ids, as found by the `XYZ_INDEX`.
+            xyz (tuple): The (X, Y, Z) coordinate searched for.
+            xyz_destination (tuple, optional): The (X, Y, Z) destination searched for (exits).
+
+        Returns:
+            Object or None: The only object among `ids` of this manager's typeclass family,
+            or `None` if this could not be determined without a database query.
+
+        Notes:
+            An object whose Tags no longer match (it was moved or re-tagged) is dropped
+            from the index. Objects created by other processes are not in the index until
+            they have been found in the database.
+
+        """
+        coords = [
+            (MAP_X_TAG_CATEGORY, str(xyz[0]), False),
+            (MAP_Y_TAG_CATEGORY, str(xyz[1]), False),
+            (MAP_Z_TAG_CATEGORY, str(xyz[2]).lower(), True),
+        ]
+        if xyz_destination:
+            coords += [
+                (MAP_XDEST_TAG_CATEGORY, str(xyz_destination[0]), False),
+                (MAP_YDEST_TAG_CATEGORY, str(xyz_destination[1]), False),
+                (MAP_ZDEST_TAG_CATEGORY, str(xyz_destination[2]).lower(), True),
+            ]
+
+        matches = []
+        for obj_id in ids:
+            obj = self.model.get_cached_instance(obj_id)
+            if obj is None:
+                return None
+            if not isinstance(obj, self.model):
+                continue
+            # this loads all tags of the object at once, so it's only queried once
+            tags = set(obj.tags.all(return_key_and_category=True))
+            for category, coord, iexact in coords:
+                if not any(
+                    tagcategory == category and (tagkey.lower() if iexact else tagkey) == coord
+                    for tagkey, tagcategory in tags
+                ):
+                    # the index is outdated for this object
+                    XYZ_INDEX.remove(obj_id)
+                    return None
+            matches.append(obj)
+        return matches[0] if len(matches) == 1 else None
+
+    def filter_xyz_area(self, z, xy_min, xy_max, **kwargs):
+        """
+        Filter queryset to all objects within a rectangle of a map. This will also find
+        children of XYZRooms in the area.
+
+        Args:
+            z (int or str): The Z coordinate (name of the map in the XYZgrid contrib).
+            xy_min (tuple): The (X, Y) lower-left corner of the area (inclusive).
+            xy_max (tuple): The (X, Y) upper-right corner of the area (inclusive).
+            **kwargs: All other kwargs are passed on to the query.
+
+        Returns:
+            django.db.queryset.Queryset: A queryset that can be combined
+            with further filtering. Only objects with integer X, Y coordinates are included.
+
+        """
+        (xmin, ymin), (xmax, ymax) = xy_min, xy_max
+        return (
+            self.filter_xyz(xyz=(_WILDCARD, _WILDCARD, z), **kwargs)
+            .alias(
+                xyz_x=_int_coord_tag(MAP_X_TAG_CATEGORY), xyz_y=_int_coord_tag(MAP_Y_TAG_CATEGORY)
+            )
+            .filter(xyz_x__gte=xmin, xyz_x__lte=xmax, xyz_y__gte=ymin, xyz_y__lte=ymax)
+        )
+
+    def filter_xyz_radius(self, xyz, radius, **kwargs):
+        """
+        Filter queryset to all objects within a distance of a coordinate on its map. This
+        will also find children of XYZRooms within the radius.
+
+        Args:
+            xyz (tuple): The (X, Y, Z) coordinate at the center.
+            radius (int or float): The max distance from the center (inclusive).
+            **kwargs: All other kwargs are passed on to the query.
+
+        Returns:
+            django.db.queryset.Queryset: A queryset that can be combined
+            with further filtering. Only objects with integer X, Y coordinates are included.
+
+        """
+        x0, y0, z = xyz
+        x0, y0 = int(x0), int(y0)
+        dx, dy = F("xyz_x") - x0, F("xyz_y") - y0
+        return (
+            self.filter_xyz_area(
+                z, (x0 - radius, y0 - radius), (x0 + radius, y0 + radius), **kwargs
+            )
+            .alias(xyz_distance2=dx * dx + dy * dy)
+            .filter(xyz_distance2__lte=radius * radius)
+        )
+
     def get_xyz(self, xyz=(0, 0, "map"), **kwargs):
         """
         Always return a single matched entity directly. This accepts no `*`-wildcards.
@@ -95,11 +412,20 @@ class XYZManager(ObjectManager):
                 possible with a unique combination of x,y,z).
 
         """
-        # filter by tags, then figure out of we got a single match or not
+        if not kwargs:
+            # avoid the database if the room is already in memory
+            match = self._get_cached_match(XYZ_INDEX.filter(xyz=xyz), xyz)
+            if match:
+                return match
+
+        # filter by coordinate, then figure out of we got a single match or not
         query = self.filter_xyz(xyz=xyz, **kwargs)
         ncount = query.count()
         if ncount == 1:
-            return query.first()
+            match = query.first()
+            # the room may have been created outside of this process
+            XYZ_INDEX.add(match.id, xyz=match.xyz)
+            return match
 
         # error - mimic default get() behavior but with a little more info
         x, y, z = xyz
@@ -214,6 +540,14 @@ class XYZExitManager(XYZManager):
         """
         x, y, z = xyz
         xdest, ydest, zdest = xyz_destination
+        if not kwargs:
+            # avoid the database if the exit is already in memory
+            match = self._get_cached_match(
+                XYZ_INDEX.filter(xyz=xyz, xyz_destination=xyz_destination), xyz, xyz_destination
+            )
+            if match:
+                return match
+
         # mimic get_family
         paths = [self.model.path] + [
             "%s.%s" % (cls.__module__, cls.__name__) for cls in self._get_subclasses(self.model)
@@ -221,7 +555,7 @@ class XYZExitManager(XYZManager):
         kwargs["db_typeclass_path__in"] = paths
 
         try:
-            return (
+            match = (
                 self.filter(db_tags__db_key__iexact=str(z), db_tags__db_category=MAP_Z_TAG_CATEGORY)
                 .filter(db_tags__db_key=str(x), db_tags__db_category=MAP_X_TAG_CATEGORY)
                 .filter(db_tags__db_key=str(y), db_tags__db_category=MAP_Y_TAG_CATEGORY)
@@ -239,6 +573,9 @@ class XYZExitManager(XYZManager):
             raise self.model.DoesNotExist(
                 f"{self.model.__name__} matching query {inp} does not exist."
             )
+        # the exit may have been created outside of this process
+        XYZ_INDEX.add(match.id, xyz=match.xyz, xyz_destination=match.xyz_destination)
+        return match
 
 
 class XYZRoom(DefaultRoom):
@@ -365,7 +702,10 @@ class XYZRoom(DefaultRoom):
             (str(z), MAP_Z_TAG_CATEGORY),
         )
 
-        return DefaultRoom.create(key, account=account, tags=tags, typeclass=cls, **kwargs)
+        room, errors = DefaultRoom.create(key, account=account, tags=tags, typeclass=cls, **kwargs)
+        if room:
+            XYZ_INDEX.add(room.id, xyz=(x, y, z))
+        return room, errors
 
     def get_display_name(self, looker, **kwargs):
         """
@@ -597,6 +937,7 @@ class XYZExit(DefaultExit):
 
         """
         tags = []
+        source_xyz = dest_xyz = None
         if location:
             source = location
         else:
@@ -606,6 +947,7 @@ class XYZExit(DefaultExit):
                 return None, ["XYExit.create need either `xyz=(X,Y,Z)` coordinate or a `location`."]
             else:
                 source = XYZRoom.objects.get_xyz(xyz=(x, y, z))
+                source_xyz = (x, y, z)
                 tags.extend(
                     (
                         (str(x), MAP_X_TAG_CATEGORY),
@@ -625,6 +967,7 @@ class XYZExit(DefaultExit):
                 ]
             else:
                 dest = XYZRoom.objects.get_xyz(xyz=(xdest, ydest, zdest))
+                dest_xyz = (xdest, ydest, zdest)
                 tags.extend(
                     (
                         (str(xdest), MAP_XDEST_TAG_CATEGORY),
@@ -633,6 +976,9 @@ class XYZExit(DefaultExit):
                     )
                 )
 
-        return DefaultExit.create(
+        exi, errors = DefaultExit.create(
             key, source, dest, account=account, tags=tags, typeclass=cls, **kwargs
         )
+        if exi:
+            XYZ_INDEX.add(exi.id, xyz=source_xyz, xyz_destination=dest_xyz)
+        return exi, errors
@@ -21,6 +21,7 @@ class HelpEntryManager(TypedObjectManager):
     (or QuerySets) directly.
 
     Evennia-specific:
+    all_cached
     find_topicmatch
     find_apropos
     find_topicsuggestions
@@ -30,6 +31,25 @@ class HelpEntryManager(TypedObjectManager):
 
     """
 
+    def all_cached(self):
+        """
+        Get all help entries. Which entries exist is remembered until a help entry
+        is saved or deleted, so as long as the entries stay in the idmapper cache,
+        repeated calls don't query the database.
+
+        Returns:
+            list: All HelpEntries.
+
+        """
+        pks = self.model._all_entry_pks
+        if pks is not None:
+            entries = [self.model.get_cached_instance(pk) for pk in pks]
+            if None not in entries:
+                return entries
+        entries = list(self.all())
+        self.model._all_entry_pks = [entry.pk for entry in entries]
+        return entries
+
     def find_topicmatch(self, topicstr, exact=False):
         """
         Searches for matching topics or aliases based on player's
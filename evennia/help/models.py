@@ -12,6 +12,7 @@ game world, policy info, rules and similar.
 
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models.signals import post_delete, post_save
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.text import slugify
@@ -87,6 +88,8 @@ class HelpEntry(SharedMemoryModel):
     # Database manager
     objects = HelpEntryManager()
     _is_deleted = False
+    # pks of all entries, as cached by HelpEntryManager.all_cached
+    _all_entry_pks = None
 
     # lazy-loaded handlers
 
@@ -314,3 +317,15 @@ class HelpEntry(SharedMemoryModel):
 
     # Used by Django Sites/Admin
     get_absolute_url = web_get_detail_url
+
+
+def _invalidate_all_entries(sender, **kwargs):
+    """
+    Drop the entries remembered by `HelpEntry.objects.all_cached`.
+
+    """
+    HelpEntry._all_entry_pks = None
+
+
+post_save.connect(_invalidate_all_entries, sender=HelpEntry)
+post_delete.connect(_invalidate_all_entries, sender=HelpEntry)
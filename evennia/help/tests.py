@@ -8,7 +8,9 @@ from unittest import mock
 
 from evennia.help import filehelp
 from evennia.help import utils as help_utils
-from evennia.utils.test_resources import TestCase
+from evennia.help.models import HelpEntry
+from evennia.utils import create
+from evennia.utils.test_resources import EvenniaTestCase, TestCase
 from evennia.utils.utils import dedent
 
 
@@ -140,3 +142,70 @@ class TestFileHelp(TestCase):
             self.assertEqual(HELP_ENTRY_DICTS[inum].get("aliases", []), helpentry.aliases)
             self.assertEqual(HELP_ENTRY_DICTS[inum]["category"].lower(), helpentry.help_category)
             self.assertEqual(HELP_ENTRY_DICTS[inum]["text"], helpentry.entrytext)
+
+
+class TestHelpSearchIndex(TestCase):
+    """
+    Test the caching of the Lunr search index
+
+    """
+
+    def setUp(self):
+        super().setUp()
+        help_utils._SEARCH_INDEX_CACHE.clear()
+        self.entries = [
+            filehelp.FileHelpEntry("evennia", ["ev"], "general", "The Evennia help text", ""),
+            filehelp.FileHelpEntry("building", ["build"], "building", "How to build", ""),
+        ]
+
+    def tearDown(self):
+        super().tearDown()
+        help_utils._SEARCH_INDEX_CACHE.clear()
+
+    def test_index_reuse(self):
+        matches, suggestions = help_utils.help_search_with_index("evennia", self.entries)
+        self.assertEqual(matches, [self.entries[0]])
+        self.assertEqual(suggestions, ["evennia"])
+
+        with mock.patch.object(help_utils, "_LUNR", wraps=help_utils._LUNR) as mock_lunr:
+            # same entries - the index is re-used
+            matches, _ = help_utils.help_search_with_index("build", self.entries)
+            self.assertEqual(matches, [self.entries[1]])
+            mock_lunr.assert_not_called()
+
+            # changed entries require a new index
+            self.entries[1].aliases = ["construct"]
+            matches, _ = help_utils.help_search_with_index("construct", self.entries)
+            self.assertEqual(matches, [self.entries[1]])
+            mock_lunr.assert_called_once()
+
+    @mock.patch("evennia.help.utils._SEARCH_INDEX_CACHE_SIZE", 1)
+    def test_cache_size(self):
+        help_utils.help_search_with_index("evennia", self.entries)
+        help_utils.help_search_with_index("evennia", self.entries[:1])
+        self.assertEqual(len(help_utils._SEARCH_INDEX_CACHE), 1)
+
+
+class TestHelpEntryManager(EvenniaTestCase):
+    """
+    Test the in-memory list of all help entries
+
+    """
+
+    def test_all_cached(self):
+        entry1 = create.create_help_entry("topic1", "text1")
+        self.assertEqual(HelpEntry.objects.all_cached(), [entry1])
+        with self.assertNumQueries(0):
+            self.assertEqual(HelpEntry.objects.all_cached(), [entry1])
+
+        # new and deleted entries are picked up
+        entry2 = create.create_help_entry("topic2", "text2")
+        self.assertEqual(HelpEntry.objects.all_cached(), [entry1, entry2])
+        entry1.delete()
+        self.assertEqual(HelpEntry.objects.all_cached(), [entry2])
+
+        # entries flushed from the idmapper are loaded anew
+        HelpEntry.flush_instance_cache(force=True)
+        entries = HelpEntry.objects.all_cached()
+        self.assertEqual([entry.key for entry in entries], ["topic2"])
+        self.assertIsNot(entries[0], entry2)
@@ -7,6 +7,7 @@ This is used primarily by the default `help` command.
 """
 
 import re
+from collections import OrderedDict
 
 from django.conf import settings
 
@@ -30,6 +31,10 @@ _LUNR_EXCEPTION = None
 _LUNR_GET_BUILDER = None
 _LUNR_BUILDER_PIPELINE = None
 
+# built search indexes, keyed on the fields and contents they were built from
+_SEARCH_INDEX_CACHE = OrderedDict()
+_SEARCH_INDEX_CACHE_SIZE = settings.HELP_SEARCH_INDEX_CACHE_SIZE
+
 _RE_HELP_SUBTOPICS_START = re.compile(r"^\s*?#\s*?subtopics\s*?$", re.I + re.M)
 _RE_HELP_SUBTOPIC_SPLIT = re.compile(r"^\s*?(\#{2,6}\s*?\w+?[a-z0-9 \-\?!,\.]*?)$", re.M + re.I)
 _RE_HELP_SUBTOPIC_PARSE = re.compile(r"^(?P<nesting>\#{2,6})\s*?(?P<name>.*?)$", re.I + re.M)
@@ -56,6 +61,10 @@ def help_search_with_index(query, candidate_entries, suggestion_maxnum=5, fields
         tuple: A tuple (matches, suggestions), each a list, where the `suggestion_maxnum` limits
             how many suggestions are included.
 
+    Notes:
+        Built indexes are cached (see `settings.HELP_SEARCH_INDEX_CACHE_SIZE`) and re-used
+        as long as the searched fields of the candidates are the same.
+
     """
     global _LUNR, _LUNR_EXCEPTION, _LUNR_BUILDER_PIPELINE, _LUNR_GET_BUILDER
     if not _LUNR:
@@ -94,12 +103,31 @@ def help_search_with_index(query, candidate_entries, suggestion_maxnum=5, fields
             {"field_name": "tags", "boost": 5},
         ]
 
-    # build the search index
-    builder = _LUNR_GET_BUILDER()
-    builder.pipeline.reset()
-    builder.pipeline.add(*_LUNR_BUILDER_PIPELINE)
+    # the index only depends on the key and the searched fields of each entry
+    field_names = [field["field_name"] for field in fields]
+    cache_key = (
+        tuple((field["field_name"], field.get("boost", 1)) for field in fields),
+        tuple(tuple(entry[name] for name in ["key"] + field_names) for entry in indx),
+    )
+    try:
+        search_index = _SEARCH_INDEX_CACHE.get(cache_key)
+    except TypeError:
+        # unhashable field values; we can't cache this index
+        cache_key, search_index = None, None
+    if search_index:
+        _SEARCH_INDEX_CACHE.move_to_end(cache_key)
+    else:
+        # build the search index
+        builder = _LUNR_GET_BUILDER()
+        builder.pipeline.reset()
+        builder.pipeline.add(*_LUNR_BUILDER_PIPELINE)
+
+        search_index = _LUNR(ref="key", fields=fields, documents=indx, builder=builder)
 
-    search_index = _LUNR(ref="key", fields=fields, documents=indx, builder=builder)
+        if cache_key and _SEARCH_INDEX_CACHE_SIZE > 0:
+            _SEARCH_INDEX_CACHE[cache_key] = search_index
+            if len(_SEARCH_INDEX_CACHE) > _SEARCH_INDEX_CACHE_SIZE:
+                _SEARCH_INDEX_CACHE.popitem(last=False)
 
     try:
         matches = search_index.search(query)[:suggestion_maxnum]
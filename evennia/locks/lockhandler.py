@@ -105,6 +105,7 @@ to any other identifier you can use.
 """
 
 import re
+from collections import OrderedDict
 
 from django.conf import settings
 from django.utils.translation import gettext as _
@@ -149,6 +150,8 @@ def _cache_lockfuncs():
     _LOCKFUNCS = {}
     for modulepath in settings.LOCK_FUNC_MODULES:
         _LOCKFUNCS.update(utils.callables_from_module(modulepath))
+    # parsed locks reference the old lock functions
+    _LOCKSTRING_CACHE.clear()
 
 
 #
@@ -160,6 +163,111 @@ _RE_FUNCS = re.compile(r"\w+\([^)]*\)")
 _RE_SEPS = re.compile(r"(?<=[ )])AND(?=\s)|(?<=[ )])OR(?=\s)|(?<=[ )])NOT(?=\s)")
 _RE_OK = re.compile(r"%s|and|or|not")
 
+# parsed lockstrings, shared by all LockHandlers using the same lock_storage
+_LOCKSTRING_CACHE = OrderedDict()
+_LOCKSTRING_CACHE_SIZE = 2000
+
+
+#
+# Lock compilation
+#
+
+
+def _compile_lockfunc(func, args, kwargs):
+    """
+    Make a lock-function call with its arguments into an evaluator.
+
+    """
+
+    def _lockfunc(accessing_obj, accessed_obj, **extra):
+        return bool(func(accessing_obj, accessed_obj, *args, **extra, **kwargs))
+
+    return _lockfunc
+
+
+def _compile_and(evaluators):
+    def _and(accessing_obj, accessed_obj, **extra):
+        for evaluator in evaluators:
+            if not evaluator(accessing_obj, accessed_obj, **extra):
+                return False
+        return True
+
+    return _and
+
+
+def _compile_or(evaluators):
+    def _or(accessing_obj, accessed_obj, **extra):
+        for evaluator in evaluators:
+            if evaluator(accessing_obj, accessed_obj, **extra):
+                return True
+        return False
+
+    return _or
+
+
+def _compile_not(evaluator):
+    def _not(accessing_obj, accessed_obj, **extra):
+        return not evaluator(accessing_obj, accessed_obj, **extra)
+
+    return _not
+
+
+def _compile_evalstring(evalstring, lock_funcs):
+    """
+    Compile a lock's evalstring into a tree of evaluators, with the same
+    precedence as Python (`not` before `and` before `or`). Evaluation stops
+    as soon as the result is known, so later lock functions may never be called.
+
+    Args:
+        evalstring (str): Space-separated `%s`, `and`, `or` and `not`, where
+            each `%s` is a lock-function call.
+        lock_funcs (tuple): A `(func, args, kwargs)` tuple for each `%s`.
+
+    Returns:
+        callable: Called as `evaluator(accessing_obj, accessed_obj, **extra)`,
+            where `extra` are keywords passed on to all lock functions.
+
+    Raises:
+        SyntaxError: If the evalstring is malformed.
+
+    """
+    tokens = evalstring.split()
+    lock_funcs = iter(lock_funcs)
+    position = 0
+
+    def _factor():
+        nonlocal position
+        if position >= len(tokens):
+            raise SyntaxError(f"Unexpected end of lock '{evalstring}'.")
+        token = tokens[position]
+        position += 1
+        if token == "not":
+            return _compile_not(_factor())
+        if token == "%s":
+            try:
+                return _compile_lockfunc(*next(lock_funcs))
+            except StopIteration:
+                raise SyntaxError(f"Too few lock functions for '{evalstring}'.")
+        raise SyntaxError(f"Unexpected '{token}' in lock '{evalstring}'.")
+
+    def _operation(operator, operand, combine):
+        nonlocal position
+        evaluators = [operand()]
+        while position < len(tokens) and tokens[position] == operator:
+            position += 1
+            evaluators.append(operand())
+        return evaluators[0] if len(evaluators) == 1 else combine(evaluators)
+
+    def _term():
+        return _operation("and", _factor, _compile_and)
+
+    evaluator = _operation("or", _term, _compile_or)
+    if position < len(tokens):
+        raise SyntaxError(f"Unexpected '{tokens[position]}' in lock '{evalstring}'.")
+    if next(lock_funcs, None) is not None:
+        raise SyntaxError(f"Too many lock functions for '{evalstring}'.")
+    return evaluator
+
 
 #
 #
@@ -196,6 +304,19 @@ class LockHandler:
     def __str__(self):
         return ";".join(self.locks[key][2] for key in sorted(self.locks))
 
+    def __getstate__(self):
+        # the compiled evaluators can't be pickled, so we rebuild them on unpickling
+        state = self.__dict__.copy()
+        state["locks"] = {access_type: lock[:3] for access_type, lock in self.locks.items()}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.locks = {
+            access_type: (evalstring, lock_funcs, raw, _compile_evalstring(evalstring, lock_funcs))
+            for access_type, (evalstring, lock_funcs, raw) in self.locks.items()
+        }
+
     def _log_error(self, message):
         "Try to log errors back to object"
         raise LockException(message)
@@ -211,6 +332,43 @@ class LockHandler:
         Args:
             storage_locksring (str): The lockstring to parse.
 
+        Returns:
+            dict: The parsed locks `{access_type: (evalstring, lock_funcs,
+                raw_lockstring, evaluator)}`. This is a copy, safe to modify.
+
+        """
+        return dict(self._get_parsed_locks(storage_lockstring))
+
+    def _get_parsed_locks(self, storage_lockstring):
+        """
+        Get the parsed locks of a lockstring from the cache shared by all
+        LockHandlers, parsing and caching it if needed. The returned dict is
+        shared and must not be modified.
+
+        Args:
+            storage_locksring (str): The lockstring to parse.
+
+        """
+        locks = _LOCKSTRING_CACHE.get(storage_lockstring)
+        if locks is None:
+            locks = self._compile_lockstring(storage_lockstring)
+            _LOCKSTRING_CACHE[storage_lockstring] = locks
+            if len(_LOCKSTRING_CACHE) > _LOCKSTRING_CACHE_SIZE:
+                _LOCKSTRING_CACHE.popitem(last=False)
+        else:
+            _LOCKSTRING_CACHE.move_to_end(storage_lockstring)
+        return locks
+
+    def _compile_lockstring(self, storage_lockstring):
+        """
+        Parse a lockstring and compile each of its locks into an evaluator.
+
+        Args:
+            storage_locksring (str): The lockstring to parse.
+
+        Raises:
+            LockException: If the lockstring has errors.
+
         """
         locks = {}
         if not storage_lockstring:
@@ -257,10 +415,10 @@ class LockHandler:
             if len(lock_funcs) < nfuncs:
                 continue
             try:
-                # purge the eval string of any superfluous items, then test it
+                # purge the eval string of any superfluous items, then compile it
                 evalstring = " ".join(_RE_OK.findall(evalstring))
-                eval(evalstring % tuple(True for func in funclist), {}, {})
-            except Exception:
+                evaluator = _compile_evalstring(evalstring, lock_funcs)
+            except SyntaxError:
                 elist.append(
                     _("Lock: definition '{lock_string}' has syntax errors.").format(
                         lock_string=raw_lockstring
@@ -280,7 +438,7 @@ class LockHandler:
                         )
                     )
                 )
-            locks[access_type] = (evalstring, tuple(lock_funcs), raw_lockstring)
+            locks[access_type] = (evalstring, tuple(lock_funcs), raw_lockstring, evaluator)
         if wlist and WARNING_LOG:
             # a warning text was set, it's not an error, so only report
             logger.log_file("\n".join(wlist), WARNING_LOG)
@@ -446,7 +604,7 @@ class LockHandler:
         """
 
         if access_type:
-            return self.locks.get(access_type, ["", "", ""])[2]
+            return self.locks.get(access_type, ["", "", "", None])[2]
         return str(self)
 
     def all(self):
@@ -539,15 +697,14 @@ class LockHandler:
 
             Parsing the lockstring, we (during cache) extract the valid
             lock functions and store their function objects in the right
-            order along with their args/kwargs. These are now executed in
-            sequence, creating a list of True/False values. This is put
-            into the evalstring, which is a string of AND/OR/NOT entries
-            separated by placeholders where each function result should
-            go. We just put those results in and evaluate the string to
-            get a final, combined True/False value for the lockstring.
+            order along with their args/kwargs. The AND/OR/NOT entries
+            between them are compiled into a tree of evaluators, which
+            calls the lock functions in order until the combined
+            True/False value for the lockstring is known. So in
+            `perm(Admin) OR attr(foo)`, `attr` is not called for Admins.
 
             The important bit with this solution is that the full
-            lockstring is never blindly evaluated, and thus there (should
+            lockstring is never evaluated as code, and thus there (should
             be) no way to sneak in malign code in it. Only "safe" lock
             functions (as defined by your settings) are executed.
 
@@ -575,23 +732,16 @@ class LockHandler:
                 return True
 
         # no superuser or bypass -> normal lock operation
-        if access_type in self.locks:
+        lock = self.locks.get(access_type)
+        if lock:
             # we have a lock, test it.
-            evalstring, func_tup, raw_string = self.locks[access_type]
-            # execute all lock funcs in the correct order, producing a tuple of True/False results.
-            true_false = tuple(
-                bool(tup[0](accessing_obj, self.obj, *tup[1], access_type=access_type, **tup[2]))
-                for tup in func_tup
-            )
-            # the True/False tuple goes into evalstring, which combines them
-            # with AND/OR/NOT in order to get the final result.
-            return eval(evalstring % true_false)
+            return lock[3](accessing_obj, self.obj, access_type=access_type)
         else:
             return default
 
     def _eval_access_type(self, accessing_obj, locks, access_type):
         """
-        Helper method for evaluating the access type using eval().
+        Helper method for evaluating the access type.
 
         Args:
             accessing_obj (object): Object seeking access.
@@ -599,9 +749,7 @@ class LockHandler:
             access_type (str): An access-type key to evaluate.
 
         """
-        evalstring, func_tup, raw_string = locks[access_type]
-        true_false = tuple(tup[0](accessing_obj, self.obj, *tup[1], **tup[2]) for tup in func_tup)
-        return eval(evalstring % true_false)
+        return locks[access_type][3](accessing_obj, self.obj)
 
     def check_lockstring(
         self, accessing_obj, lockstring, no_superuser_bypass=False, default=False, access_type=None
@@ -651,7 +799,7 @@ class LockHandler:
         if ":" not in lockstring:
             lockstring = "%s:%s" % ("_dummy", lockstring)
 
-        locks = self._parse_lockstring(lockstring)
+        locks = self._get_parsed_locks(lockstring)
 
         if access_type:
             if access_type not in locks:
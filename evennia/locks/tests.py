@@ -7,6 +7,8 @@ the stability and integrity of the codebase during updates.
 This module tests the lock functionality of Evennia.
 
 """
+import pickle
+
 from evennia.utils.test_resources import BaseEvenniaTest
 
 try:
@@ -16,7 +18,7 @@ except ImportError:
     from django.test import TestCase, override_settings
 
 from evennia import settings_default
-from evennia.locks import lockfuncs
+from evennia.locks import lockfuncs, lockhandler
 from evennia.utils.create import create_object
 
 # ------------------------------------------------------------
@@ -42,6 +44,70 @@ class TestLockCheck(BaseEvenniaTest):
         self.assertEqual(True, self.obj1.locks.check(self.obj2, "not_exist", default=True))
 
 
+class TestLockCompilation(TestCase):
+    """
+    Test compiling lock definitions into evaluators.
+
+    """
+
+    def test_precedence(self):
+        """Compiled locks give the same result as evaluating them as Python"""
+        evalstrings = (
+            "%s",
+            "not %s",
+            "not not %s",
+            "%s and %s or %s",
+            "%s or %s and %s",
+            "not %s and %s or not %s",
+            "%s or not %s and not %s or %s",
+        )
+        for evalstring in evalstrings:
+            nfuncs = evalstring.count("%s")
+            for bits in range(2**nfuncs):
+                results = tuple(bool(bits & (1 << ifunc)) for ifunc in range(nfuncs))
+                lock_funcs = [(lambda *args, res=res, **kwargs: res, [], {}) for res in results]
+                evaluator = lockhandler._compile_evalstring(evalstring, lock_funcs)
+                self.assertEqual(evaluator(None, None), eval(evalstring % results), evalstring)
+
+    def test_short_circuit(self):
+        calls = []
+
+        def _lockfunc(accessing_obj, accessed_obj, *args, **kwargs):
+            calls.append(args[0])
+            return args[0] == "pass"
+
+        evaluator = lockhandler._compile_evalstring(
+            "%s or %s and %s",
+            [(_lockfunc, ["pass"], {}), (_lockfunc, ["fail"], {}), (_lockfunc, ["pass"], {})],
+        )
+        self.assertTrue(evaluator(None, None))
+        self.assertEqual(calls, ["pass"])
+
+    def test_syntax_errors(self):
+        lock_func = (lambda *args, **kwargs: True, [], {})
+        for evalstring, nfuncs in (("%s %s", 2), ("%s and", 1), ("or %s", 1), ("%s", 2)):
+            with self.assertRaises(SyntaxError):
+                lockhandler._compile_evalstring(evalstring, [lock_func] * nfuncs)
+
+    def test_shared_cache(self):
+        obj1, obj2 = lockhandler._ObjDummy(), lockhandler._ObjDummy()
+        obj1.lock_storage = obj2.lock_storage = "get:all();edit:perm(Admin) or false()"
+        handler1, handler2 = lockhandler.LockHandler(obj1), lockhandler.LockHandler(obj2)
+        self.assertIs(handler1.locks["get"], handler2.locks["get"])
+        self.assertTrue(handler1.check(None, "get"))
+        # the parsed locks are shared, but not the dict holding them
+        handler1.remove("get")
+        self.assertTrue(handler2.check(None, "get"))
+        self.assertFalse(lockhandler.check_lockstring(None, "dummy:none() or not all()"))
+
+    def test_pickle(self):
+        obj = lockhandler._ObjDummy()
+        obj.lock_storage = "get:all();edit:perm(Admin) or false()"
+        handler = pickle.loads(pickle.dumps(lockhandler.LockHandler(obj)))
+        self.assertEqual(str(handler), "edit:perm(Admin) or false();get:all()")
+        self.assertTrue(handler.check(None, "get"))
+
+
 class TestLockfuncs(BaseEvenniaTest):
     def setUp(self):
         super().setUp()
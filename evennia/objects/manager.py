@@ -25,6 +25,7 @@ _GA = object.__getattribute__
 _ATTR = None
 
 _MULTIMATCH_REGEX = re.compile(settings.SEARCH_MULTIMATCH_REGEX, re.I + re.U)
+_TYPECLASS_AGGRESSIVE_CACHE = settings.TYPECLASS_AGGRESSIVE_CACHE
 
 # Try to use a custom way to parse id-tagged multimatches.
 
@@ -299,6 +300,13 @@ class ObjectDBManager(TypedObjectManager):
             # Exit early.
             return self.none()
 
+        if candidates is not None and _TYPECLASS_AGGRESSIVE_CACHE:
+            # the candidates and their aliases are already in memory, so
+            # matching them here avoids a (joined) database query.
+            return self._match_candidates_by_key_or_alias(
+                ostring, candidates, exact=exact, typeclasses=typeclasses
+            )
+
         # build query objects
         candidates_id = [_GA(obj, "id") for obj in make_iter(candidates) if obj]
         cand_restriction = candidates is not None and Q(pk__in=candidates_id) or Q()
@@ -312,8 +320,7 @@ class ObjectDBManager(TypedObjectManager):
                         & type_restriction
                         & (
                             Q(db_key__iexact=ostring)
-                            | Q(db_tags__db_key__iexact=ostring)
-                            & Q(db_tags__db_tagtype__iexact="alias")
+                            | Q(db_tags__db_key=ostring.lower()) & Q(db_tags__db_tagtype="alias")
                         )
                     )
                 )
@@ -322,7 +329,7 @@ class ObjectDBManager(TypedObjectManager):
             )
 
         # convert search term to partial-match regex
-        search_regex = r".* ".join(re.escape(word) for word in ostring.split()) + r'.*'
+        search_regex = r".* ".join(re.escape(word) for word in ostring.split()) + r".*"
 
         # do the fuzzy search and return whatever it matches
         return (
@@ -332,8 +339,7 @@ class ObjectDBManager(TypedObjectManager):
                     & type_restriction
                     & (
                         Q(db_key__iregex=search_regex)
-                        | Q(db_tags__db_key__iregex=search_regex)
-                        & Q(db_tags__db_tagtype__iexact="alias")
+                        | Q(db_tags__db_key__iregex=search_regex) & Q(db_tags__db_tagtype="alias")
                     )
                 )
             )
@@ -341,6 +347,77 @@ class ObjectDBManager(TypedObjectManager):
             .order_by("id")
         )
 
+    def _match_candidates_by_key_or_alias(self, ostring, candidates, exact=True, typeclasses=None):
+        """
+        In-memory version of `get_objs_with_key_or_alias`, matching against
+        the cached keys and aliases of the given candidates.
+
+        Args:
+            ostring (str): A search criterion.
+            candidates (list): Only match among these candidates.
+            exact (bool, optional): Require case-insensitive exact match. If `False`,
+                use the same partial-match regex as the database search.
+            typeclasses (list, optional): Only match objects with these typeclass paths.
+
+        Returns:
+            Queryset: The matches, ordered by id.
+
+        """
+        if exact:
+            ostring = ostring.lower()
+
+            def _match(value):
+                return value.lower() == ostring
+
+        else:
+            search_regex = re.compile(
+                r".* ".join(re.escape(word) for word in ostring.split()) + r".*", re.I
+            )
+
+            def _match(value):
+                return bool(search_regex.search(value))
+
+        typeclasses = set(make_iter(typeclasses)) if typeclasses else None
+        if isinstance(self, TypeclassManager):
+            # mimic the typeclass-restriction of the TypeclassManager's filter
+            typeclasses = (typeclasses or {self.model.path}) & {self.model.path}
+
+        matches = {}
+        for obj in make_iter(candidates):
+            if not obj or obj.id is None or obj.id in matches:
+                # skip deleted objects
+                continue
+            if typeclasses is not None and obj.db_typeclass_path not in typeclasses:
+                continue
+            if _match(obj.db_key) or any(_match(alias) for alias in obj.aliases.all()):
+                matches[obj.id] = obj
+        return self._queryset_from_objs(matches.values())
+
+    def _queryset_from_objs(self, objs):
+        """
+        Wrap already-loaded objects in a QuerySet without re-querying them.
+
+        Args:
+            objs (iterable): Objects to include.
+
+        Returns:
+            Queryset: A queryset for the objects, ordered by id. Its result cache is
+                pre-populated, so iterating, indexing, `len()`, `.count()` and `.exists()`
+                will not hit the database. Methods returning a new queryset (`.filter()`,
+                `.exclude()`, `|` etc) will query the database, matching the same ids.
+
+        Notes:
+            Django has no public API for pre-populating a queryset, so this sets the
+            (private) result cache directly. This is covered by the object-manager tests.
+
+        """
+        objs = sorted((obj for obj in objs if obj.id is not None), key=lambda obj: obj.id)
+        if not objs:
+            return self.none()
+        queryset = self.filter(id__in=[obj.id for obj in objs]).order_by("id")
+        queryset._result_cache = objs
+        return queryset
+
     # main search methods and helper functions
 
     def search_object(
@@ -481,8 +558,7 @@ class ObjectDBManager(TypedObjectManager):
         if match_number is not None:
             if 0 <= match_number < len(matches):
                 # limit to one match (we still want a queryset back)
-                # NOTE: still haven't found a way to avoid a second lookup
-                matches = self.filter(id=matches[match_number].id)
+                matches = self._queryset_from_objs([matches[match_number]])
             else:
                 # a number was given outside of range. This means a no-match.
                 matches = self.none()
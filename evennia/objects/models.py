@@ -23,8 +23,33 @@ from django.db import models
 from evennia.objects.manager import ObjectDBManager
 from evennia.typeclasses.models import TypedObject
 from evennia.utils import logger
+from evennia.utils.idmapper.models import mark_used
 from evennia.utils.utils import dbref, lazy_property, make_iter
 
+# delayed import
+_AT_CMDSET_GET = None
+
+
+def _provides_cmdsets(obj):
+    """
+    Check if an object may provide cmdsets to the command handler, either
+    by having cmdsets or by overriding the `at_cmdset_get` hook (which
+    may add cmdsets on the fly).
+
+    """
+    global _AT_CMDSET_GET
+    if not _AT_CMDSET_GET:
+        from evennia.objects.objects import DefaultObject
+
+        _AT_CMDSET_GET = DefaultObject.at_cmdset_get
+    if getattr(obj.__class__, "at_cmdset_get", _AT_CMDSET_GET) is not _AT_CMDSET_GET:
+        return True
+    cmdsethandler = getattr(obj, "cmdset", None)
+    return bool(
+        cmdsethandler
+        and any(cmdset.key != "_EMPTY_CMDSET" for cmdset in cmdsethandler.cmdset_stack)
+    )
+
 
 class ContentsHandler:
     """
@@ -51,6 +76,7 @@ class ContentsHandler:
         self._pkcache = {}
         self._idcache = obj.__class__.__instance_cache__
         self._typecache = defaultdict(dict)
+        self._cmdset_providers = None
         self.init()
 
     def load(self):
@@ -69,6 +95,7 @@ class ContentsHandler:
         """
         objects = self.load()
         self._typecache = defaultdict(dict)
+        self._cmdset_providers = None
         self._pkcache = {obj.pk: True for obj in objects}
         for obj in objects:
             try:
@@ -103,17 +130,20 @@ class ContentsHandler:
         if exclude:
             pks = set(pks) - {excl.pk for excl in make_iter(exclude)}
         try:
-            return [self._idcache[pk] for pk in pks]
+            contents = [self._idcache[pk] for pk in pks]
         except KeyError:
             # this can happen if the idmapper cache was cleared for an object
             # in the contents cache. If so we need to re-initialize and try again.
             self.init()
             try:
-                return [self._idcache[pk] for pk in pks]
+                contents = [self._idcache[pk] for pk in pks]
             except KeyError:
                 # this means an actual failure of caching. Return real database match.
                 logger.log_err("contents cache failed for %s." % self.obj.key)
                 return self.load()
+        # keep the contents of locations in use from being evicted from the idmapper
+        mark_used(contents + [self.obj])
+        return contents
 
     def add(self, obj):
         """
@@ -124,6 +154,7 @@ class ContentsHandler:
 
         """
         self._pkcache[obj.pk] = obj
+        self._cmdset_providers = None
         for ctype in obj._content_types:
             self._typecache[ctype][obj.pk] = True
 
@@ -136,10 +167,36 @@ class ContentsHandler:
 
         """
         self._pkcache.pop(obj.pk, None)
+        self._cmdset_providers = None
         for ctype in obj._content_types:
             if obj.pk in self._typecache[ctype]:
                 self._typecache[ctype].pop(obj.pk, None)
 
+    def get_cmdset_providers(self):
+        """
+        Get the contents that may provide cmdsets to the command handler. This
+        is cached until the contents, or the cmdsets of any of the contents, change.
+
+        Returns:
+            set: The pks of all contents having cmdsets or a custom
+                `at_cmdset_get` hook.
+
+        """
+        if self._cmdset_providers is None:
+            # checking may itself initialize (and so invalidate) cmdset handlers,
+            # so we store the result after the fact
+            pks = {obj.pk for obj in self.get() if _provides_cmdsets(obj)}
+            self._cmdset_providers = pks
+        return self._cmdset_providers
+
+    def invalidate_cmdset_providers(self):
+        """
+        Make the next call to `get_cmdset_providers` re-check the contents. This is
+        called by the cmdset handlers of the contents whenever their cmdsets change.
+
+        """
+        self._cmdset_providers = None
+
     def clear(self):
         """
         Clear the contents cache and re-initialize
@@ -48,6 +48,9 @@ _SESSID_MAX = 16 if _MULTISESSION_MODE in (1, 3) else 1
 
 # init the actor-stance funcparser for msg_contents
 _MSG_CONTENTS_PARSER = funcparser.FuncParser(funcparser.ACTOR_STANCE_CALLABLES)
+# callables whose output may differ between calls with the same input; messages
+# using these must be rendered separately for every receiver
+_MSG_CONTENTS_UNGROUPABLE = {"random", "randint", "choice"}
 
 
 class ObjectSessionHandler:
@@ -1136,7 +1139,7 @@ class DefaultObject(ObjectDB, metaclass=TypeclassBase):
             exclude = make_iter(exclude)
             contents = [obj for obj in contents if obj not in exclude]
 
-        for receiver in contents:
+        def _render(receiver, display_names):
             # actor-stance replacements
             outmessage = _MSG_CONTENTS_PARSER.parse(
                 inmessage,
@@ -1146,18 +1149,42 @@ class DefaultObject(ObjectDB, metaclass=TypeclassBase):
                 receiver=receiver,
                 mapping=mapping,
             )
-
             # director-stance replacements
-            outmessage = outmessage.format_map(
-                {
-                    key: (
-                        obj.get_display_name(looker=receiver)
-                        if hasattr(obj, "get_display_name")
-                        else str(obj)
-                    )
-                    for key, obj in mapping.items()
-                }
-            )
+            return outmessage.format_map(display_names)
+
+        # The actor-stance callables only differ between receivers based on if the
+        # receiver is one of the mapped objects, and on the display-names of those
+        # objects. All other receivers seeing the same names get the same message,
+        # so we only need to render it once per such group.
+        funcnames = (
+            _MSG_CONTENTS_PARSER.get_funcnames(inmessage) if isinstance(inmessage, str) else None
+        )
+        groupable = funcnames is not None and not (funcnames & _MSG_CONTENTS_UNGROUPABLE)
+        if groupable and not funcnames and "{" not in inmessage and "}" not in inmessage:
+            # the same for everyone
+            outmessage = _render(you, {})
+            for receiver in contents:
+                receiver.msg(text=(outmessage, outkwargs), from_obj=from_obj, **kwargs)
+            return
+
+        actors = list(mapping.values())
+        rendered = {}
+        for receiver in contents:
+            display_names = {
+                key: (
+                    obj.get_display_name(looker=receiver)
+                    if hasattr(obj, "get_display_name")
+                    else str(obj)
+                )
+                for key, obj in mapping.items()
+            }
+            if groupable and receiver not in actors:
+                group = tuple(display_names.values())
+                outmessage = rendered.get(group)
+                if outmessage is None:
+                    outmessage = rendered[group] = _render(receiver, display_names)
+            else:
+                outmessage = _render(receiver, display_names)
 
             receiver.msg(text=(outmessage, outkwargs), from_obj=from_obj, **kwargs)
 
@@ -1,6 +1,8 @@
 from unittest import skip
+from unittest.mock import MagicMock, patch
 
 from evennia import DefaultCharacter, DefaultExit, DefaultObject, DefaultRoom
+from evennia.objects import objects
 from evennia.objects.models import ObjectDB
 from evennia.typeclasses.attributes import AttributeProperty
 from evennia.typeclasses.tags import (
@@ -201,6 +203,49 @@ class DefaultObjectTest(BaseEvenniaTest):
             pattern,
         )
 
+    def test_msg_contents(self):
+        """Test actor- and director-stance messages are rendered per receiver"""
+        receivers = (self.char1, self.char2, self.obj1, self.obj2)
+        for receiver in receivers:
+            receiver.msg = MagicMock()
+
+        with patch(
+            "evennia.objects.objects._MSG_CONTENTS_PARSER.parse",
+            wraps=objects._MSG_CONTENTS_PARSER.parse,
+        ) as mock_parse:
+            self.room1.msg_contents(
+                "$You() $conj(smile) at {target}.",
+                from_obj=self.char1,
+                mapping={"target": self.char2},
+            )
+            # the two bystanders see the same names, so they share one render
+            self.assertEqual(mock_parse.call_count, 3)
+
+        def _text(receiver):
+            return receiver.msg.call_args[1]["text"][0]
+
+        self.assertEqual(
+            _text(self.char1), f"You smile at {self.char2.get_display_name(looker=self.char1)}."
+        )
+        self.assertEqual(
+            _text(self.char2), f"{self.char1.get_display_name(looker=self.char2)} smiles at Char2."
+        )
+        self.assertEqual(_text(self.obj1), "Char smiles at Char2.")
+        self.assertEqual(_text(self.obj2), "Char smiles at Char2.")
+
+        # a message the same for everyone is only rendered once
+        for receiver in receivers:
+            receiver.msg.reset_mock()
+        with patch(
+            "evennia.objects.objects._MSG_CONTENTS_PARSER.parse",
+            wraps=objects._MSG_CONTENTS_PARSER.parse,
+        ) as mock_parse:
+            self.room1.msg_contents("It starts to rain.", exclude=self.char1)
+            self.assertEqual(mock_parse.call_count, 1)
+        self.char1.msg.assert_not_called()
+        for receiver in receivers[1:]:
+            self.assertEqual(_text(receiver), "It starts to rain.")
+
     def test_get_name_without_article(self):
         self.assertEqual(self.obj1.get_numbered_name(1, self.char1, return_string=True), "an Obj")
         self.assertEqual(
@@ -266,7 +311,7 @@ class TestObjectManager(BaseEvenniaTest):
         query = ObjectDB.objects.get_objs_with_key_or_alias("")
         self.assertFalse(query)
         query = ObjectDB.objects.get_objs_with_key_or_alias("", exact=False)
-        self.assertEqual(list(query), list(ObjectDB.objects.all().order_by('id')))
+        self.assertEqual(list(query), list(ObjectDB.objects.all().order_by("id")))
 
         query = ObjectDB.objects.get_objs_with_key_or_alias(
             "", exact=False, typeclasses="evennia.objects.objects.DefaultCharacter"
@@ -291,6 +336,76 @@ class TestObjectManager(BaseEvenniaTest):
         )
         self.assertEqual(list(query), [self.char1])
 
+    def test_search_object_candidates(self):
+        self.obj1.aliases.add("shiny stone")
+        candidates = [self.obj2, self.char1, self.obj1, self.char2]
+        # warm the alias caches
+        for obj in candidates:
+            obj.aliases.all()
+
+        with self.assertNumQueries(0):
+            query = ObjectDB.objects.search_object("SHINY STONE", candidates=candidates)
+            self.assertEqual(list(query), [self.obj1])
+            query = ObjectDB.objects.search_object("sh st", candidates=candidates, exact=False)
+            self.assertEqual(list(query), [self.obj1])
+            query = ObjectDB.objects.search_object("cha", candidates=candidates, exact=False)
+            self.assertEqual(list(query), [self.char1, self.char2])
+            query = ObjectDB.objects.search_object("cha-2", candidates=candidates, exact=False)
+            self.assertEqual(list(query), [self.char2])
+            query = ObjectDB.objects.search_object(
+                "char", candidates=candidates, exact=False, typeclass=DefaultObject
+            )
+            self.assertFalse(query)
+
+        # the result must be the same as that of the database search
+        for searchdata, exact in (
+            ("Obj", True),
+            ("obj", False),
+            ("sh st", False),
+            ("obj-2", False),
+        ):
+            query = ObjectDB.objects.search_object(searchdata, candidates=candidates, exact=exact)
+            with patch("evennia.objects.manager._TYPECLASS_AGGRESSIVE_CACHE", False):
+                dbquery = ObjectDB.objects.search_object(
+                    searchdata, candidates=candidates, exact=exact
+                )
+            self.assertEqual(list(query), list(dbquery))
+
+        # results remain querysets that can be refined further
+        query = ObjectDB.objects.search_object("cha", candidates=candidates, exact=False)
+        self.assertEqual(list(query.filter(db_key="Char2")), [self.char2])
+        query = DefaultCharacter.objects.search_object("obj", candidates=candidates, exact=False)
+        self.assertFalse(query)
+
+    def test_search_object_candidates_queryset(self):
+        candidates = [self.obj2, self.char1, self.obj1, self.char2]
+        for obj in candidates:
+            obj.aliases.all()
+        query = ObjectDB.objects.search_object("cha", candidates=candidates, exact=False)
+
+        # the pre-populated result cache answers these without a query
+        with self.assertNumQueries(0):
+            self.assertEqual(query.count(), 2)
+            self.assertTrue(query.exists())
+            self.assertEqual(len(query), 2)
+            self.assertEqual(query[1], self.char2)
+
+        # new querysets go to the database, but give the same result
+        self.assertEqual(list(query.filter(db_key="Char")), [self.char1])
+        self.assertEqual(query.filter(db_key="Char").count(), 1)
+        self.assertFalse(query.exclude(db_key__startswith="Char").exists())
+        other = ObjectDB.objects.filter(id=self.obj1.id)
+        self.assertEqual(list((query | other).order_by("id")), [self.obj1, self.char1, self.char2])
+
+    def test_search_object_candidates_deleted(self):
+        obj = create.create_object(DefaultObject, key="Doomed")
+        candidates = [self.obj1, obj]
+        obj.delete()
+        self.assertIsNone(obj.id)
+        query = ObjectDB.objects.search_object("doomed", candidates=candidates, exact=False)
+        self.assertFalse(query)
+        self.assertEqual(query.count(), 0)
+
     def test_get_objs_with_attr(self):
         self.obj1.db.testattr = "testval1"
         query = ObjectDB.objects.get_objs_with_attr("testattr")
@@ -365,6 +480,14 @@ class TestContentHandler(BaseEvenniaTest):
         )
         self.assertEqual(set(self.room1.contents_get(content_type="exit")), set([self.exit]))
 
+    def test_contents_marks_used(self):
+        """Contents in use are kept when evicting from the idmapper cache"""
+        self.room2.get_cached_instance(self.room2.id)
+        stamp = self.room2._idmapper_access
+        self.room1.contents
+        self.assertGreater(self.obj1._idmapper_access, stamp)
+        self.assertGreater(self.room1._idmapper_access, stamp)
+
     def test_contents_order(self):
         """Move object from room to room in various ways"""
         self.assertEqual(
@@ -59,9 +59,17 @@ state = ON_DEMAND_HANDLER.get_stage("flowering", last_checked=plant.planted_time
 
 ```
 
+To work with many tasks at once, use `ON_DEMAND_HANDLER.get_stages(category=...)` to check all
+tasks of a category in one go, or `ON_DEMAND_HANDLER.get_changed(since, category=...)` to find
+only the tasks that moved into a new stage since a given time (such as when a player last looked).
+
 
 """
 
+from bisect import bisect_right
+from functools import partial
+from itertools import repeat
+
 from evennia.server.models import ServerConfig
 from evennia.utils import logger
 from evennia.utils.utils import is_iter
@@ -166,6 +174,9 @@ class OnDemandTask:
     # dict.
     default_stage_function = None
 
+    # set by the OnDemandHandler to be told when the timing of the task changes
+    _on_change = None
+
     def __init__(self, key, category, stages=None, autostart=True):
         """
         Args:
@@ -241,6 +252,38 @@ class OnDemandTask:
             return False
         return (self.key, self.category) == (other.key, other.category)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_on_change", None)
+        return state
+
+    def __setstate__(self, state):
+        # tasks pickled before start_time and stages were properties
+        for name in ("start_time", "stages"):
+            if name in state:
+                state[f"_{name}"] = state.pop(name)
+        self.__dict__.update(state)
+
+    @property
+    def start_time(self):
+        return self._start_time
+
+    @start_time.setter
+    def start_time(self, start_time):
+        self._start_time = start_time
+        if self._on_change:
+            self._on_change()
+
+    @property
+    def stages(self):
+        return self._stages
+
+    @stages.setter
+    def stages(self, stages):
+        self._stages = stages
+        if self._on_change:
+            self._on_change()
+
     def check(self, autostart=True, **kwargs):
         """
         Check the current stage of the task and return the time-delta to the next stage.
@@ -371,6 +414,181 @@ class OnDemandTask:
             self.start_time = OnDemandTask.runtime() - self.stages_by_name[stage]
 
 
+# stage functions that restart the task's stages, making its stage changes periodic
+_PERIODIC_STAGE_FUNCS = (OnDemandTask.stagefunc_loop, OnDemandTask.stagefunc_bounce)
+
+
+class _TaskDict(dict):
+    """
+    The `{(key, category): task}` storage of the `OnDemandHandler`. This also keeps the tasks
+    grouped by category and reports which category changed, so the handler can keep its stage
+    index up to date.
+
+    """
+
+    def __init__(self, tasks=None, on_change=None):
+        super().__init__()
+        self.by_category = {}
+        self.on_change = on_change
+        self.update(tasks or {})
+
+    def __reduce__(self):
+        # pickle as a normal dict, without the handler callback
+        return (dict, (dict(self),))
+
+    def __setitem__(self, keytuple, task):
+        super().__setitem__(keytuple, task)
+        self.by_category.setdefault(keytuple[1], {})[keytuple] = task
+        if self.on_change:
+            self.on_change(keytuple[1])
+
+    def __delitem__(self, keytuple):
+        super().__delitem__(keytuple)
+        category_tasks = self.by_category[keytuple[1]]
+        del category_tasks[keytuple]
+        if not category_tasks:
+            del self.by_category[keytuple[1]]
+        if self.on_change:
+            self.on_change(keytuple[1])
+
+    def pop(self, keytuple, *default):
+        if keytuple not in self:
+            return super().pop(keytuple, *default)
+        task = self[keytuple]
+        del self[keytuple]
+        return task
+
+    def popitem(self):
+        keytuple = next(reversed(self))
+        return keytuple, self.pop(keytuple)
+
+    def setdefault(self, keytuple, default=None):
+        if keytuple not in self:
+            self[keytuple] = default
+        return self[keytuple]
+
+    def update(self, *args, **kwargs):
+        for keytuple, task in dict(*args, **kwargs).items():
+            self[keytuple] = task
+
+    def clear(self):
+        categories = list(self.by_category)
+        super().clear()
+        self.by_category.clear()
+        if self.on_change:
+            for category in categories:
+                self.on_change(category)
+
+
+class _StageGroup:
+    """
+    Started tasks sharing the same stages, sorted by start time. This lets the handler find the
+    stage of all of them by bisecting the start times once per stage, instead of checking every
+    task.
+
+    """
+
+    def __init__(self, stages, entries):
+        """
+        Args:
+            stages (dict or None): The `{dt: (name, callable)}` stages shared by the tasks.
+            entries (list): A list of `((key, category), task)` of started tasks.
+
+        """
+        stages = stages or {}
+        self.thresholds = sorted(stages)
+        self.stages = [stages[dt] for dt in self.thresholds]
+
+        entries.sort(key=lambda entry: entry[1].start_time)
+        self.keys = [keytuple for keytuple, _ in entries]
+        self.tasks = [task for _, task in entries]
+        self.starts = [task.start_time for task in self.tasks]
+
+        # looping and bouncing tasks pass through their stages again and again, so for those we
+        # also sort the tasks by how far they are into their current loop
+        self.period = None
+        funcs = {func for _, func in self.stages}
+        if len(self.thresholds) > 1 and any(func in funcs for func in _PERIODIC_STAGE_FUNCS):
+            min_dt, max_dt = self.thresholds[0], self.thresholds[-1]
+            self.period = max_dt - min_dt
+            crossings = {dt % self.period for dt in self.thresholds}
+            if OnDemandTask.stagefunc_bounce in funcs:
+                # a bounced task goes through the stages in reverse
+                crossings.update((max_dt - dt) % self.period for dt in self.thresholds)
+            self.crossings = sorted(crossings)
+            phases = sorted((start % self.period, ind) for ind, start in enumerate(self.starts))
+            self.phases = [phase for phase, _ in phases]
+            self.phase_indices = [ind for _, ind in phases]
+
+    def get_stages(self, now, stages, **kwargs):
+        """
+        Add the current stage of each task to `stages`. Only tasks reaching a new stage that has
+        a stage function are checked (so the function is called).
+
+        Args:
+            now (int or float): The current runtime.
+            stages (dict): The `{(key, category): stage}` dict to update.
+            **kwargs: Will be passed to the stage functions, if any are called.
+
+        """
+        lower = 0
+        for dt, (stage, stage_func) in zip(reversed(self.thresholds), reversed(self.stages)):
+            # tasks started at or before this have reached this stage
+            upper = bisect_right(self.starts, now - dt)
+            for ind in range(lower, upper):
+                task = self.tasks[ind]
+                if task.last_stage != stage:
+                    if stage_func:
+                        stages[self.keys[ind]] = task.get_stage(**kwargs)
+                        continue
+                    task.last_stage = stage
+                stages[self.keys[ind]] = stage
+            lower = upper
+        # the rest have not reached any stage yet
+        stages.update(zip(self.keys[lower:], repeat(None)))
+
+    def get_changed(self, since, now, changed):
+        """
+        Add the tasks that reached a new stage between `since` and `now` to `changed`.
+
+        Args:
+            since (int or float): The runtime to look from.
+            now (int or float): The current runtime.
+            changed (dict): The `{(key, category): task}` dict to update.
+
+        """
+        starts = self.starts
+        found = set()
+        if self.period is None:
+            # a task started at `start` reaches the stage at `dt` at time `start + dt`
+            for dt in self.thresholds:
+                found.update(
+                    range(bisect_right(starts, since - dt), bisect_right(starts, now - dt))
+                )
+        else:
+            # tasks started after `since` changed if they reached their first stage
+            first = bisect_right(starts, since)
+            found.update(range(first, bisect_right(starts, now - self.thresholds[0])))
+            span = now - since
+            if span >= self.period:
+                # enough time for every earlier task to go through a whole loop
+                found.update(range(first))
+            else:
+                # the others reach a stage when their place in the loop passes it
+                phases, period = self.phases, self.period
+                for crossing in self.crossings:
+                    low = (since - crossing) % period
+                    high = low + span
+                    indices = self.phase_indices[
+                        bisect_right(phases, low) : bisect_right(phases, high)
+                    ]
+                    if high >= period:
+                        # wraps around to the start of the loop
+                        indices += self.phase_indices[: bisect_right(phases, high - period)]
+                    found.update(ind for ind in indices if ind < first)
+        changed.update((self.keys[ind], self.tasks[ind]) for ind in sorted(found))
+
+
 class OnDemandHandler:
     """
     A singleton handler for managing on-demand state changes. Its main function is to persistently
@@ -384,6 +602,73 @@ class OnDemandHandler:
     def __init__(self):
         self.tasks = dict()
 
+    @property
+    def tasks(self):
+        return self._tasks
+
+    @tasks.setter
+    def tasks(self, tasks):
+        # {category: ([_StageGroup, ...], [((key, category), unstarted_task), ...])}
+        self._stage_index = {}
+        self._tasks = _TaskDict(tasks, on_change=self._clear_stage_index)
+
+    def _clear_stage_index(self, category):
+        """
+        Drop the stage index of a category, so it is rebuilt when next needed.
+
+        Args:
+            category (str or None): The category whose tasks changed.
+
+        """
+        self._stage_index.pop(category, None)
+
+    def _get_stage_index(self, category):
+        """
+        Get the stage index of a category, building it if needed.
+
+        Args:
+            category (str or None): The category of the tasks.
+
+        Returns:
+            tuple: `([_StageGroup, ...], [((key, category), task), ...])`, where the second
+            element lists the tasks that have not started yet.
+
+        """
+        index = self._stage_index.get(category)
+        if index is None:
+            on_change = partial(self._clear_stage_index, category)
+            unstarted, entries_by_stages = [], {}
+            for keytuple, task in self.tasks.by_category.get(category, {}).items():
+                task._on_change = on_change
+                if task.start_time is None:
+                    unstarted.append((keytuple, task))
+                else:
+                    stages_key = tuple(task.stages.items()) if task.stages else None
+                    entries_by_stages.setdefault(stages_key, (task.stages, []))[1].append(
+                        (keytuple, task)
+                    )
+            groups = [
+                _StageGroup(stages, entries) for stages, entries in entries_by_stages.values()
+            ]
+            index = self._stage_index[category] = (groups, unstarted)
+        return index
+
+    def _get_categories(self, category, all_on_none):
+        """
+        Get the categories to search.
+
+        Args:
+            category (str or None): The category of the tasks.
+            all_on_none (bool): If `category` is `None`, `True` means all categories.
+
+        Returns:
+            list: The categories.
+
+        """
+        if category is None and all_on_none:
+            return list(self.tasks.by_category)
+        return [category]
+
     def load(self):
         """
         Load the on-demand timers from ServerConfig storage.
@@ -398,7 +683,7 @@ class OnDemandHandler:
         Save the on-demand timers to ServerConfig storage. Should be called when Evennia shuts down.
 
         """
-        ServerConfig.objects.conf(ONDEMAND_HANDLER_SAVE_NAME, self.tasks)
+        ServerConfig.objects.conf(ONDEMAND_HANDLER_SAVE_NAME, dict(self.tasks))
 
     def _build_key(self, key, category):
         """
@@ -518,7 +803,7 @@ class OnDemandHandler:
             return self.tasks
 
         # filter by category (treat no-category as its own category)
-        return {keytuple: task for keytuple, task in self.tasks.items() if keytuple[1] == category}
+        return dict(self.tasks.by_category.get(category, {}))
 
     def clear(self, category=None, all_on_none=True):
         """
@@ -620,6 +905,70 @@ class OnDemandHandler:
         task = self.get(key, category)
         return task.get_stage(**kwargs) if task else None
 
+    def get_stages(self, category=None, all_on_none=True, **kwargs):
+        """
+        Get the current stage of all on-demand tasks, or of all tasks in a category. This gives the
+        same result as calling `get_stage` on each task, but tasks with the same stages are looked
+        up together by their start time. Only tasks reaching a stage with a stage function (and
+        tasks not yet started) are checked one by one.
+
+        Args:
+            category (str, optional): The category of the tasks. What `None` means is determined
+                by the `all_on_none` kwarg.
+            all_on_none (bool, optional): Determines what to get if `category` is `None`. If `True`,
+                get all tasks, if `False`, only tasks with no category.
+            **kwargs: Will be passed to the stage functions, if any are called.
+
+        Returns:
+            dict: A dictionary `{(key, category): stage, ...}`.
+
+        """
+        now = OnDemandTask.runtime()
+        stages = {}
+        for category in self._get_categories(category, all_on_none):
+            groups, unstarted = self._get_stage_index(category)
+            for group in groups:
+                group.get_stages(now, stages, **kwargs)
+            for keytuple, task in unstarted:
+                stages[keytuple] = task.get_stage(**kwargs)
+        return stages
+
+    def get_changed(self, since, category=None, all_on_none=True):
+        """
+        Find the on-demand tasks that have reached a new stage since a given time. The tasks are
+        not checked, so no stage functions are called; use `get_stage` on the returned tasks for
+        that.
+
+        Args:
+            since (int or float): A time in seconds, as given by `OnDemandTask.runtime()` (like the
+                time a player last looked at a room).
+            category (str, optional): The category of the tasks. What `None` means is determined
+                by the `all_on_none` kwarg.
+            all_on_none (bool, optional): Determines what to search if `category` is `None`. If
+                `True`, search all tasks, if `False`, only tasks with no category.
+
+        Returns:
+            dict: A dictionary `{(key, category): task, ...}` of the tasks that passed into a new
+            stage between `since` and now. Tasks without stages or not yet started are never
+            included.
+
+        Notes:
+            Tasks using `OnDemandTask.stagefunc_loop` or `OnDemandTask.stagefunc_bounce` are
+            followed through all the loops they have made since they were last checked. For a
+            bouncing task, passing a stage in either direction counts. What other stage functions
+            do cannot be known without calling them, so such tasks are treated as if their stages
+            only run once from their current start time.
+
+        """
+        now = OnDemandTask.runtime()
+        changed = {}
+        if since >= now:
+            return changed
+        for category in self._get_categories(category, all_on_none):
+            for group in self._get_stage_index(category)[0]:
+                group.get_changed(since, now, changed)
+        return changed
+
     def set_stage(self, key, category=None, stage=None):
         """
         Set the stage of an on-demand task manually. This allows you to 'cheat' the system and set
@@ -5,12 +5,14 @@ Module containing the task handler for Evennia deferred tasks, persistent or not
 from datetime import datetime, timedelta
 from pickle import PickleError
 
+from django.conf import settings
 from evennia.server.models import ServerConfig
 from evennia.utils.dbserialize import dbserialize, dbunserialize
 from evennia.utils.logger import log_err
 from twisted.internet import reactor
 from twisted.internet.defer import CancelledError as DefCancelledError
 from twisted.internet.task import deferLater
+from twisted.python import threadable
 
 TASK_HANDLER = None
 
@@ -225,6 +227,14 @@ class TaskHandler:
         # number of seconds before an uncalled canceled task is removed from TaskHandler
         self.stale_timeout = 60
         self._now = False  # used in unit testing to manually set now time
+        # pending delayed save, if any
+        self._save_call = None
+        # ids of persistent tasks changed since the last save
+        self._dirty = set()
+        # ids of tasks canceled through the handler, checked for staleness on add
+        self._canceled = set()
+        # all task ids below this are in use
+        self._next_id = 1
 
     def load(self):
         """Load from the ServerConfig.
@@ -233,12 +243,18 @@ class TaskHandler:
         It populates `self.tasks` according to the ServerConfig.
 
         """
-        to_save = False
-        value = ServerConfig.objects.conf("delayed_tasks", default=dict)
-        if isinstance(value, str):
-            tasks = dbunserialize(value)
-        else:
-            tasks = value
+        tasks = {
+            int(task_id): value
+            for task_id, value in ServerConfig.objects.get_entries("delayed_tasks").items()
+        }
+        # tasks saved all in one entry by older versions
+        value = ServerConfig.objects.conf("delayed_tasks")
+        if value:
+            if isinstance(value, str):
+                value = dbunserialize(value)
+            tasks.update(value)
+            self._dirty.update(value)
+            ServerConfig.objects.conf("delayed_tasks", delete=True)
 
         # At this point, `tasks` contains a dictionary of still-serialized tasks
         for task_id, value in tasks.items():
@@ -247,32 +263,42 @@ class TaskHandler:
                 # `callback` can be an object and name for instance methods
                 obj, method = callback
                 if obj is None:
-                    to_save = True
+                    self._dirty.add(task_id)
                     continue
 
                 try:
                     callback = getattr(obj, method)
                 except Exception as e:
                     log_err(f"TaskHandler: Unable to load task {task_id} (disabling it): {e}")
-                    to_save = True
+                    self._dirty.add(task_id)
                     continue
             self.tasks[task_id] = (date, callback, args, kwargs, True, None)
+            self.to_save[task_id] = value
+        self._next_id = 1
 
         if self.stale_timeout > 0:  # cleanup stale tasks.
             self.clean_stale_tasks()
-        if to_save:
+        if self._dirty:
             self.save()
 
-    def clean_stale_tasks(self):
+    def clean_stale_tasks(self, task_ids=None):
         """remove uncalled but canceled from task handler.
 
         By default this will not occur until a canceled task
         has been uncalled for 60 second after the time it should have been called.
         To adjust this time use TASK_HANDLER.stale_timeout.
 
+        Args:
+            task_ids (iterable, optional): Only check these tasks. If not given,
+                check all tasks.
+
         """
         clean_ids = []
-        for task_id, (date, callback, args, kwargs, persistent, _) in self.tasks.items():
+        task_ids = self.tasks if task_ids is None else list(task_ids)
+        for task_id in task_ids:
+            if task_id not in self.tasks:
+                continue
+            date = self.tasks[task_id][0]
             if not self.active(task_id):
                 stale_date = date + timedelta(seconds=self.stale_timeout)
                 # if a now time is provided use it (intended for unit testing)
@@ -284,38 +310,83 @@ class TaskHandler:
             self.remove(task_id)
         return True
 
-    def save(self):
+    def _serialize_task(self, task_id):
+        """
+        Serialize a persistent task into `self.to_save`, ready to be saved.
+
+        Args:
+            task_id (int): The id of an existing task.
+
+        Raises:
+            ValueError: If the task's callback cannot be pickled.
+
         """
-        Save the tasks in ServerConfig.
+        date, callback, args, kwargs, persistent, _ = self.tasks[task_id]
+        safe_callback = callback
+        if getattr(callback, "__self__", None):
+            # `callback` is an instance method
+            obj = callback.__self__
+            name = callback.__name__
+            safe_callback = (obj, name)
+
+        # Check if callback can be pickled. args and kwargs have been checked
+        try:
+            dbserialize(safe_callback)
+        except (TypeError, AttributeError, PickleError) as err:
+            raise ValueError(
+                "the specified callback {callback} cannot be pickled. "
+                "It must be a top-level function in a module or an "
+                "instance method ({err}).".format(callback=callback, err=err)
+            )
 
+        self.to_save[task_id] = dbserialize((date, safe_callback, args, kwargs))
+
+    def _can_delay_save(self):
         """
+        Check if a delayed save would ever happen. This is not the case if the
+        reactor is not running (like in `evennia shell`) and it's not safe
+        outside of the reactor thread.
 
-        for task_id, (date, callback, args, kwargs, persistent, _) in self.tasks.items():
-            if task_id in self.to_save:
-                continue
-            if not persistent:
-                continue
+        """
+        if self.clock is not reactor:
+            # a custom clock, like in tests
+            return True
+        return reactor.running and threadable.isInIOThread()
+
+    def _schedule_save(self, task_id=None):
+        """
+        Save the tasks after `settings.HANDLER_SAVE_DELAY` seconds, so that many
+        changes in quick succession lead to a single save instead of one per change.
 
-            safe_callback = callback
-            if getattr(callback, "__self__", None):
-                # `callback` is an instance method
-                obj = callback.__self__
-                name = callback.__name__
-                safe_callback = (obj, name)
+        Args:
+            task_id (int, optional): The persistent task that changed.
+
+        """
+        if task_id is not None:
+            self._dirty.add(task_id)
+        save_delay = settings.HANDLER_SAVE_DELAY
+        if save_delay <= 0 or not self._can_delay_save():
+            self.save()
+        elif not (self._save_call and self._save_call.active()):
+            self._save_call = self.clock.callLater(save_delay, self.save)
 
-            # Check if callback can be pickled. args and kwargs have been checked
-            try:
-                dbserialize(safe_callback)
-            except (TypeError, AttributeError, PickleError) as err:
-                raise ValueError(
-                    "the specified callback {callback} cannot be pickled. "
-                    "It must be a top-level function in a module or an "
-                    "instance method ({err}).".format(callback=callback, err=err)
-                )
+    def save(self):
+        """
+        Save the persistent tasks changed since the last save to the database,
+        as one ServerConfig entry per task. This also flushes any pending
+        delayed save.
 
-            self.to_save[task_id] = dbserialize((date, safe_callback, args, kwargs))
+        """
+        if self._save_call and self._save_call.active():
+            self._save_call.cancel()
+        self._save_call = None
 
-        ServerConfig.objects.conf("delayed_tasks", self.to_save)
+        if self._dirty:
+            ServerConfig.objects.update_entries(
+                "delayed_tasks",
+                {task_id: self.to_save.get(task_id) for task_id in self._dirty},
+            )
+            self._dirty = set()
 
     def add(self, timedelay, callback, *args, **kwargs):
         """
@@ -349,11 +420,11 @@ class TaskHandler:
         now = datetime.now()
         delta = timedelta(seconds=timedelay)
         comp_time = now + delta
-        # get an open task id
-        used_ids = list(self.tasks.keys())
-        task_id = 1
-        while task_id in used_ids:
+        # get the lowest open task id
+        task_id = self._next_id
+        while task_id in self.tasks:
             task_id += 1
+        self._next_id = task_id + 1
 
         # record the task to the tasks dictionary
         persistent = kwargs.get("persistent", False)
@@ -389,7 +460,8 @@ class TaskHandler:
                     safe_kwargs[key] = value
 
             self.tasks[task_id] = (comp_time, callback, safe_args, safe_kwargs, persistent, None)
-            self.save()
+            self._serialize_task(task_id)
+            self._schedule_save(task_id)
         else:  # this is a non-persitent task
             self.tasks[task_id] = (comp_time, callback, args, kwargs, persistent, None)
 
@@ -409,8 +481,8 @@ class TaskHandler:
             self.tasks[task_id] = task
         else:  # the task already completed
             return False
-        if self.stale_timeout > 0:
-            self.clean_stale_tasks()
+        if self.stale_timeout > 0 and self._canceled:
+            self.clean_stale_tasks(self._canceled)
         return TaskHandlerTask(task_id)
 
     def exists(self, task_id):
@@ -470,6 +542,7 @@ class TaskHandler:
                     return False
                 else:  # the callback has not been called yet.
                     d.cancel()
+                    self._canceled.add(task_id)
                     return True
             else:  # this task has no deferred instance
                 return False
@@ -494,10 +567,12 @@ class TaskHandler:
             # if the task has not been run, cancel it
             self.cancel(task_id)
             del self.tasks[task_id]  # delete the task from the tasks dictionary
+            self._next_id = min(self._next_id, task_id)
+        self._canceled.discard(task_id)
         # remove the task from the persistent dictionary and ServerConfig
         if task_id in self.to_save:
             del self.to_save[task_id]
-            self.save()  # remove from ServerConfig.objects
+            self._schedule_save(task_id)  # remove from ServerConfig.objects
         # delete the instance of the deferred
         if d:
             del d
@@ -515,12 +590,19 @@ class TaskHandler:
             True (bool): if the removal completed successfully.
 
         """
+        if not save and self._save_call and self._save_call.active():
+            # store changes made before the clear
+            self.save()
         if self.tasks:
             for task_id in self.tasks.keys():
                 if cancel:
                     self.cancel(task_id)
             self.tasks = {}
+        self._canceled = set()
+        self._next_id = 1
         if self.to_save:
+            if save:
+                self._dirty.update(self.to_save)
             self.to_save = {}
         if save:
             self.save()
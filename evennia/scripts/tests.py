@@ -6,6 +6,8 @@ Unit tests for the scripts package
 from collections import defaultdict
 from unittest import TestCase, mock
 
+from django.test import override_settings
+
 from evennia import DefaultScript
 from evennia.objects.objects import DefaultObject
 from evennia.scripts.manager import ScriptDBManager
@@ -13,11 +15,14 @@ from evennia.scripts.models import ObjectDoesNotExist, ScriptDB
 from evennia.scripts.monitorhandler import MonitorHandler
 from evennia.scripts.ondemandhandler import OnDemandHandler, OnDemandTask
 from evennia.scripts.scripts import DoNothing, ExtendedLoopingCall
-from evennia.scripts.tickerhandler import TickerHandler
+from evennia.scripts.tickerhandler import Ticker, TickerHandler
+from evennia.server.models import ServerConfig
 from evennia.utils.create import create_script
 from evennia.utils.dbserialize import dbserialize
 from evennia.utils.test_resources import BaseEvenniaTest, EvenniaTest
 from parameterized import parameterized
+from twisted.internet.defer import succeed
+from twisted.internet.task import Clock
 
 
 class TestScript(BaseEvenniaTest):
@@ -30,6 +35,10 @@ class TestScript(BaseEvenniaTest):
             mockinit.assert_called()
 
 
+def _dummy_tick(*args, **kwargs):
+    pass
+
+
 class TestTickerHandler(TestCase):
     """Test the TickerHandler class"""
 
@@ -45,6 +54,153 @@ class TestTickerHandler(TestCase):
             th = TickerHandler()
             th.remove(callback=1)
 
+    @override_settings(HANDLER_SAVE_DELAY=2)
+    @mock.patch("evennia.scripts.tickerhandler.ServerConfig")
+    def test_save_is_delayed(self, mock_serverconfig):
+        """Test that a burst of changes is saved once, after a delay"""
+        th = TickerHandler()
+        th.clock = Clock()
+        for idstring in ("a", "b", "c"):
+            th.add(10, _dummy_tick, idstring=idstring)
+        mock_update_entries = mock_serverconfig.objects.update_entries
+        mock_update_entries.assert_not_called()
+        th.clock.advance(2)
+        mock_update_entries.assert_called_once()
+        # one entry per subscription, plus the ticker timers
+        self.assertEqual(len(mock_update_entries.call_args[0][1]), 4)
+
+        # an explicit save flushes a pending save, and only writes what changed
+        th.remove(10, _dummy_tick, idstring="a")
+        th.save()
+        self.assertEqual(mock_update_entries.call_count, 2)
+        entries = mock_update_entries.call_args[0][1]
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(list(entries.values()).count(None), 1)
+        th.clock.advance(2)
+        self.assertEqual(mock_update_entries.call_count, 2)
+        th.ticker_pool.stop()
+
+    @override_settings(HANDLER_SAVE_DELAY=2)
+    @mock.patch("evennia.scripts.tickerhandler.ServerConfig")
+    def test_save_not_delayed_without_reactor(self, mock_serverconfig):
+        """Test that changes are saved at once when a delayed save would not happen"""
+        th = TickerHandler()
+        mock_update_entries = mock_serverconfig.objects.update_entries
+        # the reactor is not running (like in evennia shell)
+        th.add(10, _dummy_tick, idstring="a")
+        self.assertEqual(mock_update_entries.call_count, 1)
+        # called from outside the reactor thread
+        with mock.patch("evennia.scripts.tickerhandler.reactor.running", True, create=True):
+            with mock.patch(
+                "evennia.scripts.tickerhandler.threadable.isInIOThread", return_value=False
+            ):
+                th.add(10, _dummy_tick, idstring="b")
+        self.assertEqual(mock_update_entries.call_count, 2)
+        self.assertIsNone(th._save_call)
+        th.ticker_pool.stop()
+
+    def _make_ticker(self, interval, nsubs):
+        ticker = Ticker(interval)
+        ticker.task.clock = Clock()
+        calls = []
+        for isub in range(nsubs):
+            ticker.add(("key", isub), isub, _callback=calls.append, _obj=None)
+        return ticker, calls
+
+    @mock.patch("evennia.scripts.tickerhandler._PHASE_BUCKETS", 2)
+    def test_phase_buckets(self):
+        """Test subscribers are spread over phase buckets and all called once per interval"""
+        ticker, calls = self._make_ticker(10, 4)
+        self.assertEqual(ticker.task.interval, 5)
+        self.assertEqual([len(bucket) for bucket in ticker._buckets], [2, 2])
+
+        ticker.task.clock.advance(5)
+        self.assertEqual(len(calls), 2)
+        ticker.task.clock.advance(5)
+        self.assertEqual(sorted(calls), [0, 1, 2, 3])
+        self.assertEqual(ticker.metrics["ticks"], 2)
+
+        ticker.remove(("key", 0))
+        self.assertEqual(sum(len(bucket) for bucket in ticker._buckets), 3)
+        ticker.stop()
+
+    @mock.patch("evennia.scripts.tickerhandler._SLICE_BUDGET", -1)
+    @mock.patch("evennia.scripts.tickerhandler._PHASE_BUCKETS", 1)
+    def test_slice_budget(self):
+        """Test the ticker yields to the reactor when it runs out of its time budget"""
+        ticker, calls = self._make_ticker(10, 3)
+        with mock.patch(
+            "evennia.scripts.tickerhandler.deferLater", return_value=succeed(None)
+        ) as mock_defer_later:
+            ticker.task.clock.advance(10)
+        self.assertEqual(calls, [0, 1, 2])
+        self.assertEqual(mock_defer_later.call_count, 2)
+        self.assertEqual(ticker.metrics["ticks"], 1)
+        ticker.stop()
+
+    def test_metrics(self):
+        """Test overruns are counted when a tick takes longer than the interval"""
+        ticker, calls = self._make_ticker(10, 1)
+        with mock.patch("evennia.scripts.tickerhandler.time.monotonic", side_effect=[0, 12]):
+            ticker.task.clock.advance(10)
+        self.assertEqual(calls, [0])
+        self.assertEqual(
+            ticker.metrics, {"ticks": 1, "overruns": 1, "last_duration": 12, "max_duration": 12}
+        )
+        ticker.stop()
+
+
+class TestTickerHandlerStorage(BaseEvenniaTest):
+    """Test saving tickers as one database entry each"""
+
+    def setUp(self):
+        super().setUp()
+        self.th = TickerHandler(save_name="test_tickers")
+
+    def tearDown(self):
+        self.th.ticker_pool.stop()
+        super().tearDown()
+
+    def _restored(self):
+        th = TickerHandler(save_name="test_tickers")
+        th.restore()
+        th.ticker_pool.stop()
+        return th
+
+    def test_save_restore(self):
+        self.th.add(10, _dummy_tick, idstring="a")
+        self.th.add(20, self.obj1.msg, idstring="b")
+        entries = ServerConfig.objects.get_entries("test_tickers")
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(set(entries["start_delays"]), {10, 20})
+        self.assertEqual(set(self._restored().ticker_storage), set(self.th.ticker_storage))
+
+        self.th.remove(10, _dummy_tick, idstring="a")
+        self.assertEqual(len(ServerConfig.objects.get_entries("test_tickers")), 2)
+        self.assertEqual(set(self._restored().ticker_storage), set(self.th.ticker_storage))
+
+    def test_restore_removes_stale(self):
+        self.th.add(10, _dummy_tick, idstring="a")
+        self.th.add(20, self.obj1.msg, idstring="b")
+        self.obj1.delete()
+        th = self._restored()
+        self.assertEqual(len(th.ticker_storage), 1)
+        self.assertEqual(len(ServerConfig.objects.get_entries("test_tickers")), 2)
+
+    def test_restore_old_format(self):
+        self.th.add(10, _dummy_tick, idstring="a")
+        store_key, (args, kwargs) = next(iter(self.th.ticker_storage.items()))
+        ServerConfig.objects.update_entries(
+            "test_tickers", {self.th._entry_key(store_key): None, "start_delays": None}
+        )
+        ServerConfig.objects.conf(
+            key="test_tickers", value=dbserialize({store_key: (args, kwargs)})
+        )
+        th = self._restored()
+        self.assertEqual(set(th.ticker_storage), {store_key})
+        self.assertIsNone(ServerConfig.objects.conf(key="test_tickers"))
+        self.assertIn(th._entry_key(store_key), ServerConfig.objects.get_entries("test_tickers"))
+
 
 class TestScriptDBManager(TestCase):
     """Test the ScriptDBManger class"""
@@ -513,6 +669,16 @@ class TestOnDemandTask(EvenniaTest):
         self.assertEqual(task.iterations, 25)
         self.assertEqual(task.get_stage(), "warm")
 
+    def test_unpickle_old_format(self):
+        task = OnDemandTask("rose", "flower", stages={0: "seedling"}, autostart=False)
+        state = task.__getstate__()
+        state["start_time"] = state.pop("_start_time")
+        state["stages"] = state.pop("_stages")
+        old_task = OnDemandTask.__new__(OnDemandTask)
+        old_task.__setstate__(state)
+        self.assertEqual(old_task.start_time, None)
+        self.assertEqual(old_task.stages, {0: ("seedling", None)})
+
 
 class TestOnDemandHandler(EvenniaTest):
     """
@@ -689,6 +855,94 @@ class TestOnDemandHandler(EvenniaTest):
     def _do_decay(task, **kwargs):
         task.stored_kwargs = kwargs
 
+    @mock.patch("evennia.scripts.ondemandhandler.OnDemandTask.runtime")
+    def test_get_stages_and_changed(self, mock_runtime):
+        mock_runtime.return_value = 1000
+        self.handler.add("rose", "flower", stages={0: "seedling", 100: "bud", 200: "flower"})
+        self.handler.add("daffodil", "flower", stages={0: "seedling", 50: "bud", 100: "flower"})
+        self.handler.add("test", None, stages={0: "start", 500: "end"})
+
+        self.assertEqual(
+            self.handler.get_stages("flower"),
+            {("rose", "flower"): "seedling", ("daffodil", "flower"): "seedling"},
+        )
+        self.assertEqual(
+            self.handler.get_stages(None, all_on_none=False), {("test", None): "start"}
+        )
+        self.assertEqual(self.handler.get_changed(1000, "flower"), {})
+
+        mock_runtime.return_value = 1060
+        self.assertEqual(list(self.handler.get_changed(1000, "flower")), [("daffodil", "flower")])
+        self.assertEqual(
+            set(self.handler.get_changed(990)),
+            {("rose", "flower"), ("daffodil", "flower"), ("test", None)},
+        )
+        self.assertEqual(self.handler.get_stages("flower")[("daffodil", "flower")], "bud")
+
+        mock_runtime.return_value = 1150
+        self.assertEqual(
+            set(self.handler.get_changed(1060, "flower")),
+            {("rose", "flower"), ("daffodil", "flower")},
+        )
+        self.assertEqual(self.handler.get_changed(1150), {})
+
+        # changing a task's timing is picked up by the next query
+        self.handler.set_stage("test", stage="end")
+        self.assertEqual(self.handler.get_stages(None, all_on_none=False), {("test", None): "end"})
+        self.handler.remove("rose", "flower")
+        self.assertEqual(list(self.handler.get_stages("flower")), [("daffodil", "flower")])
+
+    @mock.patch("evennia.scripts.ondemandhandler.OnDemandTask.runtime")
+    def test_get_stages_and_changed_looping(self, mock_runtime):
+        mock_runtime.return_value = 1000
+        stages = {0: "seedling", 100: "bud", 200: ("_loop", OnDemandTask.stagefunc_loop)}
+        self.handler.add("rose", "flower", stages=stages)
+        mock_runtime.return_value = 1050
+        self.handler.add("tulip", "flower", stages=stages)
+
+        # rose is 140s into its third loop, tulip 90s
+        mock_runtime.return_value = 1540
+        self.assertEqual(self.handler.get_changed(1510, "flower"), {})
+        # rose passed "bud" again, long after its first loop ended
+        self.assertEqual(list(self.handler.get_changed(1490, "flower")), [("rose", "flower")])
+        # both passed the end of a loop
+        self.assertEqual(len(self.handler.get_changed(1390, "flower")), 2)
+        # like get_stage, the check reaching the loop stage restarts the task
+        self.assertEqual(set(self.handler.get_stages("flower").values()), {"_loop"})
+        self.assertEqual(
+            self.handler.get_stages("flower"),
+            {("rose", "flower"): "bud", ("tulip", "flower"): "seedling"},
+        )
+        self.assertEqual(self.handler.get("rose", "flower").iterations, 2)
+        self.assertEqual(self.handler.get("tulip", "flower").start_time, 1450)
+
+        # the loop moved the start times
+        mock_runtime.return_value = 1610
+        self.assertEqual(list(self.handler.get_changed(1560, "flower")), [("rose", "flower")])
+        self.assertEqual(len(self.handler.get_changed(1540, "flower")), 2)
+        self.handler.get_stages("flower")
+        self.assertEqual(
+            self.handler.get_stages("flower"),
+            {("rose", "flower"): "seedling", ("tulip", "flower"): "bud"},
+        )
+
+    @mock.patch("evennia.scripts.ondemandhandler.OnDemandTask.runtime")
+    def test_get_changed_bouncing(self, mock_runtime):
+        mock_runtime.return_value = 0
+        self.handler.add(
+            "water",
+            stages={
+                0: ("cool", OnDemandTask.stagefunc_bounce),
+                30: "warm",
+                100: ("hot", OnDemandTask.stagefunc_bounce),
+            },
+        )
+        mock_runtime.return_value = 160
+        # on the way back, it is warm again from 170
+        self.assertEqual(self.handler.get_changed(130), {})
+        mock_runtime.return_value = 175
+        self.assertEqual(list(self.handler.get_changed(130)), [("water", None)])
+
     def test_handler_save(self):
         """
         Testing the save method of the OnDemandHandler class for reported pickling issue
@@ -46,6 +46,14 @@ If either or both `idstring` or `persistent` has been changed from their default
 must be supplied to the `TICKER_HANDLER.remove` call to properly identify the ticker
 to remove.
 
+With `settings.TICKER_HANDLER_PHASE_BUCKETS` set, the subscribers of each
+interval are spread evenly over that many phase buckets; only one bucket is
+called at a time (every `interval / buckets` seconds), so every subscriber is
+still called once per interval but the work no longer lands in one big burst.
+The ticker also yields back to the reactor whenever it has been busy for more
+than `settings.TICKER_HANDLER_SLICE_BUDGET` seconds. Each ticker keeps timing
+metrics in `Ticker.metrics` (see `TICKER_HANDLER.metrics()`).
+
 The TickerHandler's functionality can be overloaded by modifying the
 Ticker class and then changing TickerPool and TickerHandler to use the
 custom classes
@@ -66,10 +74,16 @@ call the handler's `save()` and `restore()` methods when the server reboots.
 
 """
 
+import hashlib
 import inspect
+import time
 
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from twisted.internet import reactor
 from twisted.internet.defer import inlineCallbacks
+from twisted.internet.task import deferLater
+from twisted.python import threadable
 
 from evennia.scripts.scripts import ExtendedLoopingCall
 from evennia.server.models import ServerConfig
@@ -80,6 +94,9 @@ from evennia.utils.logger import log_err, log_trace
 _GA = object.__getattribute__
 _SA = object.__setattr__
 
+_PHASE_BUCKETS = max(0, int(settings.TICKER_HANDLER_PHASE_BUCKETS or 0))
+_SLICE_BUDGET = settings.TICKER_HANDLER_SLICE_BUDGET
+
 
 _ERROR_ADD_TICKER = """TickerHandler: Tried to add an invalid ticker:
 {store_key}
@@ -120,7 +137,22 @@ class Ticker(object):
         self._to_add = []
         self._to_remove = []
         self._is_ticking = True
-        for store_key, (args, kwargs) in self.subscriptions.items():
+        if self.phase_buckets:
+            store_keys = list(self._buckets[self._phase])
+            self._phase = (self._phase + 1) % self.phase_buckets
+        else:
+            store_keys = list(self.subscriptions)
+        start = slice_start = time.monotonic()
+        for icall, store_key in enumerate(store_keys):
+            if icall and self.phase_buckets and time.monotonic() - slice_start > _SLICE_BUDGET:
+                # out of time for this slice - let the reactor handle other things first
+                yield deferLater(self.task.clock, 0, lambda: None)
+                slice_start = time.monotonic()
+            try:
+                args, kwargs = self.subscriptions[store_key]
+            except KeyError:
+                # the ticker was stopped while we were yielding
+                break
             callback = yield kwargs.pop("_callback", "at_tick")
             obj = yield kwargs.pop("_obj", None)
             try:
@@ -144,6 +176,7 @@ class Ticker(object):
                 # make sure to re-store
                 kwargs["_callback"] = callback
                 kwargs["_obj"] = obj
+        self._update_metrics(time.monotonic() - start)
         # cleanup - we do this here to avoid changing the subscription dict while it loops
         self._is_ticking = False
         for store_key in self._to_remove:
@@ -166,9 +199,30 @@ class Ticker(object):
         self._is_ticking = False
         self._to_remove = []
         self._to_add = []
+        # phase buckets (sets of store_keys) called in turn, if enabled
+        self.phase_buckets = _PHASE_BUCKETS
+        self._buckets = [{} for _ in range(self.phase_buckets)]
+        self._phase = 0
+        self.metrics = {"ticks": 0, "overruns": 0, "last_duration": 0.0, "max_duration": 0.0}
         # set up a twisted asynchronous repeat call
         self.task = ExtendedLoopingCall(self._callback)
 
+    def _update_metrics(self, duration):
+        """
+        Record how long a tick (or a phase bucket) took. It is an overrun if it
+        took longer than the time until the next call.
+
+        Args:
+            duration (float): The time, in seconds, spent calling subscribers.
+
+        """
+        metrics = self.metrics
+        metrics["ticks"] += 1
+        metrics["last_duration"] = duration
+        metrics["max_duration"] = max(metrics["max_duration"], duration)
+        if duration > self.interval / (self.phase_buckets or 1):
+            metrics["overruns"] += 1
+
     def validate(self, start_delay=None):
         """
         Start/stop the task depending on how many subscribers we have
@@ -183,7 +237,9 @@ class Ticker(object):
             if not subs:
                 self.task.stop()
         elif subs:
-            self.task.start(self.interval, now=False, start_delay=start_delay)
+            self.task.start(
+                self.interval / (self.phase_buckets or 1), now=False, start_delay=start_delay
+            )
 
     def add(self, store_key, *args, **kwargs):
         """
@@ -204,6 +260,9 @@ class Ticker(object):
             self._to_add.append((store_key, (args, kwargs)))
         else:
             start_delay = kwargs.pop("_start_delay", None)
+            if self.phase_buckets and store_key not in self.subscriptions:
+                # put the new subscriber in the least crowded phase
+                min(self._buckets, key=len)[store_key] = True
             self.subscriptions[store_key] = (args, kwargs)
             self.validate(start_delay=start_delay)
 
@@ -221,6 +280,8 @@ class Ticker(object):
             self._to_remove.append(store_key)
         else:
             self.subscriptions.pop(store_key, False)
+            for bucket in self._buckets:
+                bucket.pop(store_key, None)
             self.validate()
 
     def stop(self):
@@ -229,6 +290,7 @@ class Ticker(object):
 
         """
         self.subscriptions = {}
+        self._buckets = [{} for _ in range(self.phase_buckets)]
         self.validate()
 
 
@@ -296,6 +358,18 @@ class TickerPool(object):
             for ticker in self.tickers.values():
                 ticker.stop()
 
+    def metrics(self):
+        """
+        Get the timing metrics of all tickers in the pool.
+
+        Returns:
+            dict: `{interval: {"ticks": int, "overruns": int, "last_duration": float,
+            "max_duration": float}, ...}`, where the durations are in seconds and
+            an overrun is a tick that took longer than the time to the next tick.
+
+        """
+        return {interval: dict(ticker.metrics) for interval, ticker in self.tickers.items()}
+
 
 class TickerHandler(object):
     """
@@ -311,13 +385,19 @@ class TickerHandler(object):
         """
         Initialize handler
 
-        save_name (str, optional): The name of the ServerConfig
-            instance to store the handler state persistently.
+        save_name (str, optional): The prefix of the ServerConfig
+            entries storing the handler state persistently (one entry
+            per subscription). At most 30 characters.
 
         """
         self.ticker_storage = {}
         self.save_name = save_name
         self.ticker_pool = self.ticker_pool_class()
+        self.clock = reactor
+        # pending delayed save, if any
+        self._save_call = None
+        # store_keys of subscriptions changed since the last save
+        self._dirty = set()
 
     def _get_callback(self, callback):
         """
@@ -397,40 +477,124 @@ class TickerHandler(object):
         outpath = path if path and isinstance(path, str) else None
         return (packed_obj, methodname, outpath, interval, idstring, persistent)
 
+    def _entry_key(self, store_key):
+        """
+        Get the key of a subscription's database entry.
+
+        Args:
+            store_key (tuple): The subscription's store-key.
+
+        Returns:
+            str: A stable hash of the store-key.
+
+        """
+        return hashlib.md5(repr(store_key).encode("utf-8")).hexdigest()
+
+    def _can_delay_save(self):
+        """
+        Check if a delayed save would ever happen. This is not the case if the
+        reactor is not running (like in `evennia shell`) and it's not safe
+        outside of the reactor thread.
+
+        """
+        if self.clock is not reactor:
+            # a custom clock, like in tests
+            return True
+        return reactor.running and threadable.isInIOThread()
+
+    def _schedule_save(self, store_key=None):
+        """
+        Save the handler after `settings.HANDLER_SAVE_DELAY` seconds, so that many
+        changes in quick succession (like mass-spawning ticking objects) lead to a
+        single save instead of one per change.
+
+        Args:
+            store_key (tuple, optional): The subscription that changed.
+
+        """
+        if store_key:
+            self._dirty.add(store_key)
+        save_delay = settings.HANDLER_SAVE_DELAY
+        if save_delay <= 0 or not self._can_delay_save():
+            self.save()
+        elif not (self._save_call and self._save_call.active()):
+            self._save_call = self.clock.callLater(save_delay, self.save)
+
     def save(self):
         """
-        Save ticker_storage as a serialized string into a temporary
-        ServerConf field. Whereas saving is done on the fly, if called
-        by server when it shuts down, the current timer of each ticker
-        will be saved so it can start over from that point.
+        Save the subscriptions changed since the last save to the database, as
+        one ServerConfig entry per subscription. Whereas saving is done shortly
+        after each change, if called by server when it shuts down, the current
+        timer of each ticker will be saved so it can start over from that point.
+        Calling this flushes any pending delayed save.
 
         """
-        if self.ticker_storage:
-            # get the current times so the tickers can be restarted with a delay later
-            start_delays = dict(
+        if self._save_call and self._save_call.active():
+            self._save_call.cancel()
+        self._save_call = None
+
+        entries = {}
+        for store_key in self._dirty:
+            entry = self.ticker_storage.get(store_key)
+            if entry:
+                # verify that there's a valid obj+method or function path
+                args, kwargs = entry
+                packedobj, callfunc, path, interval, idstring, persistent = store_key
+                if not (
+                    (
+                        callfunc
+                        and ("_obj" in kwargs and kwargs["_obj"].pk)
+                        and hasattr(kwargs["_obj"], callfunc)
+                    )
+                    or path
+                ):
+                    # remove any subscription that lost its object
+                    entry = None
+                else:
+                    entry = dbserialize((store_key, args, kwargs))
+            entries[self._entry_key(store_key)] = entry
+        self._dirty = set()
+
+        # get the current times so the tickers can be restarted with a delay later
+        entries["start_delays"] = (
+            dict(
                 (interval, ticker.task.next_call_time())
                 for interval, ticker in self.ticker_pool.tickers.items()
             )
+            or None
+        )
+        ServerConfig.objects.update_entries(self.save_name, entries)
 
-            to_save = {}
+    def _load_entries(self):
+        """
+        Load the stored subscriptions, converting the old single-entry format if found.
 
-            # remove any subscription that lost its object and update the timers for the tickers
-            for store_key, (args, kwargs) in self.ticker_storage.items():
-                # unpack the store_key to reference its parts
-                packedobj, callfunc, path, interval, idstring, persistent = store_key
-                # verify that there's a valid obj+method or function path
-                if (
-                    callfunc
-                    and ("_obj" in kwargs and kwargs["_obj"].pk)
-                    and hasattr(kwargs["_obj"], callfunc)
-                ) or path:
-                    # this is a mutable, so it's updated in-place in ticker_storage
-                    kwargs["_start_delay"] = start_delays.get(interval, None)
-                    to_save[store_key] = (args, kwargs)
-            ServerConfig.objects.conf(key=self.save_name, value=dbserialize(to_save))
-        else:
-            # make sure we have nothing lingering in the database
+        Returns:
+            tuple: `(restored, stored_keys)`, where `restored` is a list of
+                `(entry_key, store_key, args, kwargs)` and `stored_keys` the set of
+                entry keys in the database. The dbunserialize will already have
+                converted all serialized dbobjs to real objects.
+
+        """
+        entries = ServerConfig.objects.get_entries(self.save_name)
+        start_delays = entries.pop("start_delays", None) or {}
+        restored = []
+        for entry_key, entry in entries.items():
+            try:
+                store_key, args, kwargs = dbunserialize(entry)
+            except Exception:
+                log_trace(f"Tickerhandler: Removing malformed ticker entry {entry_key}.")
+                continue
+            kwargs["_start_delay"] = start_delays.get(store_key[3], None)
+            restored.append((entry_key, store_key, args, kwargs))
+
+        # subscriptions saved all in one entry by older versions
+        legacy = ServerConfig.objects.conf(key=self.save_name)
+        if legacy:
+            for store_key, (args, kwargs) in dbunserialize(legacy).items():
+                restored.append((None, store_key, args, kwargs))
             ServerConfig.objects.conf(key=self.save_name, delete=True)
+        return restored, set(entries)
 
     def restore(self, server_reload=True):
         """
@@ -445,13 +609,11 @@ class TickerHandler(object):
 
         """
         # load stored command instructions and use them to re-initialize handler
-        restored_tickers = ServerConfig.objects.conf(key=self.save_name)
+        restored_tickers, stored_keys = self._load_entries()
+        valid_keys = set()
         if restored_tickers:
-            # the dbunserialize will convert all serialized dbobjs to real objects
-
-            restored_tickers = dbunserialize(restored_tickers)
             self.ticker_storage = {}
-            for store_key, (args, kwargs) in restored_tickers.items():
+            for entry_key, store_key, args, kwargs in restored_tickers:
                 try:
                     # at this point obj is the actual object (or None) due to how
                     # the dbunserialize works
@@ -485,6 +647,18 @@ class TickerHandler(object):
                 # if we get here we should create a new ticker
                 self.ticker_storage[store_key] = (args, kwargs)
                 self.ticker_pool.add(store_key, *args, **kwargs)
+                valid_keys.add(self._entry_key(store_key))
+                if entry_key != self._entry_key(store_key):
+                    # converted from an older format
+                    self._dirty.add(store_key)
+
+        # remove entries of tickers that were not restored
+        stale_keys = stored_keys.difference(valid_keys)
+        if stale_keys or self._dirty:
+            ServerConfig.objects.update_entries(
+                self.save_name, {entry_key: None for entry_key in stale_keys}
+            )
+            self.save()
 
     def add(self, interval=60, callback=None, idstring="", persistent=True, *args, **kwargs):
         """
@@ -532,7 +706,7 @@ class TickerHandler(object):
         kwargs["_callback"] = callfunc  # either method-name or callable
         self.ticker_storage[store_key] = (args, kwargs)
         self.ticker_pool.add(store_key, *args, **kwargs)
-        self.save()
+        self._schedule_save(store_key)
         return store_key
 
     def remove(self, interval=60, callback=None, idstring="", persistent=True, store_key=None):
@@ -567,7 +741,7 @@ class TickerHandler(object):
         to_remove = self.ticker_storage.pop(store_key, None)
         if to_remove:
             self.ticker_pool.remove(store_key)
-            self.save()
+            self._schedule_save(store_key)
         else:
             raise KeyError(f"No Ticker was found matching the store-key {store_key}.")
 
@@ -585,14 +759,18 @@ class TickerHandler(object):
         """
         self.ticker_pool.stop(interval)
         if interval:
+            self._dirty.update(
+                store_key for store_key in self.ticker_storage if store_key[3] == interval
+            )
             self.ticker_storage = dict(
                 (store_key, store_value)
                 for store_key, store_value in self.ticker_storage.items()
                 if store_key[3] != interval
             )
         else:
+            self._dirty.update(self.ticker_storage)
             self.ticker_storage = {}
-        self.save()
+        self._schedule_save()
 
     def all(self, interval=None):
         """
@@ -620,6 +798,17 @@ class TickerHandler(object):
                 return {interval: ticker.subscriptions}
             return None
 
+    def metrics(self):
+        """
+        Get timing metrics for each ticker interval.
+
+        Returns:
+            dict: `{interval: {"ticks": int, "overruns": int, "last_duration": float,
+            "max_duration": float}, ...}`. With phase buckets, each bucket counts as a tick.
+
+        """
+        return self.ticker_pool.metrics()
+
     def all_display(self):
         """
         Get all tickers on an easily displayable form.
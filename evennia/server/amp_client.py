@@ -7,13 +7,15 @@ Portal. This module sets up the Client-side communication.
 import os
 
 from django.conf import settings
-from twisted.internet import protocol
+from twisted.internet import protocol, reactor
 
 import evennia
 from evennia.server.portal import amp
 from evennia.utils import logger
 from evennia.utils.utils import class_from_module
 
+_SESSION_OUTPUT_BATCHING = settings.SESSION_OUTPUT_BATCHING
+
 
 class AMPClientFactory(protocol.ReconnectingClientFactory):
     """
@@ -102,6 +104,15 @@ class AMPServerClientProtocol(amp.AMPMultiConnectionProtocol):
 
     """
 
+    def __init__(self, *args, **kwargs):
+        """
+        Initialize the protocol, with an empty buffer for batched output.
+
+        """
+        super().__init__(*args, **kwargs)
+        self.output_buffer = {}
+        self.output_flush_task = None
+
     # sending AMP data
 
     def connectionMade(self):
@@ -126,7 +137,8 @@ class AMPServerClientProtocol(amp.AMPMultiConnectionProtocol):
 
         Args:
             command (AMP Command): A protocol send command.
-            sessid (int): A unique Session id.
+            sessid (int or list): A unique Session id (or a list of them, for
+                multicast commands).
             kwargs (any): Any data to pickle into the command.
 
         Returns:
@@ -138,6 +150,9 @@ class AMPServerClientProtocol(amp.AMPMultiConnectionProtocol):
 
         """
         # print("server data_to_portal: {}, {}, {}".format(command, sessid, kwargs))
+        if self.output_buffer:
+            # make sure buffered output is not overtaken by later sends
+            self.flush_output()
         return self.callRemote(command, packed_data=amp.dumps((sessid, kwargs))).addErrback(
             self.errback, command.key
         )
@@ -152,8 +167,54 @@ class AMPServerClientProtocol(amp.AMPMultiConnectionProtocol):
             kwargs (any, optiona): Extra data.
 
         """
+        if _SESSION_OUTPUT_BATCHING:
+            # buffer the output, to be sent together with all other output to
+            # this session at the end of this reactor iteration
+            batch = self.output_buffer.get(session.sessid)
+            if batch is None:
+                self.output_buffer[session.sessid] = [kwargs]
+            else:
+                batch.append(kwargs)
+            if not self.output_flush_task:
+                self.output_flush_task = reactor.callLater(0, self.flush_output)
+            return
         return self.data_to_portal(amp.MsgServer2Portal, session.sessid, **kwargs)
 
+    def flush_output(self):
+        """
+        Send all buffered output to the Portal, as one message per session. This
+        is called automatically at the end of the reactor iteration, as well as
+        before any other data is sent to the Portal.
+
+        """
+        if self.output_flush_task and self.output_flush_task.active():
+            self.output_flush_task.cancel()
+        self.output_flush_task = None
+        output_buffer, self.output_buffer = self.output_buffer, {}
+
+        for sessid, batch in output_buffer.items():
+            if len(batch) == 1:
+                self.data_to_portal(amp.MsgServer2Portal, sessid, **batch[0])
+                continue
+            # keep the order, but make sure that prompts are processed last
+            prompts = [{"prompt": kwargs.pop("prompt")} for kwargs in batch if "prompt" in kwargs]
+            batch = [kwargs for kwargs in batch if kwargs] + prompts
+            self.data_to_portal(amp.MsgServer2PortalBatch, sessid, messages=batch)
+
+    def send_MsgServer2PortalMulticast(self, sessions, **kwargs):
+        """
+        Access method - executed on the Server for sending the same data
+            to many sessions on the Portal in one go.
+
+        Args:
+            sessions (list): The Sessions to send to.
+            kwargs (any, optiona): Extra data.
+
+        """
+        return self.data_to_portal(
+            amp.MsgServer2PortalMulticast, [session.sessid for session in sessions], **kwargs
+        )
+
     def send_AdminServer2Portal(self, session, operation="", **kwargs):
         """
         Administrative access method called by the Server to send an
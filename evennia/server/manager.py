@@ -2,7 +2,10 @@
 Custom manager for ServerConfig objects.
 """
 
-from django.db import models
+from django.db import models, transaction
+
+# max number of keys per SQL query, to stay below database parameter limits
+_ENTRY_CHUNK_SIZE = 500
 
 
 class ServerConfigManager(models.Manager):
@@ -55,3 +58,49 @@ class ServerConfigManager(models.Manager):
                 return default
             return conf[0].value
         return None
+
+    def get_entries(self, prefix):
+        """
+        Get all values stored as separate entries under a common prefix
+        (like one entry per subscription of a handler). See `update_entries`.
+
+        Args:
+            prefix (str): The common prefix of the entries.
+
+        Returns:
+            dict: `{entry_key: value}` for all stored entries.
+
+        """
+        start = len(prefix) + 1
+        return {
+            conf.db_key[start:]: conf.value for conf in self.filter(db_key__startswith=f"{prefix}:")
+        }
+
+    def update_entries(self, prefix, entries):
+        """
+        Store or delete values as separate entries under a common prefix.
+        Every entry is its own database row, so only changed entries need
+        to be written.
+
+        Args:
+            prefix (str): The common prefix of the entries. Together with an
+                entry key, this may be at most 63 characters long.
+            entries (dict): `{entry_key: value}`. A value of `None` deletes
+                the entry.
+
+        """
+        from evennia.utils.dbserialize import to_pickle
+
+        rows = {f"{prefix}:{entry_key}": value for entry_key, value in entries.items()}
+        allkeys = list(rows)
+        with transaction.atomic():
+            for ichunk in range(0, len(allkeys), _ENTRY_CHUNK_SIZE):
+                self.filter(db_key__in=allkeys[ichunk : ichunk + _ENTRY_CHUNK_SIZE]).delete()
+            self.bulk_create(
+                [
+                    self.model(db_key=key, db_value=to_pickle(value))
+                    for key, value in rows.items()
+                    if value is not None
+                ],
+                batch_size=_ENTRY_CHUNK_SIZE,
+            )
@@ -13,6 +13,7 @@ from functools import wraps
 from io import BytesIO
 from itertools import count
 
+from django.conf import settings
 from twisted.internet.defer import Deferred, DeferredList
 from twisted.protocols import amp
 
@@ -59,6 +60,39 @@ UNKNOWN_ERROR_CODE = b"UNKNOWN"
 _SENDBATCH = defaultdict(list)
 _MSGBUFFER = defaultdict(list)
 
+# compression
+_COMPRESSION_THRESHOLD = settings.AMP_COMPRESSION_THRESHOLD
+_COMPRESSION_LEVEL = settings.AMP_COMPRESSION_LEVEL
+_COMPRESSION_DICTIONARY = settings.AMP_COMPRESSION_DICTIONARY
+# marks data sent without compression (this can never start a zlib stream)
+_UNCOMPRESSED = b"\x00"
+# Fragments common in pickled Server<->Portal traffic, used to prime zlib so that
+# also short messages compress well. The most common fragments should go last.
+# This must be the same for Portal and Server, so don't change without a full restart.
+_ZDICT = b"".join(
+    (
+        b"screenreader",
+        b"nocolor",
+        b"client_raw",
+        b"raw",
+        b"xterm256",
+        b"|/",
+        b"|-",
+        b"|h",
+        b"|x",
+        b"|m",
+        b"|c",
+        b"|b",
+        b"|y",
+        b"|g",
+        b"|r",
+        b"|w",
+        b"|n",
+        b"prompt",
+        pickle.dumps((1, {"text": [["You"], {"options": {}}]}), pickle.HIGHEST_PROTOCOL),
+    )
+)
+
 # resources
 
 DUMMYSESSION = namedtuple("DummySession", ["sessid"])(0)
@@ -175,17 +209,29 @@ class Compressed(amp.String):
         """
         Convert to send as a bytestring on the wire, with compression.
 
-        Note: In Py3 this is really a byte stream.
+        Note: In Py3 this is really a byte stream. Data shorter than
+        `settings.AMP_COMPRESSION_THRESHOLD` is not worth compressing and
+        is sent as-is, prefixed with a marker byte.
 
         """
-        return zlib.compress(super().toString(inObject), 9)
+        data = super().toString(inObject)
+        if len(data) < _COMPRESSION_THRESHOLD:
+            return _UNCOMPRESSED + data
+        if _COMPRESSION_DICTIONARY:
+            compressor = zlib.compressobj(_COMPRESSION_LEVEL, zdict=_ZDICT)
+            return compressor.compress(data) + compressor.flush()
+        return zlib.compress(data, _COMPRESSION_LEVEL)
 
     def fromString(self, inString):
         """
         Convert (decompress) from the string-representation on the wire to Python.
 
         """
-        return super().fromString(zlib.decompress(inString))
+        if inString[:1] == _UNCOMPRESSED:
+            return super().fromString(inString[1:])
+        # the dictionary is only used if the data was compressed with it
+        decompressor = zlib.decompressobj(zdict=_ZDICT)
+        return super().fromString(decompressor.decompress(inString) + decompressor.flush())
 
 
 class MsgLauncher2Portal(amp.Command):
@@ -224,6 +270,36 @@ class MsgServer2Portal(amp.Command):
     response = []
 
 
+class MsgServer2PortalBatch(amp.Command):
+    """
+    Message Server -> Portal, with many messages
+
+    All messages sent to one session during a reactor iteration, sent in
+    one go (used with `settings.SESSION_OUTPUT_BATCHING`).
+
+    """
+
+    key = "MsgServer2PortalBatch"
+    arguments = [(b"packed_data", Compressed())]
+    errors = {Exception: b"EXCEPTION"}
+    response = []
+
+
+class MsgServer2PortalMulticast(amp.Command):
+    """
+    Message Server -> Portal, for many sessions
+
+    The same data is relayed to every session in a list of sessids, so
+    it only needs to be pickled and sent across the wire once.
+
+    """
+
+    key = "MsgServer2PortalMulticast"
+    arguments = [(b"packed_data", Compressed())]
+    errors = {Exception: b"EXCEPTION"}
+    response = []
+
+
 class AdminPortal2Server(amp.Command):
     """
     Administration Portal -> Server
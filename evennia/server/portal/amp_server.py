@@ -393,6 +393,49 @@ class AMPServerProtocol(amp.AMPMultiConnectionProtocol):
             logger.log_trace("packed_data len {}".format(len(packed_data)))
         return {}
 
+    @amp.MsgServer2PortalBatch.responder
+    @amp.catch_traceback
+    def portal_receive_server2portal_batch(self, packed_data):
+        """
+        Receives many messages arriving to Portal from Server, for the same
+        session. This method is executed on the Portal.
+
+        Args:
+            packed_data (str): Pickled data (sessid, {"messages": [kwargs, ...]})
+                coming over the wire.
+
+        """
+        try:
+            sessid, kwargs = self.data_in(packed_data)
+            session = evennia.PORTAL_SESSION_HANDLER.get(sessid, None)
+            if session:
+                for outkwargs in kwargs["messages"]:
+                    evennia.PORTAL_SESSION_HANDLER.data_out(session, **outkwargs)
+        except Exception:
+            logger.log_trace("packed_data len {}".format(len(packed_data)))
+        return {}
+
+    @amp.MsgServer2PortalMulticast.responder
+    @amp.catch_traceback
+    def portal_receive_server2portal_multicast(self, packed_data):
+        """
+        Receives a message arriving to Portal from Server, to be relayed
+        to many sessions. This method is executed on the Portal.
+
+        Args:
+            packed_data (str): Pickled data ([sessid, ...], kwargs) coming over the wire.
+
+        """
+        try:
+            sessids, kwargs = self.data_in(packed_data)
+            for sessid in sessids:
+                session = evennia.PORTAL_SESSION_HANDLER.get(sessid, None)
+                if session:
+                    evennia.PORTAL_SESSION_HANDLER.data_out(session, **kwargs)
+        except Exception:
+            logger.log_trace("packed_data len {}".format(len(packed_data)))
+        return {}
+
     @amp.AdminServer2Portal.responder
     @amp.catch_traceback
     def portal_receive_adminserver2portal(self, packed_data):
@@ -13,15 +13,27 @@ terribly slow connection.
 
 This protocol is implemented by the telnet protocol importing
 mccp_compress and calling it from its write methods.
+
+The compression level and memory use are set by `MCCP_COMPRESSION_LEVEL` and
+`MCCP_MEMLEVEL`. With `MCCP_MERGE_WRITES`, all writes to a session during the same
+reactor iteration are flushed to the client together, instead of each line being
+flushed on its own.
 """
 
 import weakref
 import zlib
 
+from django.conf import settings
+from twisted.internet import reactor
+
 # negotiations for v1 and v2 of the protocol
 MCCP = bytes([86])  # b"\x56"
 FLUSH = zlib.Z_SYNC_FLUSH
 
+_COMPRESSION_LEVEL = settings.MCCP_COMPRESSION_LEVEL
+_MEMLEVEL = settings.MCCP_MEMLEVEL
+_MERGE_WRITES = settings.MCCP_MERGE_WRITES
+
 
 def mccp_compress(protocol, data):
     """
@@ -31,10 +43,15 @@ def mccp_compress(protocol, data):
         data (str): Incoming data to compress.
 
     Returns:
-        stream (binary): Zlib-compressed data.
+        stream (binary): Zlib-compressed data. If writes are merged, this may be
+            empty, with the rest following when the stream is flushed at the end
+            of the reactor iteration.
 
     """
     if hasattr(protocol, "zlib"):
+        mccp = getattr(protocol, "mccp", None)
+        if mccp:
+            return mccp.compress(data)
         return protocol.zlib.compress(data) + protocol.zlib.flush(FLUSH)
     return data
 
@@ -46,7 +63,7 @@ class Mccp:
 
     """
 
-    def __init__(self, protocol):
+    def __init__(self, protocol, level=None, memlevel=None, merge_writes=None):
         """
         initialize MCCP by storing protocol on
         ourselves and calling the client to see if
@@ -55,8 +72,22 @@ class Mccp:
 
         Args:
             protocol (Protocol): The active protocol instance.
+            level (int, optional): zlib compression level 0-9 for this session. Defaults
+                to `settings.MCCP_COMPRESSION_LEVEL`.
+            memlevel (int, optional): zlib memory level 1-9 for this session. Defaults
+                to `settings.MCCP_MEMLEVEL`.
+            merge_writes (bool, optional): If writes in the same reactor iteration should
+                be flushed together. Defaults to `settings.MCCP_MERGE_WRITES`.
 
         """
+        self.level = _COMPRESSION_LEVEL if level is None else level
+        self.memlevel = _MEMLEVEL if memlevel is None else memlevel
+        self.merge_writes = _MERGE_WRITES if merge_writes is None else merge_writes
+        self.clock = reactor
+        self._flush_call = None
+        # uncompressed bytes passed to, and compressed bytes sent from, the compressor
+        self.bytes_in = 0
+        self.bytes_out = 0
 
         self.protocol = weakref.ref(protocol)
         self.protocol().protocol_flags["MCCP"] = False
@@ -72,6 +103,7 @@ class Mccp:
 
         """
         if hasattr(self.protocol(), "zlib"):
+            self.flush()
             del self.protocol().zlib
         self.protocol().protocol_flags["MCCP"] = False
         self.protocol().handshake_done()
@@ -87,5 +119,63 @@ class Mccp:
         """
         self.protocol().protocol_flags["MCCP"] = True
         self.protocol().requestNegotiation(MCCP, b"")
-        self.protocol().zlib = zlib.compressobj(9)
+        self.protocol().zlib = zlib.compressobj(
+            self.level, zlib.DEFLATED, zlib.MAX_WBITS, self.memlevel
+        )
         self.protocol().handshake_done()
+
+    def compress(self, data):
+        """
+        Compress data for sending to the client.
+
+        Args:
+            data (bytes): Data to compress.
+
+        Returns:
+            bytes: Compressed data to write to the transport.
+
+        """
+        compressor = self.protocol().zlib
+        if self.merge_writes:
+            # hold the sync-flush until all writes of this reactor iteration are done
+            compressed = compressor.compress(data)
+            if not self._flush_call:
+                self._flush_call = self.clock.callLater(0, self.flush)
+        else:
+            compressed = compressor.compress(data) + compressor.flush(FLUSH)
+        self.bytes_in += len(data)
+        self.bytes_out += len(compressed)
+        return compressed
+
+    def flush(self):
+        """
+        Send everything compressed since the last flush to the client. Only used when
+        merging writes.
+
+        """
+        if not self._flush_call:
+            # nothing is waiting to be flushed
+            return
+        if self._flush_call.active():
+            self._flush_call.cancel()
+        self._flush_call = None
+        protocol = self.protocol()
+        if protocol and hasattr(protocol, "zlib"):
+            compressed = protocol.zlib.flush(FLUSH)
+            self.bytes_out += len(compressed)
+            protocol.transport.write(compressed)
+
+    def get_stats(self):
+        """
+        Get the compression counters for this session.
+
+        Returns:
+            dict: `{"bytes_in": int, "bytes_out": int, "ratio": float}`, where `ratio` is
+            the compressed size relative to the uncompressed (0 if nothing was sent).
+
+        """
+        return {
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": self.bytes_out / self.bytes_in if self.bytes_in else 0,
+        }
@@ -308,6 +308,9 @@ class TelnetProtocol(Telnet, StatefulTelnetProtocol, _BASE_SESSION_CLASS):
         self.sessionhandler.disconnect(self)
         if self.nop_keep_alive and self.nop_keep_alive.running:
             self.toggle_nop_keepalive()
+        if hasattr(self, "mccp"):
+            # send any compressed output still waiting to be flushed
+            self.mccp.flush()
         self.transport.loseConnection()
 
     def applicationDataReceived(self, data):
@@ -12,12 +12,14 @@ import json
 import pickle
 import string
 import sys
+import zlib
 
 import mock
 from autobahn.twisted.websocket import WebSocketServerFactory
 from mock import MagicMock, Mock
 from twisted.conch.telnet import DO, DONT, IAC, NAWS, SB, SE, WILL
 from twisted.internet.base import DelayedCall
+from twisted.internet.task import Clock
 from twisted.test import proto_helpers
 from twisted.trial.unittest import TestCase as TwistedTestCase
 
@@ -30,11 +32,12 @@ from evennia.utils.test_resources import BaseEvenniaTest
 from .amp import (
     AMP_MAXLEN,
     AMPMultiConnectionProtocol,
+    Compressed,
     MsgPortal2Server,
     MsgServer2Portal,
 )
 from .amp_server import AMPServerFactory
-from .mccp import MCCP
+from .mccp import MCCP, Mccp, mccp_compress
 from .mssp import MSSP
 from .mxp import MXP
 from .naws import DEFAULT_HEIGHT, DEFAULT_WIDTH
@@ -64,20 +67,12 @@ class TestAMPServer(TwistedTestCase):
 
         self.proto.data_to_server(MsgServer2Portal, 1, test=2)
 
-        if pickle.HIGHEST_PROTOCOL == 5:
-            # Python 3.8+
-            byte_out = (
-                b"\x00\x04_ask\x00\x011\x00\x08_command\x00\x10MsgServer2Portal\x00\x0b"
-                b"packed_data\x00 x\xdak`\x9d*\xc8\x00\x01\xde\x8c\xb5SzXJR"
-                b"\x8bK\xa6x3\x15\xb7M\xd1\x03\x00VU\x07u\x00\x00"
-            )
-        elif pickle.HIGHEST_PROTOCOL == 4:
-            # Python 3.7
-            byte_out = (
-                b"\x00\x04_ask\x00\x011\x00\x08_command\x00\x10MsgServer2Portal\x00\x0b"
-                b"packed_data\x00 x\xdak`\x99*\xc8\x00\x01\xde\x8c\xb5SzXJR"
-                b"\x8bK\xa6x3\x15\xb7M\xd1\x03\x00V:\x07t\x00\x00"
-            )
+        # short data is sent uncompressed
+        byte_out = (
+            b"\x00\x04_ask\x00\x011\x00\x08_command\x00\x10MsgServer2Portal\x00\x0b"
+            b"packed_data\x00\x1d\x00\x80\x05\x95\x11\x00\x00\x00\x00\x00\x00\x00"
+            b"K\x01}\x94\x8c\x04test\x94K\x02s\x86\x94.\x00\x00"
+        )
         self.transport.write.assert_called_with(byte_out)
         with mock.patch("evennia.server.portal.amp.amp.AMP.dataReceived") as mocked_amprecv:
             self.proto.dataReceived(byte_out)
@@ -87,25 +82,20 @@ class TestAMPServer(TwistedTestCase):
         self.proto.makeConnection(self.transport)
 
         self.proto.data_to_server(MsgPortal2Server, 1, test=2)
-        if pickle.HIGHEST_PROTOCOL == 5:
-            # Python 3.8+
-            byte_out = (
-                b"\x00\x04_ask\x00\x011\x00\x08_command\x00\x10MsgPortal2Server\x00\x0b"
-                b"packed_data\x00 x\xdak`\x9d*\xc8\x00\x01\xde\x8c\xb5SzXJR"
-                b"\x8bK\xa6x3\x15\xb7M\xd1\x03\x00VU\x07u\x00\x00"
-            )
-        elif pickle.HIGHEST_PROTOCOL == 4:
-            # Python 3.7
-            byte_out = (
-                b"\x00\x04_ask\x00\x011\x00\x08_command\x00\x10MsgPortal2Server\x00\x0b"
-                b"packed_data\x00 x\xdak`\x99*\xc8\x00\x01\xde\x8c\xb5SzXJR"
-                b"\x8bK\xa6x3\x15\xb7M\xd1\x03\x00V:\x07t\x00\x00"
-            )
+        # short data is sent uncompressed
+        byte_out = (
+            b"\x00\x04_ask\x00\x011\x00\x08_command\x00\x10MsgPortal2Server\x00\x0b"
+            b"packed_data\x00\x1d\x00\x80\x05\x95\x11\x00\x00\x00\x00\x00\x00\x00"
+            b"K\x01}\x94\x8c\x04test\x94K\x02s\x86\x94.\x00\x00"
+        )
         self.transport.write.assert_called_with(byte_out)
         with mock.patch("evennia.server.portal.amp.amp.AMP.dataReceived") as mocked_amprecv:
             self.proto.dataReceived(byte_out)
             mocked_amprecv.assert_called_with(byte_out)
 
+    @mock.patch("evennia.server.portal.amp._COMPRESSION_THRESHOLD", 0)
+    @mock.patch("evennia.server.portal.amp._COMPRESSION_LEVEL", 9)
+    @mock.patch("evennia.server.portal.amp._COMPRESSION_DICTIONARY", False)
     def test_large_msg(self):
         """
         Send message larger than AMP_MAXLEN - should be split into several
@@ -155,6 +145,28 @@ class TestAMPServer(TwistedTestCase):
                 b"\x00\x18x\xdaK-.)I\xc5\x8e\xa7\xb22@\xc0\x94\xe2\xb6)z\x00Z\x1e\x0e\xb6\x00\x00"
             )
 
+    def test_compressed(self):
+        """
+        Data is compressed (or not) depending on its size, and can always be read back.
+
+        """
+        compressed = Compressed()
+        short_data = pickle.dumps((1, {"text": [["Hello"], {"options": {}}]}))
+        long_data = pickle.dumps((1, {"text": [["|rHello|n " * 100], {"options": {}}]}))
+
+        short_out = compressed.toString(short_data)
+        self.assertEqual(short_out, b"\x00" + short_data)
+        self.assertEqual(compressed.fromString(short_out), short_data)
+
+        long_out = compressed.toString(long_data)
+        self.assertLess(len(long_out), len(long_data))
+        self.assertEqual(compressed.fromString(long_out), long_data)
+
+        with mock.patch("evennia.server.portal.amp._COMPRESSION_DICTIONARY", False):
+            self.assertEqual(compressed.toString(long_data), zlib.compress(long_data, 6))
+        # plain zlib data can still be read
+        self.assertEqual(compressed.fromString(zlib.compress(long_data, 9)), long_data)
+
 
 class TestIRC(TestCase):
     def test_plain_ansi(self):
@@ -291,6 +303,60 @@ class TestTelnet(TwistedTestCase):
         return d
 
 
+class _MccpProtocol:
+    """Minimal stand-in for a telnet protocol negotiating MCCP"""
+
+    def __init__(self):
+        self.protocol_flags = {}
+        self.transport = proto_helpers.StringTransport()
+        self.will = MagicMock()
+        self.requestNegotiation = MagicMock()
+        self.handshake_done = MagicMock()
+
+
+class TestMccp(TestCase):
+    def _setup(self, **kwargs):
+        self.proto = _MccpProtocol()
+        self.proto.mccp = Mccp(self.proto, **kwargs)
+        self.proto.mccp.clock = Clock()
+        self.proto.mccp.do_mccp(None)
+        self.decompressor = zlib.decompressobj()
+
+    def test_compress(self):
+        self._setup(level=1, memlevel=2, merge_writes=False)
+        self.assertTrue(self.proto.protocol_flags["MCCP"])
+        out = mccp_compress(self.proto, b"Hello") + mccp_compress(self.proto, b" World")
+        self.assertEqual(self.decompressor.decompress(out), b"Hello World")
+        stats = self.proto.mccp.get_stats()
+        self.assertEqual(stats["bytes_in"], 11)
+        self.assertEqual(stats["bytes_out"], len(out))
+
+    def test_merge_writes(self):
+        self._setup(merge_writes=True)
+        out = b"".join(mccp_compress(self.proto, b"line %i\r\n" % i) for i in range(10))
+        # nothing is flushed until the end of the reactor iteration
+        self.assertEqual(self.decompressor.decompress(out), b"")
+        self.proto.mccp.clock.advance(0)
+        flushed = self.proto.transport.value()
+        self.assertEqual(
+            self.decompressor.decompress(flushed),
+            b"".join(b"line %i\r\n" % i for i in range(10)),
+        )
+        self.assertEqual(self.proto.mccp.bytes_out, len(out) + len(flushed))
+        self.assertFalse(self.proto.mccp.clock.getDelayedCalls())
+
+    def test_flush_on_turning_off(self):
+        self._setup(merge_writes=True)
+        out = mccp_compress(self.proto, b"Goodbye")
+        self.proto.mccp.no_mccp(None)
+        self.assertFalse(hasattr(self.proto, "zlib"))
+        self.assertFalse(self.proto.mccp.clock.getDelayedCalls())
+        self.assertEqual(
+            self.decompressor.decompress(out + self.proto.transport.value()), b"Goodbye"
+        )
+        self.assertEqual(mccp_compress(self.proto, b"plain"), b"plain")
+
+
 class TestWebSocket(BaseEvenniaTest):
     def setUp(self):
         super().setUp()
@@ -287,8 +287,8 @@ class WebSocketClient(WebSocketServerProtocol, _BASE_SESSION_CLASS):
         screenreader = options.get("screenreader", flags.get("SCREENREADER", False))
         prompt = options.get("send_prompt", False)
 
-        if screenreader:
-            # screenreader mode cleans up output
+        if screenreader and raw:
+            # screenreader mode cleans up output (parse_html handles this otherwise)
             text = parse_ansi(text, strip_ansi=True, xterm256=False, mxp=False)
             text = _RE_SCREENREADER_REGEX.sub("", text)
         cmd = "prompt" if prompt else "text"
@@ -298,7 +298,7 @@ class WebSocketClient(WebSocketServerProtocol, _BASE_SESSION_CLASS):
             else:
                 args[0] = html.escape(text)  # escape html!
         else:
-            args[0] = parse_html(text, strip_ansi=nocolor)
+            args[0] = parse_html(text, strip_ansi=nocolor, screenreader=screenreader)
 
         # send to client on required form [cmdname, args, kwargs]
         self.sendLine(json.dumps([cmd, args, kwargs]))
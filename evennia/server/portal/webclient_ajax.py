@@ -163,15 +163,15 @@ class AjaxWebClientSession(session.Session):
         screenreader = options.get("screenreader", flags.get("SCREENREADER", False))
         prompt = options.get("send_prompt", False)
 
-        if screenreader:
-            # screenreader mode cleans up output
+        if screenreader and raw:
+            # screenreader mode cleans up output (parse_html handles this otherwise)
             text = parse_ansi(text, strip_ansi=True, xterm256=False, mxp=False)
             text = _RE_SCREENREADER_REGEX.sub("", text)
         cmd = "prompt" if prompt else "text"
         if raw:
             args[0] = text
         else:
-            args[0] = parse_html(text, strip_ansi=nocolor)
+            args[0] = parse_html(text, strip_ansi=nocolor, screenreader=screenreader)
 
         # send to client on required form [cmdname, args, kwargs]
         self.client.lineSend(self.csessid, [cmd, args, kwargs])
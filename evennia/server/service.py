@@ -553,6 +553,11 @@ class EvenniaServerService(MultiService):
 
         TICKER_HANDLER.save()
 
+        # flush pending changes to persistent delayed tasks
+        from evennia.scripts.taskhandler import TASK_HANDLER
+
+        TASK_HANDLER.save()
+
         # on-demand handler state should always be saved.
         from evennia.scripts.ondemandhandler import ON_DEMAND_HANDLER
 
@@ -561,6 +566,14 @@ class EvenniaServerService(MultiService):
         # always called, also for a reload
         self.at_server_stop()
 
+        # save any batched/deferred changes to Attributes (errors are logged)
+        from evennia.utils.dbserialize import flush_saves
+
+        flush_saves(raise_errors=False)
+
+        # write any buffered lines to the log files
+        logger.flush_log_files()
+
         if hasattr(self, "web_root"):  # not set very first start
             yield self.web_root.empty_threadpool()
 
@@ -15,6 +15,7 @@ There are two similar but separate stores of sessions:
 
 import time
 from codecs import decode as codecs_decode
+from collections import defaultdict
 
 from django.conf import settings
 from django.utils.translation import gettext as _
@@ -805,8 +806,7 @@ class ServerSessionHandler(SessionHandler):
             message (str): Message to send.
 
         """
-        for session in self.values():
-            self.data_out(session, text=message)
+        self.data_out_multicast(self.values(), text=message)
 
     def data_out(self, session, **kwargs):
         """
@@ -826,6 +826,41 @@ class ServerSessionHandler(SessionHandler):
         # send across AMP
         evennia.EVENNIA_SERVER_SERVICE.amp_protocol.send_MsgServer2Portal(session, **kwargs)
 
+    def data_out_multicast(self, sessions, **kwargs):
+        """
+        Sending the same data Server -> Portal for many sessions. The data is
+        only cleaned and sent across the wire once (per session encoding), with
+        the Portal relaying it to each session.
+
+        Args:
+            sessions (list): Sessions to relay to.
+            text (str, optional): text data to return
+
+        Notes:
+            If outgoing messages are parsed with the funcparser, the result may
+            be different for every session, so each session will then get its own
+            `data_out` call.
+
+        """
+        if _FUNCPARSER_PARSE_OUTGOING_MESSAGES_ENABLED:
+            for session in sessions:
+                self.data_out(session, **kwargs)
+            return
+
+        # the cleaned data only differs with the encoding of the session
+        encodings = defaultdict(list)
+        for session in sessions:
+            encodings[session.protocol_flags.get("ENCODING")].append(session)
+
+        for sessions in encodings.values():
+            # clean output for sending (this pops options, so we pass a copy)
+            cleaned_kwargs = self.clean_senddata(sessions[0], dict(kwargs))
+
+            # send across AMP
+            evennia.EVENNIA_SERVER_SERVICE.amp_protocol.send_MsgServer2PortalMulticast(
+                sessions, **cleaned_kwargs
+            )
+
     def get_inputfuncs(self):
         """
         Get all registered inputfuncs (access function)
@@ -94,6 +94,51 @@ class TestAMPClientSend(_TestAMP):
             self.portalsession, text={"foo": "bar"}
         )
 
+    def test_msgserver2portal_multicast(self, mocktransport):
+        portalsession2 = session.Session()
+        portalsession2.sessid = 2
+        evennia.PORTAL_SESSION_HANDLER[2] = portalsession2
+        session2 = MagicMock()
+        session2.sessid = 2
+
+        self._connect_client(mocktransport)
+        self.amp_client.send_MsgServer2PortalMulticast(
+            [self.session, session2], text={"foo": "bar"}
+        )
+        wire_data = self._catch_wire_read(mocktransport)
+        self.assertEqual(len(wire_data), 1)
+
+        self._connect_server(mocktransport)
+        self.amp_server.dataReceived(wire_data[0])
+        evennia.PORTAL_SESSION_HANDLER.data_out.assert_any_call(
+            self.portalsession, text={"foo": "bar"}
+        )
+        evennia.PORTAL_SESSION_HANDLER.data_out.assert_any_call(portalsession2, text={"foo": "bar"})
+
+    @patch("evennia.server.amp_client._SESSION_OUTPUT_BATCHING", True)
+    def test_msgserver2portal_batch(self, mocktransport):
+        self._connect_client(mocktransport)
+        self.amp_client.send_MsgServer2Portal(self.session, text="foo", prompt=">")
+        self.amp_client.send_MsgServer2Portal(self.session, text="bar")
+        self.assertEqual(self._catch_wire_read(mocktransport), [])
+
+        self.amp_client.flush_output()
+        wire_data = self._catch_wire_read(mocktransport)
+        self.assertEqual(len(wire_data), 1)
+        self.assertIsNone(self.amp_client.output_flush_task)
+
+        self._connect_server(mocktransport)
+        self.amp_server.dataReceived(wire_data[0])
+        # the prompt is moved last
+        self.assertEqual(
+            evennia.PORTAL_SESSION_HANDLER.data_out.call_args_list,
+            [
+                ((self.portalsession,), {"text": "foo"}),
+                ((self.portalsession,), {"text": "bar"}),
+                ((self.portalsession,), {"prompt": ">"}),
+            ],
+        )
+
     def test_adminserver2portal(self, mocktransport):
         self._connect_client(mocktransport)
 
@@ -67,6 +67,15 @@ SSL_CERTIFICATE_ISSUER = {
 # server-side (see INPUT_FUNC_MODULES). TELNET_ENABLED is required for this
 # to work.
 TELNET_OOB_ENABLED = False
+# zlib compression level (0-9) and memory level (1-9) used for telnet clients
+# supporting MCCP (compression). Higher values compress (slightly) better at
+# the cost of more Portal CPU and memory per connected session.
+MCCP_COMPRESSION_LEVEL = 6
+MCCP_MEMLEVEL = 8
+# If set, MCCP output written to a session during one reactor iteration is
+# flushed to the client together rather than line by line. This saves CPU and
+# bandwidth when many lines are sent at once, with no added delay.
+MCCP_MERGE_WRITES = False
 # Activate SSH protocol communication (SecureShell)
 SSH_ENABLED = False
 # Ports to use for SSH
@@ -132,6 +141,18 @@ EVENNIA_ADMIN = True
 AMP_HOST = "localhost"
 AMP_PORT = 4006
 AMP_INTERFACE = "127.0.0.1"
+# Data sent between Portal and Server is compressed with zlib. Data shorter than
+# this (in bytes) is sent uncompressed, since compressing it costs more CPU than it
+# saves. The compression level goes from 1 (fastest) to 9 (smallest).
+AMP_COMPRESSION_THRESHOLD = 256
+AMP_COMPRESSION_LEVEL = 6
+# Prime the compression with a dictionary of common message fragments. This
+# makes also shorter messages compress well.
+AMP_COMPRESSION_DICTIONARY = True
+# Buffer all output to a session during one reactor iteration (such as all messages
+# sent by one command) and send it to the Portal in one go, instead of sending
+# each message separately. Prompts are always sent last.
+SESSION_OUTPUT_BATCHING = False
 
 
 # Path to the lib directory containing the bulk of the codebase's code.
@@ -171,6 +192,13 @@ CHANNEL_LOG_NUM_TAIL_LINES = 20
 # Max size (in bytes) of channel log files before they rotate.
 # Minimum is 1000 (1kB) but should usually be larger.
 CHANNEL_LOG_ROTATE_SIZE = 1000000
+# Lines written with `logger.log_file` (such as channel logs) are buffered in
+# memory and written to each file in one go every LOG_FILE_FLUSH_INTERVAL seconds,
+# or as soon as a file has LOG_FILE_BUFFER_SIZE characters waiting. All buffered
+# lines are written on server shutdown. Set the interval to 0 to start writing
+# every line right away.
+LOG_FILE_FLUSH_INTERVAL = 0.5
+LOG_FILE_BUFFER_SIZE = 65536
 # Unused by default, but used by e.g. the MapSystem contrib. A place for storing
 # semi-permanent data and avoid it being rebuilt over and over. It is created
 # on-demand only.
@@ -216,30 +244,36 @@ MXP_ENABLED = True
 # allow malevolent players to lure others to execute commands they did not
 # intend to.
 MXP_OUTGOING_ONLY = True
+# The webclient converts text to HTML for every receiving session. The converted
+# HTML of this many recent texts is kept for re-use, so a message sent to many
+# webclient sessions (like on a channel) is only converted once. Set to 0 to
+# turn off.
+TEXT2HTML_CACHE_SIZE = 1000
 # Database objects are cached in what is known as the idmapper. The idmapper
 # caching results in a massive speedup of the server (since it dramatically
 # limits the number of database accesses needed) and also allows for
 # storing temporary data on objects. It is however also the main memory
-# consumer of Evennia. With this setting the cache can be capped and
-# flushed when it reaches a certain size. Minimum is 50 MB but it is
-# not recommended to set this to less than 100 MB for a distribution
-# system.
-# Empirically, N_objects_in_cache ~ ((RMEM - 35) / 0.0157):
-#  mem(MB)   |  objs in cache   ||   mem(MB)   |   objs in cache
-#      50    |       ~1000      ||      800    |     ~49 000
-#     100    |       ~4000      ||     1200    |     ~75 000
-#     200    |      ~10 000     ||     1600    |    ~100 000
-#     500    |      ~30 000     ||     2000    |    ~125 000
-# Note that the estimated memory usage is not exact (and the cap is only
-# checked every 5 minutes), so err on the side of caution if
-# running on a server with limited memory. Also note that Python
-# will not necessarily return the memory to the OS when the idmapper
-# flashes (the memory will be freed and made available to the Python
+# consumer of Evennia. With this setting the cache can be capped; when
+# the memory use of the Server process gets within 10% of this, the least
+# recently used objects are evicted from the cache (objects with connected
+# Sessions or non-persistent Attributes are never evicted). Minimum is 50 MB
+# but it is not recommended to set this to less than 100 MB for a
+# distribution system.
+# Note that the cap is only checked every 5 minutes, so err on the side
+# of caution if running on a server with limited memory. Also note that
+# Python will not necessarily return the memory to the OS when the idmapper
+# evicts objects (the memory will be freed and made available to the Python
 # process only). How many objects need to be in memory at any given
 # time depends very much on your game so some experimentation may
 # be necessary (use @server to see how many objects are in the idmapper
 # cache at any time). Setting this to None disables the cache cap.
 IDMAPPER_CACHE_MAXSIZE = 400  # (MB)
+# The fraction of each model's cached objects to keep when the cache is
+# reduced because of IDMAPPER_CACHE_MAXSIZE.
+IDMAPPER_CACHE_LOW_WATERMARK = 0.6
+# Callable returning the current memory use of the Server process in MB
+# (or None if it can't be determined), used to check IDMAPPER_CACHE_MAXSIZE.
+IDMAPPER_MEMORY_PROBE = "evennia.utils.idmapper.models.get_memory_usage"
 # This determines how many connections per second the Portal should
 # accept, as a DoS countermeasure. If the rate exceeds this number, incoming
 # connections will be queued to this rate, so none will be lost.
@@ -575,6 +609,20 @@ START_LOCATION = "#2"
 # out of sync between the processes. Keep on unless you face such
 # issues.
 TYPECLASS_AGGRESSIVE_CACHE = True
+# Re-use the unpickled value of an Attribute until it changes, instead of
+# unpickling it on every access. This speeds up reading Attributes a lot, but
+# all reads then return the same object. So in-place changes to mutables that
+# don't save automatically (like a dict inside a tuple) will be seen by later
+# reads even though they were never saved, and looping over an Attribute while
+# changing it must be done over a copy. Only activate if your code is ok with this.
+ATTRIBUTE_VALUE_CACHE = False
+# Changing a mutable stored in an Attribute in-place (like
+# obj.db.mylist.append(item)) normally re-pickles and saves the whole
+# Attribute on every change. If activated, the save is instead done once, at
+# the end of the current reactor iteration, no matter how many changes were
+# made. Changes made just before a server crash may then be lost. Batching
+# can also be done explicitly with `with obj.attributes.batch(): ...`.
+ATTRIBUTE_DEFERRED_SAVE = False
 # These are fallbacks for BASE typeclasses failing to load. Usually needed only
 # during doc building. The system expects these to *always* load correctly, so
 # only modify if you are making fundamental changes to how objects/accounts
@@ -681,6 +729,11 @@ HELP_CLICKABLE_TOPICS = True
 # so we need to make sure to tell Lunr to not filter them out by adding them here
 # (many are auto-added out of the box, this extends the list).
 LUNR_STOP_WORD_FILTER_EXCEPTIONS = []
+# Building the Lunr search index is slow, so help keeps this many built indexes
+# around for re-use. A new index is only built when the searchable topics
+# change (such as when a help entry is edited or a caller with different
+# access searches). Set to 0 to rebuild the index on every search.
+HELP_SEARCH_INDEX_CACHE_SIZE = 20
 
 ######################################################################
 # FuncParser
@@ -698,6 +751,10 @@ FUNCPARSER_ESCAPE_CHAR = "\\"
 # This is the global max nesting-level for nesting functions in
 # the funcparser. This protects against infinite loops.
 FUNCPARSER_MAX_NESTING = 20
+# How many parsed strings to keep as compiled templates, so that parsing
+# the same string again only needs to run the callables. Set to 0 to
+# disable the template cache.
+FUNCPARSER_TEMPLATE_CACHE_SIZE = 2000
 # Activate funcparser for all outgoing strings. The current Session
 # will be passed into the parser (used to be called inlinefuncs)
 FUNCPARSER_PARSE_OUTGOING_MESSAGES_ENABLED = False
@@ -727,6 +784,21 @@ GLOBAL_SCRIPTS = {
     # 'key': {'typeclass': 'typeclass.path.here',
     #         'repeats': -1, 'interval': 50, 'desc': 'Example script'},
 }
+# If non-zero, the TickerHandler spreads the subscribers of each interval over
+# this many evenly spaced phase buckets, calling one bucket every
+# interval/buckets seconds instead of all subscribers at once. This avoids
+# long reactor stalls when many objects tick on the same interval.
+TICKER_HANDLER_PHASE_BUCKETS = 0
+# When using phase buckets, the ticker hands control back to the reactor
+# (letting e.g. player input through) whenever it has spent this many seconds
+# calling subscribers without a break.
+TICKER_HANDLER_SLICE_BUDGET = 0.05
+# The TickerHandler and the TaskHandler (persistent `utils.delay` calls) store
+# one database entry per ticker/task, and write the changed entries this many
+# seconds after a change, so that a burst of changes is written in one go.
+# Pending changes are always saved on reload/shutdown.
+# Set to 0 to save immediately on every change.
+HANDLER_SAVE_DELAY = 2.0
 
 ######################################################################
 # Default Account setup and access
@@ -16,14 +16,36 @@ from copy import copy
 
 from django.conf import settings
 from django.db import models
+from django.db.models.signals import pre_delete
 from django.utils.encoding import smart_str
 from evennia.locks.lockhandler import LockHandler
-from evennia.utils.dbserialize import from_pickle, to_pickle
+from evennia.utils.dbserialize import (
+    batch_saves,
+    discard_pending_save,
+    from_pickle,
+    get_pending_save,
+    has_packed_references,
+    has_packed_sessions,
+    to_pickle,
+)
 from evennia.utils.idmapper.models import SharedMemoryModel
 from evennia.utils.picklefield import PickledObjectField
 from evennia.utils.utils import is_iter, lazy_property, make_iter, to_str
 
 _TYPECLASS_AGGRESSIVE_CACHE = settings.TYPECLASS_AGGRESSIVE_CACHE
+_ATTRIBUTE_VALUE_CACHE = settings.ATTRIBUTE_VALUE_CACHE
+
+# counts database-object deletions. Cached Attribute values referencing database
+# objects are only re-used if nothing was deleted since they were cached.
+_DELETIONS = 0
+
+
+def _count_deletion(sender, **kwargs):
+    global _DELETIONS
+    _DELETIONS += 1
+
+
+pre_delete.connect(_count_deletion, dispatch_uid="evennia.attributes.count_deletion")
 
 # -------------------------------------------------------------
 #
@@ -440,20 +462,59 @@ class Attribute(IAttribute, SharedMemoryModel):
     def value(self):
         """
         Getter. Allows for `value = self.value`.
-        We cannot cache here since it makes certain cases (such
-        as storing a dbobj which is then deleted elsewhere) out-of-sync.
-        The overhead of unpickling seems hard to avoid.
-        """
-        return from_pickle(self.db_value, db_obj=self)
+
+        With `settings.ATTRIBUTE_VALUE_CACHE`, the unpickled value is re-used
+        until `db_value` changes. Since a stored dbobj may be deleted elsewhere,
+        a cached value referencing dbobjs is only re-used if no database object
+        was deleted since it was cached. Values referencing Sessions are never
+        cached, since a Session may disconnect at any time.
+
+        A value with batched/deferred changes not yet saved (see
+        `evennia.utils.dbserialize.batch_saves`) is returned as-is.
+        """
+        pending = get_pending_save(self)
+        if pending is not None:
+            return pending
+        if not _ATTRIBUTE_VALUE_CACHE:
+            return from_pickle(self.db_value, db_obj=self)
+        db_value = self.db_value
+        cache = getattr(self, "_value_cache", None)
+        if cache and cache[0] is db_value and (cache[1] is None or cache[1] == _DELETIONS):
+            return cache[2]
+        value = from_pickle(db_value, db_obj=self)
+        self._cache_value(db_value, value)
+        return value
 
     @value.setter
     def value(self, new_value):
         """
-        Setter. Allows for self.value = value. We cannot cache here,
-        see self.__value_get.
+        Setter. Allows for self.value = value. This also updates the
+        value cache, see self.value.
         """
+        discard_pending_save(self)
         self.db_value = to_pickle(new_value)
         self.save(update_fields=["db_value"])
+        if _ATTRIBUTE_VALUE_CACHE:
+            self._value_cache = None
+            if getattr(new_value, "_db_obj", None) is self and not has_packed_references(
+                self.db_value
+            ):
+                # a _Saver* structure saving itself is still our current value. If
+                # it held references, pickling may have changed it in-place
+                # (`__serialize_dbobjs__`), so then it must be unpickled anew.
+                self._value_cache = (self.db_value, None, new_value)
+
+    def _cache_value(self, db_value, value):
+        """
+        Cache the unpickled `value` of `db_value`, unless it references Sessions.
+
+        """
+        if not has_packed_references(db_value):
+            self._value_cache = (db_value, None, value)
+        elif has_packed_sessions(db_value):
+            self._value_cache = None
+        else:
+            self._value_cache = (db_value, _DELETIONS, value)
 
     @value.deleter
     def value(self):
@@ -483,7 +544,10 @@ class IAttributeBackend:
         self.obj = handler.obj
         self._attrtype = attrtype
         self._objid = handler.obj.id
+        # (key, category) -> attr (or None, for known-missing Attributes)
         self._cache = {}
+        # category -> {key: attr}, mirrors the non-None entries of _cache
+        self._catindex = defaultdict(dict)
         # store category names fully cached
         self._catcache = {}
         # full cache was run on all attributes
@@ -529,12 +593,49 @@ class IAttributeBackend:
         if not _TYPECLASS_AGGRESSIVE_CACHE:
             return
         attrs = self.query_all()
-        self._cache = {
-            f"{to_str(attr.key).lower()}-{attr.category.lower() if attr.category else None}": attr
-            for attr in attrs
-        }
+        self._cache = {}
+        self._catindex = defaultdict(dict)
+        for attr in attrs:
+            self._cache_attr(
+                to_str(attr.key).lower(), attr.category.lower() if attr.category else None, attr
+            )
         self._cache_complete = True
 
+    def _cache_attr(self, key, category, attr):
+        """
+        Store an Attribute (or the fact that it does not exist) in the cache
+        and keep the category index in sync.
+
+        Args:
+            key (str): A cleaned key string.
+            category (str or None): A cleaned category name.
+            attr (IAttribute or None): The Attribute, or `None` to mark it as missing.
+
+        """
+        self._cache[(key, category)] = attr
+        if attr:
+            self._catindex[category][key] = attr
+        else:
+            self._uncache_attr(key, category, index_only=True)
+
+    def _uncache_attr(self, key, category, index_only=False):
+        """
+        Remove an Attribute from the cache and the category index.
+
+        Args:
+            key (str): A cleaned key string.
+            category (str or None): A cleaned category name.
+            index_only (bool, optional): Only remove it from the category index.
+
+        """
+        if not index_only:
+            self._cache.pop((key, category), None)
+        catattrs = self._catindex.get(category)
+        if catattrs is not None:
+            catattrs.pop(key, None)
+            if not catattrs:
+                del self._catindex[category]
+
     def _get_cache_key(self, key, category):
         """
         Fetch cache key.
@@ -546,10 +647,9 @@ class IAttributeBackend:
         Returns:
             attribute (IAttribute): A single Attribute.
         """
-        cachekey = "%s-%s" % (key, category)
         cachefound = False
         try:
-            attr = _TYPECLASS_AGGRESSIVE_CACHE and self._cache[cachekey]
+            attr = _TYPECLASS_AGGRESSIVE_CACHE and self._cache[(key, category)]
             cachefound = True
         except KeyError:
             attr = None
@@ -558,7 +658,7 @@ class IAttributeBackend:
             # clear out Attributes deleted from elsewhere. We must search this anew.
             attr = None
             cachefound = False
-            del self._cache[cachekey]
+            self._uncache_attr(key, category)
         if cachefound and _TYPECLASS_AGGRESSIVE_CACHE:
             if attr:
                 return [attr]  # return cached entity
@@ -569,14 +669,14 @@ class IAttributeBackend:
             if conn:
                 attr = conn[0].attribute
                 if _TYPECLASS_AGGRESSIVE_CACHE:
-                    self._cache[cachekey] = attr
+                    self._cache_attr(key, category, attr)
                 return [attr] if attr.pk else []
             else:
                 # There is no such attribute. We will explicitly save that
                 # in our cache to avoid firing another query if we try to
                 # retrieve that (non-existent) attribute again.
                 if _TYPECLASS_AGGRESSIVE_CACHE:
-                    self._cache[cachekey] = None
+                    self._cache_attr(key, category, None)
                 return []
 
     def _get_cache_category(self, category):
@@ -589,19 +689,17 @@ class IAttributeBackend:
         Returns:
             attrs (list): The discovered Attributes.
         """
-        catkey = "-%s" % category
-        if _TYPECLASS_AGGRESSIVE_CACHE and catkey in self._catcache:
-            return [attr for key, attr in self._cache.items() if key.endswith(catkey) and attr]
+        if _TYPECLASS_AGGRESSIVE_CACHE and (self._cache_complete or category in self._catcache):
+            return list(self._catindex.get(category, {}).values())
         else:
             # we have to query to make this category up-date in the cache
             attrs = self.query_category(category)
             if _TYPECLASS_AGGRESSIVE_CACHE:
                 for attr in attrs:
                     if attr.pk:
-                        cachekey = "%s-%s" % (attr.key, category)
-                        self._cache[cachekey] = attr
+                        self._cache_attr(to_str(attr.key).lower(), category, attr)
                 # mark category cache as up-to-date
-                self._catcache[catkey] = True
+                self._catcache[category] = True
             return attrs
 
     def _get_cache(self, key=None, category=None):
@@ -661,11 +759,9 @@ class IAttributeBackend:
             return
         if not key:  # don't allow an empty key in cache
             return
-        cachekey = "%s-%s" % (key, category)
-        catkey = "-%s" % category
-        self._cache[cachekey] = attr_obj
+        self._cache_attr(key, category, attr_obj)
         # mark that the category cache is no longer up-to-date
-        self._catcache.pop(catkey, None)
+        self._catcache.pop(category, None)
         self._cache_complete = False
 
     def _delete_cache(self, key, category):
@@ -677,18 +773,13 @@ class IAttributeBackend:
             category (str or None): A cleaned category name
 
         """
-        catkey = "-%s" % category
         if key:
-            cachekey = "%s-%s" % (key, category)
-            self._cache.pop(cachekey, None)
+            self._uncache_attr(key, category)
         else:
-            self._cache = {
-                key: attrobj
-                for key, attrobj in list(self._cache.items())
-                if not key.endswith(catkey)
-            }
+            for catkey in self._catindex.pop(category, {}):
+                self._cache.pop((catkey, category), None)
         # mark that the category cache is no longer up-to-date
-        self._catcache.pop(catkey, None)
+        self._catcache.pop(category, None)
         self._cache_complete = False
 
     def reset_cache(self):
@@ -697,6 +788,7 @@ class IAttributeBackend:
         """
         self._cache_complete = False
         self._cache = {}
+        self._catindex = defaultdict(dict)
         self._catcache = {}
 
     def do_create_attribute(self, key, category, lockstring, value, strvalue):
@@ -893,9 +985,9 @@ class IAttributeBackend:
             self._full_cache()
 
         if category is not None:
-            attrs = [attr for attr in self._cache.values() if attr.category == category]
+            attrs = list(self._catindex.get(category, {}).values())
         else:
-            attrs = self._cache.values()
+            attrs = [attr for catattrs in self._catindex.values() for attr in catattrs.values()]
 
         if accessing_obj:
             self.do_batch_delete(
@@ -921,7 +1013,10 @@ class IAttributeBackend:
         if _TYPECLASS_AGGRESSIVE_CACHE:
             if not self._cache_complete:
                 self._full_cache()
-            return sorted([attr for attr in self._cache.values() if attr], key=lambda o: o.id)
+            return sorted(
+                [attr for catattrs in self._catindex.values() for attr in catattrs.values()],
+                key=lambda o: o.id,
+            )
         else:
             return sorted([attr for attr in self.query_all() if attr], key=lambda o: o.id)
 
@@ -1327,6 +1422,23 @@ class AttributeHandler:
         """
         self.backend.batch_add(*args, **kwargs)
 
+    def batch(self):
+        """
+        Context manager for batching in-place changes to mutable Attribute
+        values, such as `obj.db.mylist.append(item)`. Rather than re-saving
+        the Attribute on every change, each changed Attribute is saved once,
+        when the block exits (also if it exits with an error).
+
+        Returns:
+            contextmanager: Use as `with obj.attributes.batch(): ...`.
+
+        Notes:
+            This batches changes to all Attributes done in the block, not
+            only those on this object. See `evennia.utils.dbserialize.batch_saves`.
+
+        """
+        return batch_saves()
+
     def remove(
         self,
         key=None,
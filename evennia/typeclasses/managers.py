@@ -294,9 +294,12 @@ class TypedObjectManager(idmapper.manager.SharedMemoryManager):
         unique_categories = set(categories)
         n_unique_categories = len(unique_categories)
 
+        # tags are stored in lowercase (see create_tag), so we can match them exactly
+        # rather than with case-insensitive lookups, which can't use the indexes.
         dbmodel = self.model.__dbclass__.__name__.lower()
+        tagtype = tagtype.lower() if tagtype else None
         query = (
-            self.filter(db_tags__db_tagtype__iexact=tagtype, db_tags__db_model__iexact=dbmodel)
+            self.filter(db_tags__db_tagtype=tagtype, db_tags__db_model=dbmodel)
             .distinct()
             .order_by("id")
         )
@@ -316,13 +319,16 @@ class TypedObjectManager(idmapper.manager.SharedMemoryManager):
             clauses = Q()
             for ikey, key in enumerate(keys):
                 # ANY mode; must match any one of the given tags/categories
-                clauses |= Q(db_key__iexact=key, db_category__iexact=categories[ikey])
+                category = categories[ikey]
+                clauses |= Q(
+                    db_key=str(key).lower(), db_category=category.lower() if category else None
+                )
         else:
             # only one or more categories given
             clauses = Q()
             # ANY mode; must match any one of them
             for category in unique_categories:
-                clauses |= Q(db_category__iexact=category)
+                clauses |= Q(db_category=category.lower())
 
         tags = _Tag.objects.filter(clauses)
         query = query.filter(db_tags__in=tags).annotate(
@@ -390,6 +396,10 @@ class TypedObjectManager(idmapper.manager.SharedMemoryManager):
 
         """
         data = str(data) if data is not None else None
+        # tags are always stored in lowercase
+        key = key.strip().lower() if key is not None else None
+        category = category.strip().lower() if category and key is not None else None
+        tagtype = tagtype.strip().lower() if tagtype is not None else None
         # try to get old tag
 
         dbmodel = self.model.__dbclass__.__name__.lower()
@@ -406,11 +416,11 @@ class TypedObjectManager(idmapper.manager.SharedMemoryManager):
             if not _Tag:
                 from evennia.typeclasses.models import Tag as _Tag
             tag = _Tag.objects.create(
-                db_key=key.strip().lower() if key is not None else None,
-                db_category=category.strip().lower() if category and key is not None else None,
+                db_key=key,
+                db_category=category,
                 db_data=data,
                 db_model=dbmodel,
-                db_tagtype=tagtype.strip().lower() if tagtype is not None else None,
+                db_tagtype=tagtype,
             )
             tag.save()
         return make_iter(tag)[0]
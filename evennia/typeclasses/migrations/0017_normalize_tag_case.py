@@ -0,0 +1,80 @@
+# Tag keys, categories and tagtypes are looked up by exact (indexable) equality
+# with their lowercase form, which is how `create_tag` stores them. This converts
+# any Tags stored with other casing, merging them into an existing lowercase Tag
+# where there is one.
+
+from django.db import migrations
+
+
+def _normalize(value):
+    return value.lower() if value else value
+
+
+def normalize_tag_case(apps, schema_editor):
+    Tag = apps.get_model("typeclasses", "Tag")
+
+    # the m2m tables connecting Tags to objects, accounts, scripts etc
+    through_models = []
+    for model in apps.get_models():
+        for field in model._meta.local_many_to_many:
+            if field.remote_field.model is Tag:
+                through = field.remote_field.through
+                obj_field = next(
+                    fld.attname
+                    for fld in through._meta.fields
+                    if fld.is_relation and fld.related_model is not Tag
+                )
+                tag_field = next(
+                    fld.attname
+                    for fld in through._meta.fields
+                    if fld.is_relation and fld.related_model is Tag
+                )
+                through_models.append((through, obj_field, tag_field))
+
+    to_normalize = [
+        (tag_id, key, category, tagtype)
+        for tag_id, key, category, tagtype in Tag.objects.values_list(
+            "id", "db_key", "db_category", "db_tagtype"
+        ).iterator()
+        if (key, category, tagtype) != (_normalize(key), _normalize(category), _normalize(tagtype))
+    ]
+
+    for tag_id, key, category, tagtype in to_normalize:
+        tag = Tag.objects.get(id=tag_id)
+        tag.db_key, tag.db_category, tag.db_tagtype = (
+            _normalize(key),
+            _normalize(category),
+            _normalize(tagtype),
+        )
+        existing = (
+            Tag.objects.filter(
+                db_key=tag.db_key,
+                db_category=tag.db_category,
+                db_tagtype=tag.db_tagtype,
+                db_model=tag.db_model,
+            )
+            .exclude(id=tag_id)
+            .first()
+        )
+        if not existing:
+            tag.save(update_fields=["db_key", "db_category", "db_tagtype"])
+            continue
+        # merge into the existing Tag, without tagging anything twice
+        for through, obj_field, tag_field in through_models:
+            already_tagged = through.objects.filter(**{tag_field: existing.id}).values_list(
+                obj_field, flat=True
+            )
+            through.objects.filter(
+                **{tag_field: tag_id, f"{obj_field}__in": list(already_tagged)}
+            ).delete()
+            through.objects.filter(**{tag_field: tag_id}).update(**{tag_field: existing.id})
+        tag.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("typeclasses", "0016_alter_attribute_id_alter_tag_id"),
+    ]
+
+    operations = [migrations.RunPython(normalize_tag_case, migrations.RunPython.noop)]
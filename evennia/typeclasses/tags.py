@@ -49,6 +49,9 @@ class Tag(models.Model):
     this uses the 'aliases' tag category, which is also checked by the
     default search functions of Evennia to allow quick searches by alias.
 
+    The key, category and tagtype are always stored in lowercase. This
+    allows the searches to match them exactly, using the database indexes.
+
     """
 
     db_key = models.CharField(
@@ -307,7 +310,10 @@ class TagHandler(object):
         self.obj = obj
         self._objid = obj.id
         self._model = obj.__dbclass__.__name__.lower()
+        # (key, category) -> tag
         self._cache = {}
+        # category -> {key: tag}, mirrors _cache for fast category lookups
+        self._catindex = defaultdict(dict)
         # store category names fully cached
         self._catcache = {}
         # full cache was run on all tags
@@ -336,17 +342,12 @@ class TagHandler(object):
         if not _TYPECLASS_AGGRESSIVE_CACHE:
             return
         tags = self._query_all()
-        self._cache = dict(
-            (
-                "%s-%s"
-                % (
-                    to_str(tag.db_key).lower(),
-                    tag.db_category.lower() if tag.db_category else None,
-                ),
-                tag,
-            )
-            for tag in tags
-        )
+        self._cache = {}
+        self._catindex = defaultdict(dict)
+        for tag in tags:
+            key = to_str(tag.db_key).lower()
+            category = tag.db_category.lower() if tag.db_category else None
+            self._cache[(key, category)] = self._catindex[category][key] = tag
         self._cache_complete = True
 
     def _getcache(self, key=None, category=None):
@@ -375,12 +376,11 @@ class TagHandler(object):
         key = str(key).strip().lower() if key else None
         category = category.strip().lower() if category else None
         if key:
-            cachekey = "%s-%s" % (key, category)
-            tag = _TYPECLASS_AGGRESSIVE_CACHE and self._cache.get(cachekey, None)
+            tag = _TYPECLASS_AGGRESSIVE_CACHE and self._cache.get((key, category), None)
             if tag and (not hasattr(tag, "pk") and tag.pk is None):
                 # clear out Tags deleted from elsewhere. We must search this anew.
                 tag = None
-                del self._cache[cachekey]
+                self._uncache(key, category)
             if tag:
                 return [tag]  # return cached entity
             else:
@@ -388,29 +388,28 @@ class TagHandler(object):
                     "%s__id" % self._model: self._objid,
                     "tag__db_model": self._model,
                     "tag__db_tagtype": self._tagtype,
-                    "tag__db_key__iexact": key.lower(),
-                    "tag__db_category__iexact": category.lower() if category else None,
+                    "tag__db_key": key,
+                    "tag__db_category": category,
                 }
                 conn = getattr(self.obj, self._m2m_fieldname).through.objects.filter(**query)
                 if conn:
                     tag = conn[0].tag
                     if _TYPECLASS_AGGRESSIVE_CACHE:
-                        self._cache[cachekey] = tag
+                        self._cache[(key, category)] = self._catindex[category][key] = tag
                     return [tag]
         else:
             # only category given (even if it's None) - we can't
             # assume the cache to be complete unless we have queried
             # for this category before
-            catkey = "-%s" % category
-            if _TYPECLASS_AGGRESSIVE_CACHE and catkey in self._catcache:
-                return [tag for key, tag in self._cache.items() if key.endswith(catkey)]
+            if _TYPECLASS_AGGRESSIVE_CACHE and (self._cache_complete or category in self._catcache):
+                return list(self._catindex.get(category, {}).values())
             else:
                 # we have to query to make this category up-date in the cache
                 query = {
                     "%s__id" % self._model: self._objid,
                     "tag__db_model": self._model,
                     "tag__db_tagtype": self._tagtype,
-                    "tag__db_category__iexact": category.lower() if category else None,
+                    "tag__db_category": category,
                 }
                 tags = [
                     conn.tag
@@ -420,10 +419,10 @@ class TagHandler(object):
                 ]
                 if _TYPECLASS_AGGRESSIVE_CACHE:
                     for tag in tags:
-                        cachekey = "%s-%s" % (tag.db_key, category)
-                        self._cache[cachekey] = tag
+                        key = to_str(tag.db_key).lower()
+                        self._cache[(key, category)] = self._catindex[category][key] = tag
                     # mark category cache as up-to-date
-                    self._catcache[catkey] = True
+                    self._catcache[category] = True
                 return tags
         return []
 
@@ -445,13 +444,27 @@ class TagHandler(object):
             str(key).strip().lower(),
             category.strip().lower() if category else category,
         )
-        cachekey = "%s-%s" % (key, category)
-        catkey = "-%s" % category
-        self._cache[cachekey] = tag_obj
+        self._cache[(key, category)] = self._catindex[category][key] = tag_obj
         # mark that the category cache is no longer up-to-date
-        self._catcache.pop(catkey, None)
+        self._catcache.pop(category, None)
         self._cache_complete = False
 
+    def _uncache(self, key, category):
+        """
+        Remove a single tag from the cache and the category index.
+
+        Args:
+            key (str): A cleaned key string
+            category (str or None): A cleaned category name
+
+        """
+        self._cache.pop((key, category), None)
+        cattags = self._catindex.get(category)
+        if cattags is not None:
+            cattags.pop(key, None)
+            if not cattags:
+                del self._catindex[category]
+
     def _delcache(self, key, category):
         """
         Remove tag from cache
@@ -465,14 +478,13 @@ class TagHandler(object):
             str(key).strip().lower(),
             category.strip().lower() if category else category,
         )
-        catkey = "-%s" % category
         if key:
-            cachekey = "%s-%s" % (key, category)
-            self._cache.pop(cachekey, None)
+            self._uncache(key, category)
         else:
-            [self._cache.pop(key, None) for key in self._cache if key.endswith(catkey)]
+            for catkey in self._catindex.pop(category, {}):
+                self._cache.pop((catkey, category), None)
         # mark that the category cache is no longer up-to-date
-        self._catcache.pop(catkey, None)
+        self._catcache.pop(category, None)
         self._cache_complete = False
 
     def reset_cache(self):
@@ -482,6 +494,7 @@ class TagHandler(object):
         """
         self._cache_complete = False
         self._cache = {}
+        self._catindex = defaultdict(dict)
         self._catcache = {}
 
     def add(self, key=None, category=None, data=None):
@@ -664,9 +677,7 @@ class TagHandler(object):
         if category:
             query["tag__db_category"] = category.strip().lower()
         getattr(self.obj, self._m2m_fieldname).through.objects.filter(**query).delete()
-        self._cache = {}
-        self._catcache = {}
-        self._cache_complete = False
+        self.reset_cache()
 
     def all(self, return_key_and_category=False, return_objs=False):
         """
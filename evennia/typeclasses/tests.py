@@ -81,6 +81,43 @@ class TestAttributes(BaseEvenniaTest):
         self.assertEqual(self.obj1.attributes.get("testattr"), value)
         self.assertFalse(self.obj1.attributes.backend._cache)
 
+    @patch("evennia.typeclasses.attributes._ATTRIBUTE_VALUE_CACHE", True)
+    def test_attribute_value_cache(self):
+        self.obj1.db.stats = {"hp": 10}
+        attrobj = self.obj1.attributes.get("stats", return_obj=True)
+        value = attrobj.value
+        with patch("evennia.typeclasses.attributes.from_pickle") as mock_from_pickle:
+            self.assertIs(attrobj.value, value)
+            self.assertIs(self.obj1.db.stats, value)
+            mock_from_pickle.assert_not_called()
+
+        # saving a mutable keeps it cached and stores it
+        self.obj1.db.stats["hp"] = 5
+        self.assertIs(self.obj1.db.stats, value)
+        self.assertEqual(attrobj.db_value, {"hp": 5})
+
+        # assigning a new value invalidates the cache
+        self.obj1.db.stats = {"hp": 20}
+        self.assertEqual(self.obj1.db.stats, {"hp": 20})
+        self.assertIsNot(self.obj1.db.stats, value)
+
+        # a cached value referencing a deleted dbobj is not re-used
+        self.obj1.db.target = [self.obj2]
+        self.assertEqual(self.obj1.db.target, [self.obj2])
+        self.obj2.delete()
+        self.assertEqual(self.obj1.db.target, [None])
+
+    @patch("evennia.typeclasses.attributes._ATTRIBUTE_VALUE_CACHE", True)
+    def test_attribute_value_cache_session(self):
+        import evennia
+
+        self.obj1.db.session = self.session
+        self.assertEqual(self.obj1.db.session, self.session)
+        # the session disconnects
+        with patch.dict(evennia.SESSION_HANDLER):
+            del evennia.SESSION_HANDLER[self.session.sessid]
+            self.assertIsNone(self.obj1.db.session)
+
     def test_weird_text_save(self):
         "test 'weird' text type (different in py2 vs py3)"
         from django.utils.safestring import SafeText
@@ -103,6 +140,29 @@ class TestAttributes(BaseEvenniaTest):
         self.assertEqual(attrobj.category, "category4")
         self.assertEqual(attrobj.locks.all(), ["attrread:id(1)"])
 
+    def test_category_index(self):
+        self.obj1.attributes.add("str", 10, category="stats")
+        self.obj1.attributes.add("dex", 12, category="stats")
+        self.obj1.attributes.add("sword", 1, category="inventory")
+        self.assertEqual(sorted(self.obj1.attributes.get(category="stats")), [10, 12])
+        with self.assertNumQueries(0):
+            self.assertEqual(sorted(self.obj1.attributes.get(category="stats")), [10, 12])
+            self.assertEqual(self.obj1.attributes.get("dex", category="stats"), 12)
+
+        self.obj1.attributes.remove("str", category="stats")
+        self.assertEqual(self.obj1.attributes.get(category="stats"), 12)
+        self.assertEqual(self.obj1.attributes.get(category="inventory"), 1)
+
+        # a full cache also answers category lookups
+        self.obj1.attributes.all()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.obj1.attributes.get(category="inventory"), 1)
+            self.assertEqual(self.obj1.attributes.get(category="nonexistent"), None)
+
+        self.obj1.attributes.clear(category="stats")
+        self.assertEqual(self.obj1.attributes.get(category="stats"), None)
+        self.assertEqual(self.obj1.attributes.get("sword", category="inventory"), 1)
+
     def test_value_vs_strvalue(self):
         self.obj1.attributes.add("test", "one")
         self.assertEqual(self.obj1.attributes.get("test"), "one")
@@ -204,6 +264,40 @@ class TestTypedObjectManager(BaseEvenniaTest):
             [],
         )
 
+    def test_get_by_tag_case_insensitive(self):
+        self.obj1.tags.add("TagA", "CategoryA")
+        self.obj1.aliases.add("MyAlias")
+        self.assertEqual(self._manager("get_by_tag", "tAGa", "cATEGORYa"), [self.obj1])
+        self.assertEqual(self._manager("get_by_tag", category="CATEGORYA"), [self.obj1])
+        self.assertEqual(self._manager("get_by_alias", "MYALIAS"), [self.obj1])
+        self.assertEqual(self._manager("get_objs_with_key_or_alias", "myALIAS"), [self.obj1])
+        # creating a tag with a different case re-uses the existing one
+        tag = self.obj1.__class__.objects.create_tag("TAGA", "categorya")
+        self.assertEqual(tag, self.obj1.tags.get("taga", category="categorya", return_tagobj=True))
+
+    def test_normalize_tag_case_migration(self):
+        from importlib import import_module
+
+        from django.apps import apps
+
+        from evennia.typeclasses.models import Tag
+
+        migration = import_module("evennia.typeclasses.migrations.0017_normalize_tag_case")
+        self.obj1.tags.add("tag1", "category1")
+        upper_tag = Tag.objects.create(db_key="TAG1", db_category="Category1", db_model="objectdb")
+        other_tag = Tag.objects.create(db_key="Tag2", db_model="objectdb")
+        self.obj1.db_tags.add(upper_tag, other_tag)
+        self.obj2.db_tags.add(upper_tag)
+
+        migration.normalize_tag_case(apps, None)
+
+        self.assertFalse(Tag.objects.filter(id=upper_tag.id).exists())
+        other_tag.refresh_from_db()
+        self.assertEqual(other_tag.db_key, "tag2")
+        self.obj1.tags.reset_cache()
+        self.assertEqual(sorted(self.obj1.tags.all()), ["tag1", "tag2"])
+        self.assertEqual(self.obj2.tags.get("tag1", category="category1"), "tag1")
+
     def test_batch_add(self):
         tags = ["tag1", ("tag2", "category2"), "tag3", ("tag4", "category4", "data4")]
         self.obj1.tags.batch_add(*tags)
@@ -315,6 +409,17 @@ class TestTags(BaseEvenniaTest):
         self.obj1.tags.add("tagC", "categoryC")
         self.assertFalse(self.obj1.tags.has(category="categoryD"))
 
+    def test_tag_category_index(self):
+        self.obj1.tags.add(["tagA", "tagB"], category="categoryA")
+        self.obj1.tags.add("tagC", category="categoryC")
+        self.assertEqual(sorted(self.obj1.tags.get(category="categoryA")), ["taga", "tagb"])
+        with self.assertNumQueries(0):
+            self.assertEqual(sorted(self.obj1.tags.get(category="categoryA")), ["taga", "tagb"])
+            self.assertEqual(self.obj1.tags.get("tagC", category="categoryC"), "tagc")
+        self.obj1.tags.remove("tagA", category="categoryA")
+        self.assertEqual(self.obj1.tags.get(category="categoryA"), "tagb")
+        self.assertEqual(self.obj1.tags.get(category="categoryC"), "tagc")
+
     def test_integer_tag(self):
         self.obj1.tags.add(1)
         self.assertTrue(self.obj1.tags.has(1))
@@ -127,6 +127,11 @@ ANSI_ESCAPES = ("{{", r"\\", r"\|\|")
 
 _PARSE_CACHE = OrderedDict()
 _PARSE_CACHE_SIZE = 10000
+# tokenized strings, re-used when rendering the same string with other options
+_TOKEN_CACHE = OrderedDict()
+_TOKEN_CACHE_SIZE = 1000
+# max number of distinct rendered color markups to remember
+_RENDERED_MARKUP_CACHE_SIZE = 10000
 
 _COLOR_NO_DEFAULT = settings.COLOR_NO_DEFAULT
 
@@ -252,6 +257,31 @@ class ANSIParser(object):
     mxp_sub = re.compile(mxp_re, re.DOTALL)
     mxp_url_sub = re.compile(mxp_url_re, re.DOTALL)
 
+    # all color markup, for finding it in one pass. At the same position, the
+    # kinds of markup take precedence in this order.
+    markup_regexes = {
+        "hex": hex_sub,
+        "fg": xterm256_fg_sub,
+        "bg": xterm256_bg_sub,
+        "gfg": xterm256_gfg_sub,
+        "gbg": xterm256_gbg_sub,
+        "ansi": ansi_sub,
+    }
+    markup_sub = re.compile(
+        "|".join(f"(?P<{kind}>{regex.pattern})" for kind, regex in markup_regexes.items()),
+        re.DOTALL,
+    )
+    # all default markup starts with |, so only those positions need to be checked
+    markup_prefix = (
+        "|"
+        if all(tup[0].startswith("|") for tup in ansi_map)
+        and all(
+            regex.startswith(r"\|")
+            for regex in xterm256_fg + xterm256_bg + xterm256_gfg + xterm256_gbg
+        )
+        else ""
+    )
+
     # used by regex replacer to correctly map ansi sequences
     ansi_map_dict = dict(ansi_map)
     ansi_xterm256_bright_bg_map_dict = dict(ansi_xterm256_bright_bg_map)
@@ -267,6 +297,10 @@ class ANSIParser(object):
     # tabs/linebreaks |/ and |- should be able to be cleaned
     unsafe_tokens = re.compile(r"\|\/|\|-", re.DOTALL)
 
+    def __init__(self):
+        # {((kind, markup), xterm256, truecolor): ansi sequence}, re-used between strings
+        self._rendered_markup = {}
+
     def sub_ansi(self, ansimatch):
         """
         Replacer used by `re.sub` to replace ANSI
@@ -410,6 +444,108 @@ class ANSIParser(object):
                 case ((1 | 2), 0, (1 | 2)):
                     return ANSI_BACK_MAGENTA if background else ANSI_NORMAL + ANSI_MAGENTA
 
+    def tokenize(self, string):
+        """
+        Split a string into plain text and color markup, to be rendered with `render`.
+
+        Args:
+            string (str): The string to tokenize.
+
+        Returns:
+            list: A list of plain-text strings and `(kind, markup)` tuples for color markup,
+            where `kind` is one of `"hex"`, `"fg"`, `"bg"`, `"gfg"`, `"gbg"` or `"ansi"`.
+
+        """
+        if any(brightbg in string for brightbg in self.ansi_xterm256_bright_bg_map_dict):
+            # pre-convert bright colors to xterm256 color tags
+            string = self.brightbg_sub.sub(self.sub_brightbg, string)
+
+        tokens = []
+        markup_match = self.markup_sub.match
+        prefix = self.markup_prefix
+        parts = self.ansi_escapes.split(string) + [" "]
+        for part, sep in zip(parts[::2], parts[1::2]):
+            pos = 0
+            istart = part.find(prefix)
+            while istart >= 0:
+                match = markup_match(part, istart)
+                if match:
+                    if istart > pos:
+                        tokens.append(part[pos:istart])
+                    tokens.append((match.lastgroup, match.group()))
+                    pos = match.end()
+                    istart = part.find(prefix, pos)
+                else:
+                    istart = part.find(prefix, istart + 1)
+            if pos < len(part):
+                tokens.append(part[pos:])
+            # escaped markup is kept as a single character
+            sep = sep[0].strip()
+            if sep:
+                tokens.append(sep)
+        return tokens
+
+    def render(self, tokens, xterm256=False, truecolor=False):
+        """
+        Render tokenized markup to ANSI sequences.
+
+        Args:
+            tokens (list): Tokens from `tokenize`.
+            xterm256 (bool, optional): If xterm256 colors should be used, or be converted to
+                16-color ANSI.
+            truecolor (bool, optional): If hex colors should be rendered as truecolor, or be
+                converted to xterm256 colors.
+
+        Returns:
+            str: The rendered string.
+
+        """
+        output = []
+        rendered = self._rendered_markup
+        for token in tokens:
+            if type(token) is str:
+                output.append(token)
+                continue
+            cachekey = (token, xterm256, truecolor)
+            text = rendered.get(cachekey)
+            if text is None:
+                text = self.render_markup(*token, xterm256=xterm256, truecolor=truecolor)
+                if len(rendered) >= _RENDERED_MARKUP_CACHE_SIZE:
+                    rendered.clear()
+                rendered[cachekey] = text
+            output.append(text)
+        return "".join(output)
+
+    def render_markup(self, kind, markup, xterm256=False, truecolor=False):
+        """
+        Render a single markup token to its ANSI sequence.
+
+        Args:
+            kind (str): The kind of markup, as given by `tokenize`.
+            markup (str): The markup, as given by `tokenize`.
+            xterm256 (bool, optional): If xterm256 colors should be used.
+            truecolor (bool, optional): If hex colors should be rendered as truecolor.
+
+        Returns:
+            str: The rendered markup.
+
+        """
+        if kind == "ansi":
+            return self.ansi_map_dict.get(markup, "")
+        match = self.markup_regexes[kind].match(markup)
+        if kind == "hex":
+            text = hex2truecolor.sub_truecolor(match, truecolor)
+            if not truecolor:
+                # this falls back to xterm256 markup
+                text = self.xterm256_fg_sub.sub(
+                    lambda part: self.sub_xterm256(part, xterm256, "fg"), text
+                )
+                text = self.xterm256_bg_sub.sub(
+                    lambda part: self.sub_xterm256(part, xterm256, "bg"), text
+                )
+            return text
+        return self.sub_xterm256(match, xterm256, kind) or ""
+
     def strip_raw_codes(self, string):
         """
         Strips raw ANSI codes from a string.
@@ -471,52 +607,28 @@ class ANSIParser(object):
             return ""
 
         # check cached parsings
-        global _PARSE_CACHE
-        cachekey = f"{string}-{strip_ansi}-{xterm256}-{mxp}-{truecolor}"
-
-        if cachekey in _PARSE_CACHE:
-            return _PARSE_CACHE[cachekey]
-
-        # pre-convert bright colors to xterm256 color tags
-        string = self.brightbg_sub.sub(self.sub_brightbg, string)
-
-        def do_truecolor(part: re.Match, truecolor=truecolor):
-            return hex2truecolor.sub_truecolor(part, truecolor)
-
-        def do_xterm256_fg(part):
-            return self.sub_xterm256(part, xterm256, "fg")
-
-        def do_xterm256_bg(part):
-            return self.sub_xterm256(part, xterm256, "bg")
-
-        def do_xterm256_gfg(part):
-            return self.sub_xterm256(part, xterm256, "gfg")
-
-        def do_xterm256_gbg(part):
-            return self.sub_xterm256(part, xterm256, "gbg")
+        cachekey = (string, strip_ansi, xterm256, mxp, truecolor)
+        parsed_string = _PARSE_CACHE.get(cachekey)
+        if parsed_string is not None:
+            _PARSE_CACHE.move_to_end(cachekey)
+            return parsed_string
 
         in_string = utils.to_str(string)
-
-        # do string replacement
-        parsed_string = []
-        parts = self.ansi_escapes.split(in_string) + [" "]
-        for part, sep in zip(parts[::2], parts[1::2]):
-            pstring = hex_sub.sub(do_truecolor, part)
-            pstring = self.xterm256_fg_sub.sub(do_xterm256_fg, pstring)
-            pstring = self.xterm256_bg_sub.sub(do_xterm256_bg, pstring)
-            pstring = self.xterm256_gfg_sub.sub(do_xterm256_gfg, pstring)
-            pstring = self.xterm256_gbg_sub.sub(do_xterm256_gbg, pstring)
-            pstring = self.ansi_sub.sub(self.sub_ansi, pstring)
-            parsed_string.append("%s%s" % (pstring, sep[0].strip()))
-        parsed_string = "".join(parsed_string)
-
-        if not mxp:
+        tokens = _TOKEN_CACHE.get(in_string)
+        if tokens is None:
+            tokens = self.tokenize(in_string)
+            _TOKEN_CACHE[in_string] = tokens
+            if len(_TOKEN_CACHE) > _TOKEN_CACHE_SIZE:
+                _TOKEN_CACHE.popitem(last=False)
+        parsed_string = self.render(tokens, xterm256=xterm256, truecolor=truecolor)
+
+        if not mxp and "|l" in parsed_string:
             parsed_string = self.strip_mxp(parsed_string)
 
         if strip_ansi:
             # remove all ansi codes (including those manually
             # inserted in string)
-            return self.strip_raw_codes(parsed_string)
+            parsed_string = self.strip_raw_codes(parsed_string)
 
         # cache and crop old cache
         _PARSE_CACHE[cachekey] = parsed_string
@@ -702,14 +814,9 @@ def _transform(func_name):
 
     def wrapped(self, *args, **kwargs):
         replacement_string = _query_super(func_name)(self, *args, **kwargs)
-        to_string = []
-        char_counter = 0
-        for index in range(0, len(self._raw_string)):
-            if index in self._code_indexes:
-                to_string.append(self._raw_string[index])
-            elif index in self._char_indexes:
-                to_string.append(replacement_string[char_counter])
-                char_counter += 1
+        to_string = list(self._raw_string)
+        for char_counter, index in enumerate(self._char_indexes):
+            to_string[index] = replacement_string[char_counter]
         return ANSIString(
             "".join(to_string),
             decoded=True,
@@ -810,13 +917,13 @@ class ANSIString(str, metaclass=ANSIMeta):
         char_indexes = kwargs.pop("char_indexes", None)
         clean_string = kwargs.pop("clean_string", None)
         # All True, or All False, not just one.
-        checks = [x is None for x in [code_indexes, char_indexes, clean_string]]
-        if not len(set(checks)) == 1:
+        unset = clean_string is None
+        if not (code_indexes is None) == (char_indexes is None) == unset:
             raise ValueError(
                 "You must specify code_indexes, char_indexes, "
                 "and clean_string together, or not at all."
             )
-        if not all(checks):
+        if not unset:
             decoded = True
         if not decoded:
             # Completely new ANSI String
@@ -826,10 +933,11 @@ class ANSIString(str, metaclass=ANSIMeta):
             # We have an explicit clean string.
             pass
         elif hasattr(string, "_clean_string"):
-            # It's already an ANSIString
+            # It's already an ANSIString. Its index tables may not have been
+            # calculated yet, in which case we stay lazy as well.
             clean_string = string._clean_string
-            code_indexes = string._code_indexes
-            char_indexes = string._char_indexes
+            code_indexes = string._lazy_code_indexes
+            char_indexes = string._lazy_char_indexes
             string = string._raw_string
         else:
             # It's a string that has been pre-ansi decoded.
@@ -841,10 +949,41 @@ class ANSIString(str, metaclass=ANSIMeta):
         ansi_string = super().__new__(ANSIString, to_str(clean_string))
         ansi_string._raw_string = string
         ansi_string._clean_string = clean_string
-        ansi_string._code_indexes = code_indexes
-        ansi_string._char_indexes = char_indexes
+        ansi_string._lazy_code_indexes = code_indexes
+        ansi_string._lazy_char_indexes = char_indexes
+        ansi_string._lazy_code_string = None
+        return ansi_string
+
+    @classmethod
+    def _from_parts(cls, raw_string, clean_string, code_indexes=None, char_indexes=None):
+        """
+        Fast internal constructor used when combining or slicing ANSIStrings.
+        The input is trusted to already be decoded, so no parsing or argument
+        validation happens here. Index tables left as `None` are calculated
+        on first use.
+
+        """
+        ansi_string = str.__new__(cls, clean_string)
+        ansi_string._raw_string = raw_string
+        ansi_string._clean_string = clean_string
+        ansi_string._lazy_code_indexes = code_indexes
+        ansi_string._lazy_char_indexes = char_indexes
+        ansi_string._lazy_code_string = None
+        ansi_string.parser = ANSI_PARSER
         return ansi_string
 
+    def __setstate__(self, state):
+        """
+        Restore from pickle/copy. Pickles made before the index tables were
+        calculated lazily store them under their public names.
+
+        """
+        for name in ("_code_indexes", "_char_indexes"):
+            if name in state:
+                state["_lazy" + name] = state.pop(name)
+        state.setdefault("_lazy_code_string", None)
+        self.__dict__.update(state)
+
     def __str__(self):
         return self._raw_string
 
@@ -914,15 +1053,55 @@ class ANSIString(str, metaclass=ANSIMeta):
         The third thing to set is the _clean_string. This is a string that is
         devoid of all ANSI Escapes.
 
-        Finally, _code_indexes and _char_indexes are defined. These are lookup
+        Finally, there are _code_indexes and _char_indexes. These are lookup
         tables for which characters in the raw string are related to ANSI
-        escapes, and which are for the readable text.
+        escapes, and which are for the readable text. They are only
+        calculated the first time they are needed, since many ANSIStrings
+        (like intermediate results of concatenation) are never indexed.
 
         """
         self.parser = kwargs.pop("parser", ANSI_PARSER)
         super().__init__()
-        if self._code_indexes is None:
-            self._code_indexes, self._char_indexes = self._get_indexes()
+
+    def _calculate_indexes(self):
+        """
+        Make sure the index tables are available.
+
+        """
+        if self._lazy_code_indexes is None or self._lazy_char_indexes is None:
+            self._lazy_code_indexes, self._lazy_char_indexes = self._get_indexes()
+
+    @property
+    def _code_indexes(self):
+        self._calculate_indexes()
+        return self._lazy_code_indexes
+
+    @_code_indexes.setter
+    def _code_indexes(self, value):
+        self._lazy_code_indexes = value
+        self._lazy_code_string = None
+
+    @property
+    def _char_indexes(self):
+        self._calculate_indexes()
+        return self._lazy_char_indexes
+
+    @_char_indexes.setter
+    def _char_indexes(self, value):
+        self._lazy_char_indexes = value
+
+    @property
+    def _code_string(self):
+        """
+        All ANSI escapes of the raw string, concatenated in order. Since the
+        k:th readable character sits at raw index `_char_indexes[k]`, the
+        escapes in front of it are `_code_string[:_char_indexes[k] - k]`.
+
+        """
+        if self._lazy_code_string is None:
+            raw_string = self._raw_string
+            self._lazy_code_string = "".join(raw_string[i] for i in self._code_indexes)
+        return self._lazy_code_string
 
     @staticmethod
     def _shifter(iterable, offset):
@@ -942,18 +1121,29 @@ class ANSIString(str, metaclass=ANSIMeta):
 
         """
 
-        raw_string = first._raw_string + second._raw_string
-        clean_string = first._clean_string + second._clean_string
-        code_indexes = first._code_indexes[:]
-        char_indexes = first._char_indexes[:]
-        code_indexes.extend(cls._shifter(second._code_indexes, len(first._raw_string)))
-        char_indexes.extend(cls._shifter(second._char_indexes, len(first._raw_string)))
-        return ANSIString(
-            raw_string,
-            code_indexes=code_indexes,
-            char_indexes=char_indexes,
-            clean_string=clean_string,
-        )
+        return cls._concatenate((first, second))
+
+    @classmethod
+    def _concatenate(cls, ansi_strings):
+        """
+        Joins any number of ANSIStrings in one go. If all parts already know
+        their index tables, these are combined, otherwise the result will
+        calculate its own tables when (and if) they are needed.
+
+        """
+        raw_string = "".join(part._raw_string for part in ansi_strings)
+        clean_string = "".join(part._clean_string for part in ansi_strings)
+        code_indexes = char_indexes = None
+        if all(
+            part._lazy_code_indexes is not None and part._lazy_char_indexes is not None
+            for part in ansi_strings
+        ):
+            code_indexes, char_indexes, offset = [], [], 0
+            for part in ansi_strings:
+                code_indexes.extend(cls._shifter(part._lazy_code_indexes, offset))
+                char_indexes.extend(cls._shifter(part._lazy_char_indexes, offset))
+                offset += len(part._raw_string)
+        return cls._from_parts(raw_string, clean_string, code_indexes, char_indexes)
 
     def __add__(self, other):
         """
@@ -1021,16 +1211,19 @@ class ANSIString(str, metaclass=ANSIMeta):
                     # a [x:] slice
                     return ANSIString(self._raw_string[char_indexes[-1] + 1 :])
             return ANSIString("")
+        if slc.step is None or slc.step == 1:
+            return self._slice_contiguous(slc.start or 0, slice_indexes)
         try:
             string = self[slc.start or 0]._raw_string
         except IndexError:
             return ANSIString("")
         last_mark = slice_indexes[0]
+        code_set = set(self._code_indexes)
         # Check between the slice intervals for escape sequences.
         i = None
         for i in slice_indexes[1:]:
             for index in range(last_mark, i):
-                if index in self._code_indexes:
+                if index in code_set:
                     string += self._raw_string[index]
             last_mark = i
             try:
@@ -1044,6 +1237,26 @@ class ANSIString(str, metaclass=ANSIMeta):
             append_tail = ""
         return ANSIString(string + append_tail, decoded=True)
 
+    def _slice_contiguous(self, start, slice_indexes):
+        """
+        Fast path of `_slice` for slices without a step. All raw characters
+        between the first and last sliced character belong to the result, so
+        it can be cut directly out of the raw string, prefixed with the escapes
+        played before it and followed by those immediately after it.
+
+        """
+        char_indexes = self._char_indexes
+        nchars = len(char_indexes)
+        if not -nchars <= start < nchars:
+            return ANSIString("")
+        if start < 0:
+            start += nchars
+        first, last = slice_indexes[0], slice_indexes[-1]
+        raw_string = self._code_string[: first - start] + self._raw_string[first : last + 1]
+        if len(slice_indexes) > 1 or last == char_indexes[-1]:
+            raw_string += self._get_interleving(start + len(slice_indexes))
+        return self._from_parts(raw_string, self.parser.strip_raw_codes(raw_string))
+
     def __getitem__(self, item):
         """
         Gateway for slices and getting specific indexes in the ANSIString. If
@@ -1055,25 +1268,22 @@ class ANSIString(str, metaclass=ANSIMeta):
         if isinstance(item, slice):
             # Slices must be handled specially.
             return self._slice(item)
+        char_indexes = self._char_indexes
         try:
-            self._char_indexes[item]
+            raw_index = char_indexes[item]
         except IndexError:
             raise IndexError("ANSIString Index out of range")
+        if item < 0:
+            item += len(char_indexes)
         # Get character codes after the index as well.
-        if self._char_indexes[-1] == self._char_indexes[item]:
+        if char_indexes[-1] == raw_index:
             append_tail = self._get_interleving(item + 1)
         else:
             append_tail = ""
-        item = self._char_indexes[item]
-
-        clean = self._raw_string[item]
-        result = ""
         # Get the character they're after, and replay all escape sequences
         # previous to it.
-        for index in range(0, item + 1):
-            if index in self._code_indexes:
-                result += self._raw_string[index]
-        return ANSIString(result + clean + append_tail, decoded=True)
+        result = self._code_string[: raw_index - item] + self._raw_string[raw_index] + append_tail
+        return self._from_parts(result, self.parser.strip_raw_codes(result))
 
     def clean(self):
         """
@@ -1145,14 +1355,18 @@ class ANSIString(str, metaclass=ANSIMeta):
 
         """
 
+        raw_string = self._raw_string
         code_indexes = []
-        for match in self.parser.ansi_regex.finditer(self._raw_string):
-            code_indexes.extend(list(range(match.start(), match.end())))
+        for match in self.parser.ansi_regex.finditer(raw_string):
+            code_indexes.extend(range(match.start(), match.end()))
         if not code_indexes:
             # Plain string, no ANSI codes.
-            return code_indexes, list(range(0, len(self._raw_string)))
+            return code_indexes, list(range(0, len(raw_string)))
         # all indexes not occupied by ansi codes are normal characters
-        char_indexes = [i for i in range(len(self._raw_string)) if i not in code_indexes]
+        code_mask = bytearray(len(raw_string))
+        for i in code_indexes:
+            code_mask[i] = 1
+        char_indexes = [i for i, is_code in enumerate(code_mask) if not is_code]
         return code_indexes, char_indexes
 
     def _get_interleving(self, index):
@@ -1161,20 +1375,19 @@ class ANSIString(str, metaclass=ANSIMeta):
         character.
 
         """
-        try:
-            index = self._char_indexes[index - 1]
-        except IndexError:
+        char_indexes = self._char_indexes
+        nchars = len(char_indexes)
+        position = index - 1
+        if not -nchars <= position < nchars:
             return ""
-        s = ""
-        while True:
-            index += 1
-            if index in self._char_indexes:
-                break
-            elif index in self._code_indexes:
-                s += self._raw_string[index]
-            else:
-                break
-        return s
+        if position < 0:
+            position += nchars
+        # the escapes run up to the next readable character, or to the end
+        if position + 1 < nchars:
+            end = char_indexes[position + 1]
+        else:
+            end = len(self._raw_string)
+        return self._raw_string[char_indexes[position] + 1 : end]
 
     def __mul__(self, other):
         """
@@ -1427,16 +1640,17 @@ class ANSIString(str, metaclass=ANSIMeta):
                 ANSIString('up, right, left, down')
 
         """
-        result = ANSIString("")
-        last_item = None
+        parts = [ANSIString("")]
+        separator = None
         for item in iterable:
-            if last_item is not None:
-                result += self._raw_string
+            if separator is None:
+                separator = ANSIString(self._raw_string)
+            else:
+                parts.append(separator)
             if not isinstance(item, ANSIString):
                 item = ANSIString(item)
-            result += item
-            last_item = item
-        return result
+            parts.append(item)
+        return self._concatenate(parts)
 
     def _filler(self, char, amount):
         """
@@ -1446,12 +1660,7 @@ class ANSIString(str, metaclass=ANSIMeta):
         """
         if not isinstance(char, ANSIString):
             line = char * amount
-            return ANSIString(
-                char * amount,
-                code_indexes=[],
-                char_indexes=list(range(0, len(line))),
-                clean_string=char,
-            )
+            return self._from_parts(line, char, [], list(range(0, len(line))))
         try:
             start = char._code_indexes[0]
         except IndexError:
@@ -1465,9 +1674,7 @@ class ANSIString(str, metaclass=ANSIMeta):
         code_indexes.extend([i for i in range(length, length + len(postfix))])
         char_indexes = self._shifter(list(range(0, len(line))), len(prefix))
         raw_string = prefix + line + postfix
-        return ANSIString(
-            raw_string, clean_string=line, char_indexes=char_indexes, code_indexes=code_indexes
-        )
+        return self._from_parts(raw_string, line, code_indexes, char_indexes)
 
     # The following methods should not be called with the '_difference' argument explicitly. This is
     # data provided by the wrapper _spacing_preflight.
@@ -17,10 +17,18 @@ used by Attributes - without it, one would not be able to update mutables
 in-situ, e.g `obj.db.mynestedlist[3][5] = 3` would never be saved and
 be out of sync with the database.
 
+Every such change normally re-pickles and saves the whole Attribute. Inside
+`with batch_saves():` (also available as `obj.attributes.batch()`), changes are
+instead collected and each changed Attribute is saved only once, when the
+block exits. With `settings.ATTRIBUTE_DEFERRED_SAVE`, the same happens
+automatically at the end of every reactor iteration.
+
 """
 
+import threading
 from collections import OrderedDict, defaultdict, deque
 from collections.abc import MutableMapping, MutableSequence, MutableSet
+from contextlib import contextmanager
 from functools import update_wrapper
 
 try:
@@ -28,6 +36,7 @@ try:
 except ImportError:
     from pickle import dumps, loads
 
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils.safestring import SafeString
@@ -36,10 +45,21 @@ import evennia
 from evennia.utils import logger
 from evennia.utils.utils import is_iter, to_bytes, uses_database
 
-__all__ = ("to_pickle", "from_pickle", "do_pickle", "do_unpickle", "dbserialize", "dbunserialize")
+__all__ = (
+    "to_pickle",
+    "from_pickle",
+    "do_pickle",
+    "do_unpickle",
+    "dbserialize",
+    "dbunserialize",
+    "batch_saves",
+    "flush_saves",
+)
 
 PICKLE_PROTOCOL = 2
 
+_DEFERRED_SAVE = settings.ATTRIBUTE_DEFERRED_SAVE
+
 
 # message to send if editing an already deleted Attribute in a savermutable
 _ERROR_DELETED_ATTR = (
@@ -150,6 +170,135 @@ def _save(method):
     return update_wrapper(save_wrapper, method)
 
 
+class _PendingSaves(threading.local):
+    """
+    Per-thread bookkeeping of _Saver* root structures with unsaved changes,
+    stored per Attribute (by id, so also unsaved ones work).
+
+    """
+
+    def __init__(self):
+        self.batch_depth = 0
+        self.flush_scheduled = False
+        self.roots = {}
+
+
+_PENDING_SAVES = _PendingSaves()
+
+
+def _defer_save(root):
+    """
+    Register a changed _Saver* root for saving later, if saves are currently
+    being batched or deferred.
+
+    Args:
+        root (_SaverMutable): The root structure, stored on an Attribute.
+
+    Returns:
+        bool: If the save was deferred. If not, it must be saved right away.
+
+    """
+    if not _PENDING_SAVES.batch_depth:
+        if not _DEFERRED_SAVE:
+            return False
+        from twisted.internet import reactor
+        from twisted.python import threadable
+
+        if not (reactor.running and threadable.isInIOThread()):
+            # nothing would ever flush it
+            return False
+        if not _PENDING_SAVES.flush_scheduled:
+            _PENDING_SAVES.flush_scheduled = True
+            reactor.callLater(0, flush_saves)
+    _PENDING_SAVES.roots[id(root._db_obj)] = root
+    return True
+
+
+def get_pending_save(db_obj):
+    """
+    Get the not-yet saved value of an Attribute.
+
+    Args:
+        db_obj (Attribute): The Attribute to check.
+
+    Returns:
+        _SaverMutable or None: The changed value waiting to be saved, if any.
+
+    """
+    root = _PENDING_SAVES.roots.get(id(db_obj))
+    if root is not None and root._db_obj is db_obj:
+        return root
+    return None
+
+
+def discard_pending_save(db_obj):
+    """
+    Forget about any not-yet saved value of an Attribute. Used when the
+    Attribute is given a new value, which would otherwise be overwritten.
+
+    Args:
+        db_obj (Attribute): The Attribute that was updated.
+
+    """
+    if get_pending_save(db_obj) is not None:
+        del _PENDING_SAVES.roots[id(db_obj)]
+
+
+def flush_saves(raise_errors=True):
+    """
+    Save all changes to _Saver* structures that were batched or deferred.
+    Attributes deleted in the meantime are skipped. If a save fails, the
+    remaining ones are still saved before the first error is re-raised.
+
+    Args:
+        raise_errors (bool, optional): If unset, failed saves are only
+            logged. Used on server shutdown, which must not be stopped by
+            one bad Attribute.
+
+    """
+    _PENDING_SAVES.flush_scheduled = False
+    roots = list(_PENDING_SAVES.roots.values())
+    _PENDING_SAVES.roots.clear()
+    error = None
+    for root in roots:
+        db_obj = root._db_obj
+        if not db_obj.pk:
+            continue
+        try:
+            db_obj.value = root
+        except Exception as err:
+            logger.log_trace(f"Could not save deferred Attribute {db_obj}.")
+            error = error or err
+    if error and raise_errors:
+        raise error
+
+
+@contextmanager
+def batch_saves():
+    """
+    Context manager for collecting changes to _Saver* structures (like the
+    list in `obj.db.mylist`), saving each changed Attribute only once, when
+    the outermost batch ends - also if it ends with an error. This means
+    `obj.db.mylist.append(item)` in a loop is pickled and saved once instead
+    of once per item.
+
+    Example:
+        ::
+
+            with batch_saves():
+                for item in loot:
+                    obj.db.inventory.append(item)
+
+    """
+    _PENDING_SAVES.batch_depth += 1
+    try:
+        yield
+    finally:
+        _PENDING_SAVES.batch_depth -= 1
+        if not _PENDING_SAVES.batch_depth:
+            flush_saves()
+
+
 class _SaverMutable:
     """
     Parent class for properly handling  of nested mutables in
@@ -184,7 +333,8 @@ class _SaverMutable:
                         cls_name=cls_name, obj=self, non_saver_name=non_saver_name
                     )
                 )
-            self._db_obj.value = self
+            if not _defer_save(self):
+                self._db_obj.value = self
         else:
             logger.log_err("_SaverMutable %s has no root Attribute to save to." % self)
 
@@ -733,6 +883,67 @@ def to_pickle(data):
     return process_item(data)
 
 
+def _has_packed(data, is_packed):
+    """
+    Helper checking if data prepared by `to_pickle` contains items for which
+    `is_packed` is true, or objects with a custom `__deserialize_dbobjs__` method.
+
+    """
+    dtype = type(data)
+    if dtype in (str, int, float, bool, bytes, SafeString) or data is None:
+        return False
+    elif is_packed(data):
+        return True
+    elif hasattr(data, "__deserialize_dbobjs__"):
+        return True
+    elif hasattr(data, "items"):
+        return any(
+            _has_packed(key, is_packed) or _has_packed(val, is_packed) for key, val in data.items()
+        )
+    elif hasattr(data, "__iter__"):
+        return any(_has_packed(val, is_packed) for val in data)
+    return False
+
+
+def has_packed_references(data):
+    """
+    Check if data prepared by `to_pickle` holds references to database objects
+    or Sessions. When unpickled, such references may resolve differently over
+    time (for example to `None` if the database object was deleted).
+
+    Args:
+        data (any): Data as returned from `to_pickle`.
+
+    Returns:
+        bool: If the data contains (or may contain) references.
+
+    Notes:
+        Objects with a custom `__deserialize_dbobjs__` method are always
+        considered to hold references.
+
+    """
+    return _has_packed(data, lambda item: _IS_PACKED_DBOBJ(item) or _IS_PACKED_SESSION(item))
+
+
+def has_packed_sessions(data):
+    """
+    Check if data prepared by `to_pickle` holds references to Sessions. These
+    unpickle to `None` once the Session disconnects.
+
+    Args:
+        data (any): Data as returned from `to_pickle`.
+
+    Returns:
+        bool: If the data contains (or may contain) Session references.
+
+    Notes:
+        Objects with a custom `__deserialize_dbobjs__` method are always
+        considered to hold Sessions.
+
+    """
+    return _has_packed(data, _IS_PACKED_SESSION)
+
+
 # @transaction.autocommit
 def from_pickle(data, db_obj=None):
     """
@@ -47,6 +47,7 @@ The `FuncParser` also accepts a direct dict mapping of `{'name': callable, ...}`
 import dataclasses
 import inspect
 import random
+from collections import OrderedDict
 
 from django.conf import settings
 
@@ -70,6 +71,10 @@ _CLIENT_DEFAULT_WIDTH = settings.CLIENT_DEFAULT_WIDTH
 _MAX_NESTING = settings.FUNCPARSER_MAX_NESTING
 _START_CHAR = settings.FUNCPARSER_START_CHAR
 _ESCAPE_CHAR = settings.FUNCPARSER_ESCAPE_CHAR
+_TEMPLATE_CACHE_SIZE = settings.FUNCPARSER_TEMPLATE_CACHE_SIZE
+
+# compiled templates, shared by all parsers
+_TEMPLATE_CACHE = OrderedDict()
 
 
 @dataclasses.dataclass
@@ -102,6 +107,17 @@ class _ParsedFunc:
         return self.prefix + self.rawstr + self.infuncstr
 
 
+@dataclasses.dataclass(frozen=True)
+class _NestedFuncDef:
+    """
+    A top-level funcdef in a compiled template that must be walked on every
+    parse, since its arguments depend on the returns of nested calls.
+
+    """
+
+    funcstr: str
+
+
 class ParsingError(RuntimeError):
     """
     Failed to parse for some reason.
@@ -315,9 +331,69 @@ class FuncParser:
         start_char = self.start_char
         escape_char = self.escape_char
 
+        if start_char not in string and escape_char not in string:
+            # nothing to parse
+            return string
+
+        if return_str and _TEMPLATE_CACHE_SIZE:
+            template = self.compile(string)
+            if template is not None:
+                return self.render(
+                    template,
+                    raise_errors=raise_errors,
+                    escape=escape,
+                    strip=strip,
+                    **reserved_kwargs,
+                )
+
         # replace e.g. $$ with \$ so we only need to handle one escape method
         string = string.replace(start_char + start_char, escape_char + start_char)
 
+        return self._parse_string(
+            string,
+            raise_errors=raise_errors,
+            escape=escape,
+            strip=strip,
+            return_str=return_str,
+            reserved_kwargs=reserved_kwargs,
+        )
+
+    def _parse_string(
+        self,
+        string,
+        raise_errors=False,
+        escape=False,
+        strip=False,
+        return_str=True,
+        reserved_kwargs=None,
+        execute=None,
+    ):
+        """
+        Walk a string character by character, executing its `$funcname(...)` calls.
+        This is the workhorse of `.parse`.
+
+        Args:
+            string (str): The string to parse. Double start-chars (`$$`) must already
+                have been replaced with their escaped form.
+            raise_errors (bool, optional): Raise errors instead of leaving failed
+                functions unparsed.
+            escape (bool, optional): Escape all found functions.
+            strip (bool, optional): Strip all found functions.
+            return_str (bool, optional): Always return a string.
+            reserved_kwargs (dict, optional): Kwargs to pass into every callable.
+            execute (callable, optional): Called as `execute(parsedfunc, raise_errors=...,
+                **reserved_kwargs)` to run each parsed function. Defaults to `self.execute`.
+
+        Returns:
+            str or any: The parsed string, or the return of the last callable if
+                `return_str` is unset.
+
+        """
+        start_char = self.start_char
+        escape_char = self.escape_char
+        reserved_kwargs = reserved_kwargs or {}
+        execute = execute or self.execute
+
         # parsing state
         callstack = []
 
@@ -521,7 +597,7 @@ class FuncParser:
                     else:
                         # execute the function - the result may be a string or
                         # something else
-                        exec_return = self.execute(
+                        exec_return = execute(
                             curr_func, raise_errors=raise_errors, **reserved_kwargs
                         )
 
@@ -577,6 +653,217 @@ class FuncParser:
 
         return fullstr
 
+    def compile(self, string):
+        """
+        Tokenize a string into a reusable template of literal chunks and function calls.
+        Templates are cached, so parsing the same string again only needs to run the
+        callables.
+
+        Args:
+            string (str): The string to compile.
+
+        Returns:
+            tuple or None: A tuple of parts, where each part is either a literal
+                `str`, a `_ParsedFunc` ready to execute or a `_NestedFuncDef` to be
+                walked again on each parse (since its arguments depend on the
+                return of the nested calls). This is `None` if the string could not
+                be safely split into independent parts; it must then be parsed as a
+                whole.
+
+        """
+        start_char = self.start_char
+        escape_char = self.escape_char
+
+        cachekey = (string, start_char, escape_char, _MAX_NESTING)
+        try:
+            template = _TEMPLATE_CACHE[cachekey]
+            _TEMPLATE_CACHE.move_to_end(cachekey)
+            return template
+        except KeyError:
+            pass
+
+        # replace e.g. $$ with \$ so we only need to handle one escape method
+        string = string.replace(start_char + start_char, escape_char + start_char)
+
+        template = []
+        literal = ""
+        # funcdef state - this tracks what `_parse_string` does, but without
+        # executing anything; we only need to know where each top-level funcdef ends.
+        depth = 0
+        stack = []
+        escaped = False
+        double_quoted = False
+        open_lparens = 0
+        open_lsquare = 0
+        open_lcurly = 0
+        nested = False
+        ifuncstart = 0
+
+        for ichar, char in enumerate(string):
+            if escaped:
+                if not depth:
+                    literal += char
+                escaped = False
+                continue
+
+            if char == escape_char:
+                escaped = True
+                continue
+
+            if char == start_char:
+                if not depth:
+                    if open_lsquare or open_lcurly:
+                        # unbalanced brackets leak into the next funcdef; the
+                        # parts are not independent.
+                        template = None
+                        break
+                    if literal:
+                        template.append(literal)
+                        literal = ""
+                    ifuncstart = ichar
+                    nested = False
+                    depth = 1
+                else:
+                    # a nested funcdef (beyond max nesting, this is just a char,
+                    # but the walker needs to handle the error)
+                    nested = True
+                    if depth - 1 < _MAX_NESTING - 1:
+                        stack.append((double_quoted, open_lparens, open_lsquare, open_lcurly))
+                        double_quoted = False
+                        open_lparens = open_lsquare = open_lcurly = 0
+                        depth += 1
+                continue
+
+            if not depth:
+                literal += char
+                continue
+
+            if char == '"':
+                double_quoted = not double_quoted
+            elif double_quoted:
+                continue
+            elif char == "(":
+                open_lparens += 1
+            elif char in "[]":
+                open_lsquare += -1 if char == "]" else 1
+            elif char in "{}":
+                open_lcurly += -1 if char == "}" else 1
+            elif char in ",)":
+                if open_lparens > 1:
+                    open_lparens -= 1 if char == ")" else 0
+                elif open_lcurly > 0 or open_lsquare > 0 or char == ",":
+                    continue
+                else:
+                    # end of a funcdef
+                    open_lparens = 0
+                    depth -= 1
+                    if depth:
+                        double_quoted, open_lparens, open_lsquare, open_lcurly = stack.pop()
+                    else:
+                        funcstr = string[ifuncstart : ichar + 1]
+                        if nested:
+                            template.append(_NestedFuncDef(funcstr))
+                        else:
+                            template.append(self._compile_funcdef(funcstr))
+
+        if template is not None:
+            if depth:
+                # an unclosed funcdef at the end of the string
+                template.append(_NestedFuncDef(string[ifuncstart:]))
+            elif literal:
+                template.append(literal)
+            template = tuple(template)
+
+        _TEMPLATE_CACHE[cachekey] = template
+        if len(_TEMPLATE_CACHE) > _TEMPLATE_CACHE_SIZE:
+            _TEMPLATE_CACHE.popitem(last=False)
+
+        return template
+
+    def _compile_funcdef(self, funcstr):
+        """
+        Parse a single, non-nested funcdef without executing it.
+
+        Args:
+            funcstr (str): A complete `$funcname(...)` string.
+
+        Returns:
+            _ParsedFunc: The parsed function, ready to pass to `.execute`.
+
+        """
+        parsed = []
+
+        def _record(parsedfunc, **kwargs):
+            parsed.append(parsedfunc)
+            return ""
+
+        self._parse_string(funcstr, execute=_record)
+        return parsed[0]
+
+    def get_funcnames(self, string):
+        """
+        Get the names of all `$funcname(...)` calls in a string, without executing them.
+
+        Args:
+            string (str): The string to check.
+
+        Returns:
+            set or None: The funcnames called in the string. This is `None` if the
+                string contains nested calls (or is otherwise malformed) so that the
+                calls can't be fully determined without executing them.
+
+        """
+        template = self.compile(string)
+        if template is None:
+            return None
+        funcnames = set()
+        for part in template:
+            if isinstance(part, _NestedFuncDef):
+                return None
+            if isinstance(part, _ParsedFunc):
+                funcnames.add(part.funcname)
+        return funcnames
+
+    def render(self, template, raise_errors=False, escape=False, strip=False, **reserved_kwargs):
+        """
+        Execute a template compiled with `.compile` to produce the parsed string.
+
+        Args:
+            template (tuple): A compiled template.
+            raise_errors (bool, optional): Raise errors instead of leaving failed
+                functions unparsed.
+            escape (bool, optional): If set, escape all found functions so they
+                are not executed by later parsing.
+            strip (bool, optional): If set, strip any inline funcs from string
+                as if they were not there.
+            **reserved_kwargs: Kwargs guaranteed to pass into each callable, as for `.parse`.
+
+        Returns:
+            str: The parsed string.
+
+        """
+        parts = []
+        for part in template:
+            if isinstance(part, str):
+                parts.append(part)
+            elif isinstance(part, _NestedFuncDef):
+                parts.append(
+                    self._parse_string(
+                        part.funcstr,
+                        raise_errors=raise_errors,
+                        escape=escape,
+                        strip=strip,
+                        reserved_kwargs=reserved_kwargs,
+                    )
+                )
+            elif strip:
+                continue
+            elif escape:
+                parts.append(self.escape_char + part.fullstr)
+            else:
+                parts.append(str(self.execute(part, raise_errors=raise_errors, **reserved_kwargs)))
+        return "".join(parts)
+
     def parse_to_any(
         self, string, raise_errors=False, escape=False, strip=False, **reserved_kwargs
     ):
@@ -11,8 +11,10 @@ import gc
 import os
 import threading
 import time
+from itertools import count
 from weakref import WeakValueDictionary
 
+from django.conf import settings
 from django.core.exceptions import FieldError, ObjectDoesNotExist
 from django.db.models.base import Model, ModelBase
 from django.db.models.signals import post_migrate, post_save, pre_delete
@@ -21,7 +23,7 @@ from django.db.utils import DatabaseError
 from twisted.internet.reactor import callFromThread
 
 from evennia.utils import logger
-from evennia.utils.utils import dbref, get_evennia_pids, to_str
+from evennia.utils.utils import dbref, get_evennia_pids, to_str, variable_from_module
 
 from .manager import SharedMemoryManager
 
@@ -31,6 +33,10 @@ _GA = object.__getattribute__
 _SA = object.__setattr__
 _DA = object.__delattr__
 _MONITOR_HANDLER = None
+_MEMORY_PROBE = None
+
+# stamps marking when an instance was last used
+_ACCESS_STAMPS = count(1)
 
 # References to db-updated objects are stored here so the
 # main process can be informed to re-cache itself.
@@ -299,7 +305,11 @@ class SharedMemoryModel(Model, metaclass=SharedMemoryModelBase):
         done even when instance caching is disabled.
 
         """
-        return cls.__dbclass__.__instance_cache__.get(id)
+        instance = cls.__dbclass__.__instance_cache__.get(id)
+        if instance is not None:
+            # track recency of use, for evicting the least recently used instances
+            _SA(instance, "_idmapper_access", next(_ACCESS_STAMPS))
+        return instance
 
     @classmethod
     def cache_instance(cls, instance, new=False):
@@ -317,6 +327,7 @@ class SharedMemoryModel(Model, metaclass=SharedMemoryModelBase):
         if pk is not None:
             new = new or pk not in cls.__dbclass__.__instance_cache__
             cls.__dbclass__.__instance_cache__[pk] = instance
+            _SA(instance, "_idmapper_access", next(_ACCESS_STAMPS))
             if new:
                 try:
                     # trigger the at_init hook only
@@ -577,12 +588,132 @@ def update_cached_instance(sender, instance, **kwargs):
 post_save.connect(update_cached_instance)
 
 
+def _is_pinned(instance):
+    """
+    Check if an instance must stay in the cache during eviction. This is
+    the case for entities with connected Sessions (those are referenced from
+    the Sessions) and those refusing to be flushed by `at_idmapper_flush`
+    (such as entities with non-persistent Attributes).
+
+    """
+    sessionhandler = instance.__dict__.get("sessions")
+    if sessionhandler is not None and sessionhandler.count():
+        return True
+    return not instance.at_idmapper_flush()
+
+
+def mark_used(instances):
+    """
+    Mark cached instances as recently used, so `evict_cache` keeps them. Use
+    this on paths reading instances without going through `get_cached_instance`.
+
+    Args:
+        instances (iterable): The instances used.
+
+    """
+    for instance in instances:
+        _SA(instance, "_idmapper_access", next(_ACCESS_STAMPS))
+
+
+def evict_cache(keep=0.6):
+    """
+    Evict the least recently used instances from the idmapper cache. This
+    is done per model, so each keeps the given fraction of its instances
+    (plus those that can't be evicted).
+
+    Args:
+        keep (float, optional): The fraction (0..1) of each model's cached
+            instances to keep. The ones most recently used are kept.
+
+    Returns:
+        int: The number of evicted instances.
+
+    Notes:
+        Use is tracked by `get_cached_instance`, `cache_instance` and
+        `mark_used` (called by the contents cache of locations). Instances only
+        reached through already loaded relations (like `obj.location`) or handler
+        caches are not tracked, and so age from their last fetch from the cache.
+
+    """
+    dbclasses = set()
+
+    def get_recurse(submodels):
+        for submodel in submodels:
+            subclasses = submodel.__subclasses__()
+            if subclasses:
+                get_recurse(subclasses)
+            else:
+                dbclasses.add(submodel.__dbclass__)
+
+    get_recurse(SharedMemoryModel.__subclasses__())
+
+    evicted = {}
+    for dbclass in dbclasses:
+        cache = dbclass.__instance_cache__
+        nevict = len(cache) - int(len(cache) * keep)
+        if nevict <= 0:
+            continue
+        # least recently used first
+        candidates = sorted(cache.items(), key=lambda item: getattr(item[1], "_idmapper_access", 0))
+        for pk, instance in candidates:
+            if nevict <= 0:
+                break
+            if not _is_pinned(instance):
+                cache.pop(pk, None)
+                evicted[id(instance)] = instance
+                nevict -= 1
+
+    if evicted:
+        # the remaining instances must not hold on to evicted ones through their
+        # cached relations, or we'd end up with two instances of the same entity.
+        for dbclass in dbclasses:
+            for instance in list(dbclass.__instance_cache__.values()):
+                fields_cache = instance._state.fields_cache
+                for name, related in list(fields_cache.items()):
+                    if id(related) in evicted:
+                        del fields_cache[name]
+                cmdsethandler = instance.__dict__.get("cmdset")
+                if cmdsethandler is not None:
+                    # a cached cmdset merge may reference commands on evicted entities
+                    cmdsethandler.merged_cache = None
+    return len(evicted)
+
+
+def get_memory_usage():
+    """
+    Get the resident memory used by this process.
+
+    Returns:
+        float or None: The resident memory in MB, or `None` if this could not
+            be determined on this platform.
+
+    Notes:
+        This reads `/proc/self/statm` where available (Linux), otherwise it asks
+        `ps` (macOS, BSD). On Windows the memory use can't be determined.
+
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if os.name == "nt":
+        return None
+    try:
+        # resident memory, in kB
+        return float(os.popen("ps -p %d -o rss | tail -1" % os.getpid()).read()) / 1000.0
+    except ValueError:
+        return None
+
+
 LAST_FLUSH = None
+LAST_FLUSH_SIZE = 0
 
 
 def conditional_flush(max_rmem, force=False):
     """
-    Flush the cache if the estimated memory usage exceeds `max_rmem`.
+    Evict the least recently used instances from the cache if the memory
+    usage of the process gets within 10% of `max_rmem`.
 
     The flusher has a timeout to avoid flushing over and over
     in particular situations (this means that for some setups
@@ -590,31 +721,18 @@ def conditional_flush(max_rmem, force=False):
     more memory is probably required for the given game).
 
     Args:
-        max_rmem (int): memory-usage estimation-treshold after which
-            cache is flushed.
+        max_rmem (int): Memory-usage threshold (in MB) after which the
+            cache is reduced to the fraction given by
+            `settings.IDMAPPER_CACHE_LOW_WATERMARK`.
         force (bool, optional): forces a flush, regardless of timeout.
             Defaults to `False`.
 
-    """
-    global LAST_FLUSH
-
-    def mem2cachesize(desired_rmem):
-        """
-        Estimate the size of the idmapper cache based on the memory
-        desired. This is used to optionally cap the cache size.
-
-        desired_rmem - memory in MB (minimum 50MB)
+    Notes:
+        The memory usage is measured with the callable given by
+        `settings.IDMAPPER_MEMORY_PROBE`.
 
-        The formula is empirically estimated from usage tests (Linux)
-        and is
-            Ncache = RMEM - 35.0 / 0.0157
-        where RMEM is given in MB and Ncache is the size of the cache
-        for this memory usage. VMEM tends to be about 100MB higher
-        than RMEM for large memory usage.
-        """
-        vmem = max(desired_rmem, 50.0)
-        Ncache = int(abs(float(vmem) - 35.0) / 0.0157)
-        return Ncache
+    """
+    global LAST_FLUSH, LAST_FLUSH_SIZE, _MEMORY_PROBE
 
     if not max_rmem:
         # auto-flush is disabled
@@ -634,22 +752,23 @@ def conditional_flush(max_rmem, force=False):
         )
         return
 
-    if os.name == "nt":
-        # we can't look for mem info in Windows at the moment
+    if not _MEMORY_PROBE:
+        _MEMORY_PROBE = variable_from_module(*settings.IDMAPPER_MEMORY_PROBE.rsplit(".", 1))
+
+    actual_rmem = _MEMORY_PROBE()
+    if actual_rmem is None:
+        # we can't get the memory usage on this platform
         return
 
-    # check actual memory usage
-    Ncache_max = mem2cachesize(max_rmem)
     Ncache, _ = cache_size()
-    actual_rmem = (
-        float(os.popen("ps -p %d -o %s | tail -1" % (os.getpid(), "rss")).read()) / 1000.0
-    )  # resident memory
-
-    if Ncache >= Ncache_max and actual_rmem > max_rmem * 0.9:
-        # flush cache when number of objects in cache is big enough and our
-        # actual memory use is within 10% of our set max
-        flush_cache()
+    if Ncache > LAST_FLUSH_SIZE and actual_rmem > max_rmem * 0.9:
+        # evict when our actual memory use is within 10% of our set max. Since
+        # Python may not return freed memory to the OS, we only evict again
+        # once the cache has grown beyond what it was left with last time.
+        evict_cache(keep=settings.IDMAPPER_CACHE_LOW_WATERMARK)
+        gc.collect()
         LAST_FLUSH = now
+        LAST_FLUSH_SIZE, _ = cache_size()
 
 
 def cache_size(mb=True):
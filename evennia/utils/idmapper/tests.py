@@ -1,6 +1,9 @@
+from unittest.mock import patch
+
 from django.db import models
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
+from . import models as idmapper_models
 from .models import SharedMemoryModel
 
 
@@ -76,3 +79,49 @@ class SharedMemorysTest(TestCase):
         pk = article.pk
         article.delete()
         self.assertEqual(pk not in Article.__instance_cache__, True)
+
+
+class TestCacheEviction(TestCase):
+    def setUp(self):
+        super().setUp()
+        Article.flush_instance_cache(force=True)
+        category = Category.objects.create(name="Category")
+        regcategory = RegularCategory.objects.create(name="Category")
+        self.articles = [
+            Article.objects.create(name=f"Article {n}", category=category, category2=regcategory)
+            for n in range(10)
+        ]
+
+    def test_evict_cache(self):
+        # use some articles, leaving the others less recently used
+        recent = self.articles[2:5]
+        for article in recent:
+            Article.get_cached_instance(article.pk)
+        # this one can't be flushed
+        pinned = self.articles[0]
+        pinned.at_idmapper_flush = lambda: False
+
+        idmapper_models.evict_cache(keep=0.4)
+        cached = Article.get_all_cached_instances()
+        self.assertEqual(len(cached), 4)
+        self.assertEqual(set(cached), set(recent + [pinned]))
+
+    def test_get_memory_usage(self):
+        self.assertGreater(idmapper_models.get_memory_usage(), 0)
+        # without /proc, the current (not peak) memory use is asked from ps
+        with patch("builtins.open", side_effect=OSError):
+            self.assertGreater(idmapper_models.get_memory_usage(), 0)
+            with patch("evennia.utils.idmapper.models.os.name", "nt"):
+                self.assertIsNone(idmapper_models.get_memory_usage())
+
+    @override_settings(IDMAPPER_CACHE_LOW_WATERMARK=0.5)
+    @patch("evennia.utils.idmapper.models.LAST_FLUSH_SIZE", 0)
+    @patch("evennia.utils.idmapper.models.LAST_FLUSH", 1)
+    @patch("evennia.utils.idmapper.models.evict_cache")
+    def test_conditional_flush(self, mock_evict):
+        with patch("evennia.utils.idmapper.models._MEMORY_PROBE", return_value=100):
+            idmapper_models.conditional_flush(200)
+            mock_evict.assert_not_called()
+        with patch("evennia.utils.idmapper.models._MEMORY_PROBE", return_value=190):
+            idmapper_models.conditional_flush(200)
+            mock_evict.assert_called_with(keep=0.5)
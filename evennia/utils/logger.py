@@ -6,7 +6,8 @@ are all directed either to stdout (if Evennia is running in
 interactive mode) or to $GAME_DIR/server/logs.
 
 The log_file() function uses its own threading system to log to
-arbitrary files in $GAME_DIR/server/logs.
+arbitrary files in $GAME_DIR/server/logs. Lines are buffered in memory
+and written to each file in batches.
 
 Note: All logging functions have two aliases, log_type() and
 log_typemsg(). This is for historical, back-compatible reasons.
@@ -14,13 +15,14 @@ log_typemsg(). This is for historical, back-compatible reasons.
 """
 
 import os
+import threading
 import time
 from datetime import datetime
 from traceback import format_exc
 
 from twisted import logger as twisted_logger
 from twisted.internet.threads import deferToThread
-from twisted.python import logfile
+from twisted.python import logfile, threadable
 from twisted.python import util as twisted_util
 
 log = twisted_logger.Logger()
@@ -442,6 +444,8 @@ class EvenniaLogFile(logfile.LogFile):
 _LOG_FILE_HANDLES = {}  # holds open log handles
 _LOG_FILE_HANDLE_COUNTS = {}
 _LOG_FILE_HANDLE_RESET = 500
+# held while a log file handle is used, since writes and tails happen in threads
+_LOG_FILE_LOCK = threading.RLock()
 
 
 def _open_log_file(filename):
@@ -465,26 +469,160 @@ def _open_log_file(filename):
         _LOG_ROTATE_SIZE = max(1000, settings.CHANNEL_LOG_ROTATE_SIZE)
 
     filename = os.path.join(_LOGDIR, filename)
-    if filename in _LOG_FILE_HANDLES:
-        _LOG_FILE_HANDLE_COUNTS[filename] += 1
-        if _LOG_FILE_HANDLE_COUNTS[filename] > _LOG_FILE_HANDLE_RESET:
-            # close/refresh handle
-            _LOG_FILE_HANDLES[filename].close()
-            del _LOG_FILE_HANDLES[filename]
-        else:
-            # return cached handle
-            return _LOG_FILE_HANDLES[filename]
-    try:
-        filehandle = EvenniaLogFile.fromFullPath(filename, rotateLength=_LOG_ROTATE_SIZE)
-        # filehandle = open(filename, "a+")  # append mode + reading
-        _LOG_FILE_HANDLES[filename] = filehandle
-        _LOG_FILE_HANDLE_COUNTS[filename] = 0
-        return filehandle
-    except IOError:
-        log_trace()
+    with _LOG_FILE_LOCK:
+        if filename in _LOG_FILE_HANDLES:
+            _LOG_FILE_HANDLE_COUNTS[filename] += 1
+            if _LOG_FILE_HANDLE_COUNTS[filename] > _LOG_FILE_HANDLE_RESET:
+                # close/refresh handle
+                _LOG_FILE_HANDLES[filename].close()
+                del _LOG_FILE_HANDLES[filename]
+            else:
+                # return cached handle
+                return _LOG_FILE_HANDLES[filename]
+        try:
+            filehandle = EvenniaLogFile.fromFullPath(filename, rotateLength=_LOG_ROTATE_SIZE)
+            # filehandle = open(filename, "a+")  # append mode + reading
+            _LOG_FILE_HANDLES[filename] = filehandle
+            _LOG_FILE_HANDLE_COUNTS[filename] = 0
+            return filehandle
+        except IOError:
+            log_trace()
     return None
 
 
+_LOG_FILE_FLUSH_INTERVAL = None
+_LOG_FILE_BUFFER_SIZE = None
+_LOG_FILE_BUFFERS = {}  # filename: [lines] waiting to be written
+_LOG_FILE_BUFFER_LENGTHS = {}
+_LOG_FILE_FLUSH_CALL = None  # the scheduled flush, if any
+_LOG_FILE_FLUSH_RUNNING = False
+_LOG_FILE_BATCH = []  # (filename, data) handed to a thread but not yet written
+
+
+def _pop_log_buffer(filename):
+    """
+    Remove and return the lines buffered for a log file, as one string.
+
+    """
+    lines = _LOG_FILE_BUFFERS.pop(filename, None)
+    _LOG_FILE_BUFFER_LENGTHS.pop(filename, None)
+    return "".join(lines) if lines else ""
+
+
+def _write_log_data(filehandle, data):
+    """
+    Write data to a log file and flush it to disk.
+
+    """
+    try:
+        filehandle.write(data)
+        # since we don't close the handle, we need to flush
+        # manually or log file won't be written to until the
+        # write buffer is full.
+        filehandle.flush()
+    except Exception:
+        log_trace(f"Could not write to the log file {filehandle.path}.")
+
+
+def _write_log_batch():
+    """
+    Write the pending batch of `(filename, data)` to disk. This runs in a
+    thread, but is also called by `flush_log_files`; whichever gets the lock
+    first writes the batch and the other finds it empty.
+
+    Notes:
+        The file handles are looked up here rather than when the batch is
+        made, since a handle may be closed and reopened by `_open_log_file`
+        (from `flush_log_files` or `tail_log_file`) before the thread runs.
+
+    """
+    with _LOG_FILE_LOCK:
+        batch = _LOG_FILE_BATCH[:]
+        del _LOG_FILE_BATCH[:]
+        for filename, data in batch:
+            filehandle = _open_log_file(filename)
+            if filehandle:
+                _write_log_data(filehandle, data)
+
+
+def _flush_log_buffers():
+    """
+    Write all buffered log lines to disk in a thread. Only one such write is
+    in progress at a time, so lines end up in the file in the order they
+    were logged. Lines logged during the write are buffered for the next one.
+
+    """
+    global _LOG_FILE_FLUSH_CALL, _LOG_FILE_FLUSH_RUNNING
+
+    if _LOG_FILE_FLUSH_CALL and _LOG_FILE_FLUSH_CALL.active():
+        _LOG_FILE_FLUSH_CALL.cancel()
+    _LOG_FILE_FLUSH_CALL = None
+
+    if _LOG_FILE_FLUSH_RUNNING:
+        # picked up when the current write finishes
+        return
+
+    batch = []
+    for filename in list(_LOG_FILE_BUFFERS):
+        data = _pop_log_buffer(filename)
+        if data:
+            batch.append((filename, data))
+    if not batch:
+        return
+
+    def callback(_):
+        """Write the lines buffered while we were busy"""
+        global _LOG_FILE_FLUSH_RUNNING
+        _LOG_FILE_FLUSH_RUNNING = False
+        if _LOG_FILE_BUFFERS:
+            _schedule_log_flush()
+
+    def errback(failure):
+        """Catching errors to normal log"""
+        log_err(f"Error writing to log files: {failure}")
+
+    with _LOG_FILE_LOCK:
+        _LOG_FILE_BATCH.extend(batch)
+    _LOG_FILE_FLUSH_RUNNING = True
+    deferToThread(_write_log_batch).addErrback(errback).addBoth(callback)
+
+
+def _schedule_log_flush():
+    """
+    Make sure the buffered log lines are written, either right away (if the
+    buffer is full) or on a timer.
+
+    """
+    global _LOG_FILE_FLUSH_CALL
+    from twisted.internet import reactor
+
+    buffer_full = _LOG_FILE_FLUSH_INTERVAL <= 0 or any(
+        length >= _LOG_FILE_BUFFER_SIZE for length in _LOG_FILE_BUFFER_LENGTHS.values()
+    )
+    if not reactor.running:
+        # no threads or timers outside the server (like in scripts and unit tests)
+        if buffer_full:
+            flush_log_files()
+    elif buffer_full:
+        _flush_log_buffers()
+    elif not (_LOG_FILE_FLUSH_CALL and _LOG_FILE_FLUSH_CALL.active()):
+        _LOG_FILE_FLUSH_CALL = reactor.callLater(_LOG_FILE_FLUSH_INTERVAL, _flush_log_buffers)
+
+
+def _buffer_log_line(filename, line):
+    """
+    Add a formatted line to the write buffer of a log file.
+
+    """
+    lines = _LOG_FILE_BUFFERS.get(filename)
+    if lines is None:
+        lines = _LOG_FILE_BUFFERS[filename] = []
+        _LOG_FILE_BUFFER_LENGTHS[filename] = 0
+    lines.append(line)
+    _LOG_FILE_BUFFER_LENGTHS[filename] += len(line)
+    _schedule_log_flush()
+
+
 def log_file(msg, filename="game.log"):
     """
     Arbitrary file logger using threads.
@@ -495,25 +633,61 @@ def log_file(msg, filename="game.log"):
             will appear in the logs directory and log entries will start
             on new lines following datetime info.
 
+    Notes:
+        Lines are not written right away, but are collected and written to
+        each file in one go after `settings.LOG_FILE_FLUSH_INTERVAL` seconds
+        (or as soon as `settings.LOG_FILE_BUFFER_SIZE` characters are waiting).
+        Use `flush_log_files` to write them immediately.
+
     """
+    # we delay import of settings to keep logger module as free
+    # from django as possible.
+    global _LOG_FILE_FLUSH_INTERVAL, _LOG_FILE_BUFFER_SIZE
+    if _LOG_FILE_FLUSH_INTERVAL is None:
+        from django.conf import settings
 
-    def callback(filehandle, msg):
-        """Writing to file and flushing result"""
-        msg = "\n%s [-] %s" % (timeformat(), msg.strip())
-        filehandle.write(msg)
-        # since we don't close the handle, we need to flush
-        # manually or log file won't be written to until the
-        # write buffer is full.
-        filehandle.flush()
+        _LOG_FILE_FLUSH_INTERVAL = settings.LOG_FILE_FLUSH_INTERVAL
+        _LOG_FILE_BUFFER_SIZE = settings.LOG_FILE_BUFFER_SIZE
 
-    def errback(failure):
-        """Catching errors to normal log"""
-        log_trace()
+    line = "\n%s [-] %s" % (timeformat(), msg.strip())
+    if threadable.ioThread is None or threadable.isInIOThread():
+        # reactor not yet started, or we are in the main thread
+        _buffer_log_line(filename, line)
+    else:
+        from twisted.internet import reactor
 
-    # save to server/logs/ directory
-    filehandle = _open_log_file(filename)
-    if filehandle:
-        deferToThread(callback, filehandle, msg).addErrback(errback)
+        reactor.callFromThread(_buffer_log_line, filename, line)
+
+
+def flush_log_files(filename=None):
+    """
+    Write lines buffered by `log_file` to disk right away. Unlike the normal
+    batched writes, this blocks until the lines are written. Any batch already
+    handed to a thread is written first (or waited for, if the thread is
+    writing it), so lines stay in order. It's called on server shutdown and
+    before a log file is read or rotated.
+
+    Args:
+        filename (str, optional): Only flush this log file (within the
+            log-dir). If not given, flush all log files.
+
+    """
+    global _LOG_FILE_FLUSH_CALL
+
+    filenames = list(_LOG_FILE_BUFFERS) if filename is None else [filename]
+    with _LOG_FILE_LOCK:
+        _write_log_batch()
+        for filename in filenames:
+            data = _pop_log_buffer(filename)
+            if data:
+                filehandle = _open_log_file(filename)
+                if filehandle:
+                    _write_log_data(filehandle, data)
+
+    if not _LOG_FILE_BUFFERS and _LOG_FILE_FLUSH_CALL:
+        if _LOG_FILE_FLUSH_CALL.active():
+            _LOG_FILE_FLUSH_CALL.cancel()
+        _LOG_FILE_FLUSH_CALL = None
 
 
 def log_file_exists(filename="game.log"):
@@ -548,10 +722,12 @@ def rotate_log_file(filename="game.log", num_lines_to_append=None):
             Set to 0 to include no lines.
 
     """
-    if log_file_exists(filename):
-        file_handle = _open_log_file(filename)
-        if file_handle:
-            file_handle.rotate(num_lines_to_append=num_lines_to_append)
+    with _LOG_FILE_LOCK:
+        flush_log_files(filename)
+        if log_file_exists(filename):
+            file_handle = _open_log_file(filename)
+            if file_handle:
+                file_handle.rotate(num_lines_to_append=num_lines_to_append)
 
 
 def delete_log_file(filename):
@@ -561,15 +737,17 @@ def delete_log_file(filename):
     Args:
        filename(str): The name of the log file, located in settings.LOG_DIR
     """
-    if log_file_exists(filename):
-        global _LOGDIR
-        if not _LOGDIR:
-            from django.conf import settings
+    with _LOG_FILE_LOCK:
+        _pop_log_buffer(filename)
+        if log_file_exists(filename):
+            global _LOGDIR
+            if not _LOGDIR:
+                from django.conf import settings
 
-            _LOGDIR = settings.LOG_DIR
+                _LOGDIR = settings.LOG_DIR
 
-        filename = os.path.join(_LOGDIR, filename)
-        os.remove(filename)
+            filename = os.path.join(_LOGDIR, filename)
+            os.remove(filename)
 
 
 def tail_log_file(filename, offset, nlines, callback=None):
@@ -599,17 +777,19 @@ def tail_log_file(filename, offset, nlines, callback=None):
         lines_found = []
         buffer_size = 4098
         block_count = -1
-        while len(lines_found) < (offset + nlines):
-            try:
-                # scan backwards in file, starting from the end
-                filehandle.seek(block_count * buffer_size, os.SEEK_END)
-            except IOError:
-                # file too small for this seek, take what we've got
-                filehandle.seek(0)
+        with _LOG_FILE_LOCK:
+            # the handle is shared with the writes
+            while len(lines_found) < (offset + nlines):
+                try:
+                    # scan backwards in file, starting from the end
+                    filehandle.seek(block_count * buffer_size, os.SEEK_END)
+                except IOError:
+                    # file too small for this seek, take what we've got
+                    filehandle.seek(0)
+                    lines_found = filehandle.readlines()
+                    break
                 lines_found = filehandle.readlines()
-                break
-            lines_found = filehandle.readlines()
-            block_count -= 1
+                block_count -= 1
         # return the right number of lines
         lines_found = lines_found[-nlines - offset : -offset if offset else None]
         if callback:
@@ -622,6 +802,7 @@ def tail_log_file(filename, offset, nlines, callback=None):
         """Catching errors to normal log"""
         log_trace()
 
+    flush_log_files(filename)
     filehandle = _open_log_file(filename)
     if filehandle:
         if callback:
@@ -102,6 +102,8 @@ DEFAULT_SETTING_RESETS = dict(
         "evennia.game_template.server.conf.prototypefuncs",
     ],
     BASE_GUEST_TYPECLASS="evennia.accounts.accounts.DefaultGuest",
+    # save ticker/task handler changes right away, not in a delayed call
+    HANDLER_SAVE_DELAY=0,
     # a special setting boolean TEST_ENVIRONMENT is set by the test runner
     # while the test suite is running.
     DEFAULT_HOME="#1",
@@ -258,9 +260,11 @@ class EvenniaTestMixin:
             evennia.SESSION_HANDLER.disconnect,
             settings.DEFAULT_HOME,
             settings.PROTOTYPE_MODULES,
+            evennia.SESSION_HANDLER.data_out_multicast,
         )
         evennia.SESSION_HANDLER.data_out = Mock()
         evennia.SESSION_HANDLER.disconnect = Mock()
+        evennia.SESSION_HANDLER.data_out_multicast = Mock()
 
         self.create_accounts()
         self.create_rooms()
@@ -277,6 +281,7 @@ class EvenniaTestMixin:
             evennia.SESSION_HANDLER.disconnect = self.backups[1]
             settings.DEFAULT_HOME = self.backups[2]
             settings.PROTOTYPE_MODULES = self.backups[3]
+            evennia.SESSION_HANDLER.data_out_multicast = self.backups[4]
         except AttributeError as err:
             raise AttributeError(
                 f"{err}: Teardown error. If you overrode the `setUp()` method "
@@ -8,6 +8,7 @@ Test of the ANSI parsing and ANSIStrings.
 
 from django.test import TestCase
 
+from evennia.utils import ansi
 from evennia.utils.ansi import ANSIString as AN
 
 
@@ -52,3 +53,80 @@ class TestANSIString(TestCase):
         self.assertEqual(split2, split3, "Split 2 and 3 differ")
         self.assertEqual(split1, split2, "Split 1 and 2 differ")
         self.assertEqual(split1, split3, "Split 1 and 3 differ")
+
+    def test_lazy_indexes(self):
+        """Index tables are only calculated when needed, and survive concatenation."""
+        combined = self.example_ansi + AN("|g!")
+        self.assertIsNone(combined._lazy_code_indexes)
+        self.assertEqual(combined.raw(), self.example_output + "\x1b[1m\x1b[32m!")
+        self.assertEqual(combined._char_indexes[:2], [9, 10])
+        self.assertEqual(len(combined._char_indexes), 18)
+        # once known on both sides, they are carried over rather than recalculated
+        other = AN("?")
+        self.assertEqual(other._char_indexes, [0])
+        self.assertEqual((combined + other)._lazy_char_indexes[-2:], [48, 49])
+
+    def test_slicing(self):
+        self.assertEqual(self.example_ansi[0].raw(), "\x1b[1m\x1b[31me")
+        self.assertEqual(self.example_ansi[-1].raw(), "\x1b[1m\x1b[31m\x1b[1m\x1b[36mo\x1b[0m")
+        self.assertEqual(self.example_ansi[7:10].raw(), "\x1b[1m\x1b[31mc \x1b[1m\x1b[36mb")
+        self.assertEqual(self.example_ansi[9:].clean(), "boogaloo")
+        self.assertEqual(
+            self.example_ansi[9:].raw(), "\x1b[1m\x1b[31m\x1b[1m\x1b[36mboogaloo\x1b[0m"
+        )
+        self.assertEqual(self.example_ansi[::2].clean(), self.example_str[::2])
+
+
+class TestANSIParser(TestCase):
+    """
+    Tests the tokenizing and rendering of ANSI markup.
+
+    """
+
+    def test_tokenize(self):
+        tokens = ansi.ANSI_PARSER.tokenize("|rRed|n, |500orange||r, |#ff0000hex |[=agrey|[r!")
+        self.assertEqual(
+            tokens,
+            [
+                ("ansi", "|r"),
+                "Red",
+                ("ansi", "|n"),
+                ", ",
+                ("fg", "|500"),
+                "orange",
+                "|",
+                "r, ",
+                ("hex", "|#ff0000"),
+                "hex ",
+                ("gbg", "|[=a"),
+                "grey",
+                ("bg", "|[500"),
+                "!",
+            ],
+        )
+
+    def test_render_targets(self):
+        tokens = ansi.ANSI_PARSER.tokenize("|500A|#00ff00B")
+        self.assertEqual(
+            ansi.ANSI_PARSER.render(tokens, xterm256=True, truecolor=True),
+            "\x1b[38;5;196mA\x1b[38;2;0;255;0mB",
+        )
+        self.assertEqual(
+            ansi.ANSI_PARSER.render(tokens, xterm256=True), "\x1b[38;5;196mA\x1b[38;5;46mB"
+        )
+        self.assertEqual(
+            ansi.ANSI_PARSER.render(tokens),
+            ansi.ANSI_HILITE + ansi.ANSI_RED + "A" + ansi.ANSI_HILITE + ansi.ANSI_GREEN + "B",
+        )
+
+    def test_parse_ansi(self):
+        string = "|rRed|n |lclook|ltLook|le"
+        self.assertEqual(
+            ansi.parse_ansi(string),
+            ansi.ANSI_HILITE + ansi.ANSI_RED + "Red" + ansi.ANSI_NORMAL + " Look",
+        )
+        # options are cached separately
+        self.assertEqual(ansi.parse_ansi(string, strip_ansi=True), "Red Look")
+        self.assertEqual(
+            ansi.parse_ansi(string, strip_ansi=True, mxp=True), "Red |lclook|ltLook|le"
+        )
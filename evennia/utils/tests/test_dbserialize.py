@@ -3,6 +3,7 @@ Tests for dbserialize module
 """
 
 from collections import defaultdict, deque
+from unittest.mock import MagicMock, patch
 
 from django.test import TestCase
 from parameterized import parameterized
@@ -128,6 +129,86 @@ class TestDbSerialize(TestCase):
         self.obj.db.test.append(2)
         self.assertEqual(list(self.obj.db.test), [2])
 
+    def test_batch_saves(self):
+        self.obj.db.test = [1]
+        attr = self.obj.attributes.get("test", return_obj=True)
+        with self.obj.attributes.batch():
+            self.obj.db.test.append(2)
+            with dbserialize.batch_saves():
+                self.obj.db.test.append({"a": [3]})
+                self.obj.db.test[2]["a"].append(4)
+            # inner batch does not save
+            self.assertEqual(attr.db_value, [1])
+            self.assertEqual(self.obj.db.test, [1, 2, {"a": [3, 4]}])
+        self.assertEqual(attr.db_value, [1, 2, {"a": [3, 4]}])
+
+        # saved also on errors, like without batching
+        with self.assertRaises(KeyError):
+            with self.obj.attributes.batch():
+                self.obj.db.test.pop(1)
+                self.obj.db.test[1]["b"]
+        self.assertEqual(attr.db_value, [1, {"a": [3, 4]}])
+
+        # a new value replaces the batched one
+        with self.obj.attributes.batch():
+            self.obj.db.test.append(5)
+            self.obj.db.test = "new"
+        self.assertEqual(attr.db_value, "new")
+
+    @patch("evennia.utils.dbserialize._DEFERRED_SAVE", True)
+    @patch("twisted.python.threadable.isInIOThread", MagicMock(return_value=True))
+    def test_deferred_save(self):
+        from twisted.internet import reactor
+
+        self.obj.db.test = {"a": 1}
+        attr = self.obj.attributes.get("test", return_obj=True)
+        with (
+            patch.object(reactor, "running", True, create=True),
+            patch.object(reactor, "callLater", MagicMock()) as mock_calllater,
+        ):
+            self.obj.db.test["b"] = 2
+            self.obj.db.test["c"] = 3
+            mock_calllater.assert_called_once_with(0, dbserialize.flush_saves)
+            self.assertEqual(attr.db_value, {"a": 1})
+            self.assertEqual(self.obj.db.test, {"a": 1, "b": 2, "c": 3})
+            dbserialize.flush_saves()
+        self.assertEqual(attr.db_value, {"a": 1, "b": 2, "c": 3})
+
+    @patch("evennia.utils.dbserialize._DEFERRED_SAVE", True)
+    @patch("twisted.python.threadable.isInIOThread", MagicMock(return_value=True))
+    @patch("evennia.utils.dbserialize.logger.log_trace")
+    def test_flush_saves_errors(self, mock_log_trace):
+        from twisted.internet import reactor
+
+        self.obj.db.test = [1]
+        with (
+            patch.object(reactor, "running", True, create=True),
+            patch.object(reactor, "callLater", MagicMock()),
+            patch("evennia.typeclasses.attributes.to_pickle", side_effect=ValueError),
+        ):
+            self.obj.db.test.append(2)
+            with self.assertRaises(ValueError):
+                dbserialize.flush_saves()
+            self.obj.db.test.append(3)
+            # as on server shutdown, the error is only logged
+            dbserialize.flush_saves(raise_errors=False)
+        self.assertEqual(mock_log_trace.call_count, 2)
+
+    def test_has_packed_references(self):
+        self.assertFalse(dbserialize.has_packed_references(dbserialize.to_pickle(1)))
+        self.assertFalse(
+            dbserialize.has_packed_references(dbserialize.to_pickle({"a": [1, (2, "b")]}))
+        )
+        self.assertTrue(dbserialize.has_packed_references(dbserialize.to_pickle(self.obj)))
+        self.assertTrue(
+            dbserialize.has_packed_references(dbserialize.to_pickle({"a": [1, (2, self.obj)]}))
+        )
+        self.assertTrue(dbserialize.has_packed_references(dbserialize.to_pickle({self.obj: 1})))
+        self.assertFalse(
+            dbserialize.has_packed_sessions(dbserialize.to_pickle({"a": [1, (2, self.obj)]}))
+        )
+        self.assertTrue(dbserialize.has_packed_sessions([1, ("__packed_session__", 1, 1234.0)]))
+
 
 class _InvalidContainer:
     """Container not saveable in Attribute (if obj is dbobj, it 'hides' it)"""
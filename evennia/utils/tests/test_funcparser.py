@@ -392,6 +392,46 @@ class TestFuncParser(TestCase):
         ret = parser.parse("This is a $foo(foo=moo) string", foo="bar")
         self.assertEqual("This is a _test(test=foo, foo=bar) string", ret)
 
+    def test_compile(self):
+        """
+        Test compiling a string to a reusable template.
+
+        """
+        template = self.parser.compile("Test $foo(a, b) and $repl($repl(c)) $$escaped $bar(")
+        self.assertEqual(template[0], "Test ")
+        self.assertEqual(template[1].get(), ("foo", ["a", "b"], {}))
+        self.assertEqual(template[2], " and ")
+        self.assertEqual(template[3], funcparser._NestedFuncDef("$repl($repl(c))"))
+        self.assertEqual(template[4], " $escaped ")
+        self.assertEqual(template[5], funcparser._NestedFuncDef("$bar("))
+
+        self.assertEqual(self.parser.render(template), "Test _test(a, b) and rrcrr $escaped $bar(")
+        self.assertEqual(self.parser.render(template, strip=True), "Test  and  $escaped $bar(")
+        # the template is cached and reused
+        self.assertIs(
+            template, self.parser.compile("Test $foo(a, b) and $repl($repl(c)) $$escaped $bar(")
+        )
+
+    def test_compile_unbalanced(self):
+        """
+        Unbalanced brackets leaking between funcdefs can't be split into a template.
+
+        """
+        self.assertIsNone(self.parser.compile("$foo(]) $foo([a, b])"))
+        self.assertEqual(self.parser.parse("$foo(]) $foo([a, b])"), "_test(]) _test([a, b])")
+
+    def test_parse_cached_template(self):
+        """
+        Parsing the same string again re-runs the callables with the new kwargs.
+
+        """
+        string = "This is a $foo(foo=moo) string"
+        self.assertEqual(self.parser.parse(string, foo="bar"), "This is a _test(foo=bar) string")
+        self.assertEqual(self.parser.parse(string), "This is a _test(foo=moo) string")
+
+        with patch("evennia.utils.funcparser._TEMPLATE_CACHE_SIZE", 0):
+            self.assertEqual(self.parser.parse(string), "This is a _test(foo=moo) string")
+
 
 class _DummyObj:
     def __init__(self, name):
@@ -0,0 +1,195 @@
+"""
+Tests for the buffered file logger.
+
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from unittest.mock import patch
+
+from django.test import TestCase
+from twisted.internet import defer
+
+from evennia.utils import logger
+
+
+def _write_now(func, *args, **kwargs):
+    """Run a deferToThread-call right away"""
+    return defer.succeed(func(*args, **kwargs))
+
+
+@patch("evennia.utils.logger._LOG_FILE_FLUSH_INTERVAL", 0.5)
+@patch("evennia.utils.logger._LOG_FILE_BUFFER_SIZE", 100000)
+@patch("evennia.utils.logger.deferToThread", _write_now)
+@patch("evennia.utils.logger._LOG_ROTATE_SIZE", 1000)
+class TestLogFile(TestCase):
+    def setUp(self):
+        self.logdir = tempfile.mkdtemp()
+        self.logdir_patch = patch("evennia.utils.logger._LOGDIR", self.logdir)
+        self.logdir_patch.start()
+        self.buffers_patch = patch.dict(logger._LOG_FILE_BUFFERS, clear=True)
+        self.buffers_patch.start()
+        self.lengths_patch = patch.dict(logger._LOG_FILE_BUFFER_LENGTHS, clear=True)
+        self.lengths_patch.start()
+        self.running_patch = patch("twisted.internet.reactor.running", True, create=True)
+        self.running_patch.start()
+        self.reactor_patch = patch("twisted.internet.reactor.callLater")
+        self.mock_call_later = self.reactor_patch.start()
+
+    def tearDown(self):
+        logger._LOG_FILE_FLUSH_CALL = None
+        logger._LOG_FILE_FLUSH_RUNNING = False
+        del logger._LOG_FILE_BATCH[:]
+        for filename in list(logger._LOG_FILE_HANDLES):
+            if filename.startswith(self.logdir):
+                logger._LOG_FILE_HANDLES.pop(filename).close()
+        self.reactor_patch.stop()
+        self.running_patch.stop()
+        self.lengths_patch.stop()
+        self.buffers_patch.stop()
+        self.logdir_patch.stop()
+        shutil.rmtree(self.logdir)
+
+    def _read(self, filename):
+        with open(os.path.join(self.logdir, filename)) as fil:
+            return fil.read()
+
+    def test_buffered(self):
+        logger.log_file("Line 1", filename="test.log")
+        logger.log_file("Line 2", filename="test.log")
+        # one timer for both lines, nothing written yet
+        self.mock_call_later.assert_called_once()
+        self.assertFalse(logger.log_file_exists("test.log"))
+
+        logger.flush_log_files()
+        text = self._read("test.log")
+        self.assertIn("[-] Line 1\n", text)
+        self.assertTrue(text.endswith("[-] Line 2"))
+        self.assertFalse(logger._LOG_FILE_BUFFERS)
+
+    def test_buffer_size(self):
+        with patch("evennia.utils.logger._LOG_FILE_BUFFER_SIZE", 1000):
+            logger.log_file("a" * 500, filename="test.log")
+            self.assertFalse(logger.log_file_exists("test.log"))
+            # going over the buffer size writes all lines in one batch
+            logger.log_file("b" * 500, filename="test.log")
+        self.assertIn("b" * 500, self._read("test.log"))
+        self.assertFalse(logger._LOG_FILE_BUFFERS)
+
+    def test_tail_flushes(self):
+        for num in range(5):
+            logger.log_file(f"Line {num}", filename="test.log")
+        lines = logger.tail_log_file("test.log", 0, 2)
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[-1].endswith("[-] Line 4"))
+
+    def test_rotation(self):
+        for num in range(30):
+            logger.log_file(f"Line {num} " + "x" * 50, filename="test.log")
+        logger.flush_log_files()
+        self.assertFalse(os.path.exists(os.path.join(self.logdir, "test.log.1")))
+        # the file rotates when it is over size on the next write
+        logger.log_file("Line 30", filename="test.log")
+        logger.flush_log_files()
+        self.assertTrue(os.path.exists(os.path.join(self.logdir, "test.log.1")))
+        self.assertIn("[-] Line 30", self._read("test.log"))
+
+    def test_reactor_not_running(self):
+        with (
+            patch("twisted.internet.reactor.running", False),
+            patch("evennia.utils.logger._LOG_FILE_BUFFER_SIZE", 1000),
+        ):
+            logger.log_file("a" * 500, filename="test.log")
+            logger.log_file("b" * 500, filename="test.log")
+        # written right away, without a timer
+        self.mock_call_later.assert_not_called()
+        self.assertIn("b" * 500, self._read("test.log"))
+
+    def test_flush_waits_for_running_write(self):
+        started, release = threading.Event(), threading.Event()
+        write_log_data = logger._write_log_data
+        threads = []
+
+        def _slow_write(filehandle, data):
+            if threading.current_thread() is not threading.main_thread():
+                started.set()
+                release.wait(5)
+            write_log_data(filehandle, data)
+
+        def _in_thread(func, *args):
+            thread = threading.Thread(target=func, args=args)
+            thread.start()
+            threads.append(thread)
+            return defer.Deferred()
+
+        with (
+            patch("evennia.utils.logger.deferToThread", _in_thread),
+            patch("evennia.utils.logger._write_log_data", _slow_write),
+            patch("evennia.utils.logger._LOG_FILE_BUFFER_SIZE", 10),
+        ):
+            logger.log_file("Line 1", filename="test.log")
+            self.assertTrue(started.wait(5))
+            # buffered while the first write is still running
+            logger.log_file("Line 2", filename="test.log")
+            self.assertEqual(len(threads), 1)
+
+            threading.Timer(0.1, release.set).start()
+            logger.flush_log_files()
+            self.assertTrue(release.is_set())
+        threads[0].join()
+        text = self._read("test.log")
+        self.assertLess(text.index("Line 1"), text.index("Line 2"))
+
+    def test_handle_reset_during_write(self):
+        pending = []
+
+        def _later(func, *args):
+            pending.append((func, args))
+            return defer.Deferred()
+
+        logger.log_file("Line 1", filename="test.log")
+        logger.flush_log_files()
+        with (
+            patch("evennia.utils.logger.deferToThread", _later),
+            patch("evennia.utils.logger._LOG_FILE_BUFFER_SIZE", 10),
+        ):
+            logger.log_file("Line 2", filename="test.log")
+        self.assertEqual(len(pending), 1)
+        # the handle is closed and reopened before the thread gets to write
+        path = os.path.join(self.logdir, "test.log")
+        old_handle = logger._LOG_FILE_HANDLES[path]
+        with patch.dict(logger._LOG_FILE_HANDLE_COUNTS, {path: logger._LOG_FILE_HANDLE_RESET}):
+            logger.tail_log_file("test.log", 0, 1)
+        self.assertIsNot(logger._LOG_FILE_HANDLES[path], old_handle)
+
+        func, args = pending[0]
+        func(*args)
+        self.assertIn("[-] Line 2", self._read("test.log"))
+
+    def test_flush_writes_queued_batch(self):
+        pending = []
+
+        def _later(func, *args):
+            pending.append((func, args))
+            return defer.Deferred()
+
+        with (
+            patch("evennia.utils.logger.deferToThread", _later),
+            patch("evennia.utils.logger._LOG_FILE_BUFFER_SIZE", 10),
+        ):
+            logger.log_file("Line 1", filename="test.log")
+            # queued for a thread, but no thread has started on it yet
+            logger.log_file("Line 2", filename="test.log")
+            self.assertEqual(len(pending), 1)
+            self.assertFalse(logger.log_file_exists("test.log"))
+
+            lines = logger.tail_log_file("test.log", 0, 2)
+        self.assertTrue(lines[0].endswith("[-] Line 1\n"))
+        self.assertTrue(lines[1].endswith("[-] Line 2"))
+
+        # the thread finds nothing left to write
+        func, args = pending[0]
+        func(*args)
+        self.assertEqual(self._read("test.log").count("Line 1"), 1)
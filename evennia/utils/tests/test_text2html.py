@@ -1,6 +1,7 @@
 """Tests for text2html """
 
 import unittest
+from collections import OrderedDict
 
 import mock
 from django.test import TestCase
@@ -9,6 +10,12 @@ from evennia.utils import ansi, text2html
 
 
 class TestText2Html(TestCase):
+    def setUp(self):
+        # start each test with an empty conversion cache
+        patcher = mock.patch.object(text2html, "_PARSE_CACHE", OrderedDict())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_format_styles(self):
         parser = text2html.HTML_PARSER
         self.assertEqual("foo", parser.format_styles("foo"))
@@ -163,3 +170,21 @@ class TestText2Html(TestCase):
             "!"
             "</span>",
         )
+
+    def test_parse_html_cache(self):
+        text = "|rRed|n and <b>bold</b>"
+        expected = text2html.HTML_PARSER.parse(text)
+        with mock.patch.object(
+            text2html.HTML_PARSER, "parse", wraps=text2html.HTML_PARSER.parse
+        ) as mock_parse:
+            self.assertEqual(text2html.parse_html(text), expected)
+            self.assertEqual(text2html.parse_html(text), expected)
+            self.assertEqual(mock_parse.call_count, 1)
+            # different options are cached separately
+            self.assertEqual(
+                text2html.parse_html(text, strip_ansi=True), "Red and &lt;b&gt;bold&lt;/b&gt;"
+            )
+            self.assertEqual(mock_parse.call_count, 2)
+
+    def test_parse_html_screenreader(self):
+        self.assertEqual(text2html.parse_html("|r+----|n Hello ==", screenreader=True), " Hello ")
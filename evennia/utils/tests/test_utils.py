@@ -10,7 +10,7 @@ import random
 from datetime import datetime, timedelta
 
 import mock
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from parameterized import parameterized
 from twisted.internet import task
 
@@ -726,6 +726,68 @@ class TestDelay(BaseEvenniaTest):
             self.assertFalse(t.get_id() in _TASK_HANDLER.tasks)
             _TASK_HANDLER.clear()
 
+    @override_settings(HANDLER_SAVE_DELAY=2)
+    def test_save_is_delayed(self):
+        from evennia.server.models import ServerConfig
+
+        t1 = utils.delay(self.timedelay, dummy_func, self.char1.dbref, persistent=True)
+        t2 = utils.delay(self.timedelay, dummy_func, self.char1.dbref, persistent=True)
+        saved = ServerConfig.objects.get_entries("delayed_tasks")
+        self.assertNotIn(str(t1.get_id()), saved)
+        _TASK_HANDLER.clock.advance(2)
+        # one entry per task
+        saved = ServerConfig.objects.get_entries("delayed_tasks")
+        self.assertIn(str(t1.get_id()), saved)
+        self.assertIn(str(t2.get_id()), saved)
+        # removal is also written after the delay
+        t1.remove()
+        _TASK_HANDLER.clock.advance(2)
+        saved = ServerConfig.objects.get_entries("delayed_tasks")
+        self.assertNotIn(str(t1.get_id()), saved)
+        self.assertIn(str(t2.get_id()), saved)
+
+    @override_settings(HANDLER_SAVE_DELAY=2)
+    def test_save_not_delayed_without_reactor(self):
+        from evennia.scripts import taskhandler
+        from evennia.server.models import ServerConfig
+
+        self.assertTrue(_TASK_HANDLER._can_delay_save())
+        with mock.patch.object(_TASK_HANDLER, "clock", taskhandler.reactor):
+            # the reactor is not running (like in evennia shell)
+            self.assertFalse(_TASK_HANDLER._can_delay_save())
+            with mock.patch.object(taskhandler.reactor, "running", True, create=True):
+                with mock.patch.object(taskhandler.threadable, "isInIOThread", return_value=False):
+                    # called from outside the reactor thread
+                    self.assertFalse(_TASK_HANDLER._can_delay_save())
+                with mock.patch.object(taskhandler.threadable, "isInIOThread", return_value=True):
+                    self.assertTrue(_TASK_HANDLER._can_delay_save())
+            _TASK_HANDLER.add(self.timedelay, dummy_func, self.char1.dbref, persistent=True)
+        task_id = max(_TASK_HANDLER.to_save)
+        saved = ServerConfig.objects.get_entries("delayed_tasks")
+        self.assertIn(str(task_id), saved)
+
+    def test_load_old_format(self):
+        from evennia.server.models import ServerConfig
+
+        t = utils.delay(self.timedelay, dummy_func, self.char1.dbref, persistent=True)
+        task_id = t.get_id()
+        ServerConfig.objects.conf("delayed_tasks", {task_id: _TASK_HANDLER.to_save[task_id]})
+        ServerConfig.objects.update_entries("delayed_tasks", {task_id: None})
+        _TASK_HANDLER.clear(False)
+        _TASK_HANDLER.load()
+        self.assertIn(task_id, _TASK_HANDLER.tasks)
+        self.assertIsNone(ServerConfig.objects.conf("delayed_tasks"))
+        self.assertIn(str(task_id), ServerConfig.objects.get_entries("delayed_tasks"))
+
+    def test_task_ids(self):
+        _TASK_HANDLER.clear()
+        tasks = [utils.delay(self.timedelay, dummy_func) for _ in range(3)]
+        self.assertEqual([t.get_id() for t in tasks], [1, 2, 3])
+        # the lowest free id is re-used
+        tasks[1].remove()
+        self.assertEqual(utils.delay(self.timedelay, dummy_func).get_id(), 2)
+        self.assertEqual(utils.delay(self.timedelay, dummy_func).get_id(), 4)
+
     def test_server_restart(self):
         # emulate a server restart
         timedelay = self.timedelay
@@ -821,13 +883,13 @@ class TestAtSearchResult(TestCase):
     class MockObject:
         def __init__(self, key):
             self.key = key
-            self.aliases = ''
+            self.aliases = ""
 
         def get_display_name(self, looker, **kwargs):
             return self.key
-        
+
         def get_extra_info(self, looker, **kwargs):
-            return ''
+            return ""
 
         def __repr__(self):
             return f"MockObject({self.key})"
@@ -846,7 +908,7 @@ class TestAtSearchResult(TestCase):
 
     def test_basic_multimatch(self):
         """multiple matches with the same name should return a message with incrementing indices"""
-        matches = [ self.MockObject("obj1") for _ in range(3) ]
+        matches = [self.MockObject("obj1") for _ in range(3)]
         caller = mock.MagicMock()
         self.assertIsNone(utils.at_search_result(matches, caller, "obj1"))
         multimatch_msg = """\
@@ -858,7 +920,9 @@ More than one match for 'obj1' (please narrow target):
 
     def test_partial_multimatch(self):
         """multiple partial matches with different names should increment index by unique name"""
-        matches = [ self.MockObject("obj1") for _ in range(3) ] + [ self.MockObject("obj2") for _ in range(2) ]
+        matches = [self.MockObject("obj1") for _ in range(3)] + [
+            self.MockObject("obj2") for _ in range(2)
+        ]
         caller = mock.MagicMock()
         self.assertIsNone(utils.at_search_result(matches, caller, "obj"))
         multimatch_msg = """\
@@ -9,8 +9,11 @@ snippet #577349 on http://code.activestate.com.
 """
 
 import re
+from collections import OrderedDict
 from html import escape as html_escape
 
+from django.conf import settings
+
 from .ansi import *
 from .hex_colors import HexColors
 
@@ -21,6 +24,16 @@ XTERM256_BG = "\033[48;5;{}m"
 
 hex_colors = HexColors()
 
+_RE_SCREENREADER_REGEX = re.compile(
+    r"%s" % settings.SCREENREADER_REGEX_STRIP, re.DOTALL + re.MULTILINE
+)
+
+# recently converted texts {(text, strip_ansi, screenreader): html}
+_PARSE_CACHE = OrderedDict()
+_PARSE_CACHE_SIZE = settings.TEXT2HTML_CACHE_SIZE
+# longer texts are converted every time rather than kept in the cache
+_PARSE_CACHE_MAX_TEXT_LENGTH = 10000
+
 
 class TextToHTMLparser(object):
     """
@@ -100,6 +113,20 @@ class TextToHTMLparser(object):
     )
     re_mxplink = re.compile(r"\|lc(.*?)\|lt(.*?)\|le", re.DOTALL)
     re_mxpurl = re.compile(r"\|lu(.*?)\|lt(.*?)\|le", re.DOTALL)
+    re_truecolor_fg = re.compile(hex_colors.TRUECOLOR_FG)
+    re_truecolor_bg = re.compile(hex_colors.TRUECOLOR_BG)
+
+    def __init__(self):
+        # lookup tables for format_styles, to identify each ansi code in one step
+        self._fg_codes = frozenset(self.ansi_color_codes + self.xterm_fg_codes)
+        self._bg_codes = frozenset(self.ansi_bg_codes + self.xterm_bg_codes)
+        self._style_codes = frozenset(self.style_codes)
+        self._color_indices = {}
+        for index, code in enumerate(self.colorlist):
+            self._color_indices.setdefault(code, index)
+        self._bg_indices = {}
+        for index, code in enumerate(self.bglist):
+            self._bg_indices.setdefault(code, index)
 
     def remove_bells(self, text):
         """
@@ -125,6 +152,8 @@ class TextToHTMLparser(object):
             text (str): Processed text.
 
         """
+        if "\010" not in text and "\033[K" not in text:
+            return text
         backspace_or_eol = r"(.\010)|(\033\[K)"
         n = 1
         while n > 0:
@@ -276,29 +305,29 @@ class TextToHTMLparser(object):
                 truecolor_bg = ""
 
             # change color
-            elif substr in self.ansi_color_codes + self.xterm_fg_codes:
+            elif substr in self._fg_codes:
                 # erase ANSI code from output
                 str_list[i] = ""
                 # set new color
                 fg = substr
 
             # change bg color
-            elif substr in self.ansi_bg_codes + self.xterm_bg_codes:
+            elif substr in self._bg_codes:
                 # erase ANSI code from output
                 str_list[i] = ""
                 # set new bg
                 bg = substr
 
-            elif re.match(hex_colors.TRUECOLOR_FG, substr):
+            elif self.re_truecolor_fg.match(substr):
                 str_list[i] = ""
                 truecolor_fg = substr
 
-            elif re.match(hex_colors.TRUECOLOR_BG, substr):
+            elif self.re_truecolor_bg.match(substr):
                 str_list[i] = ""
                 truecolor_bg = substr
 
             # non-color codes
-            elif substr in self.style_codes:
+            elif substr in self._style_codes:
                 # erase ANSI code from output
                 str_list[i] = ""
 
@@ -327,12 +356,11 @@ class TextToHTMLparser(object):
                 if not str_list[i - 1]:
                     # prior entry was cleared, which means style change
                     # get indices for the fg and bg codes
-                    bg_index = self.bglist.index(bg)
-                    try:
-                        color_index = self.colorlist.index(hilight + fg)
-                    except ValueError:
+                    bg_index = self._bg_indices[bg]
+                    color_index = self._color_indices.get(hilight + fg)
+                    if color_index is None:
                         # xterm256 colors don't have the hilight codes
-                        color_index = self.colorlist.index(fg)
+                        color_index = self._color_indices[fg]
 
                     if inverse:
                         if truecolor_fg != "" and truecolor_bg != "":
@@ -430,8 +458,46 @@ HTML_PARSER = TextToHTMLparser()
 #
 
 
-def parse_html(string, strip_ansi=False, parser=HTML_PARSER):
+def parse_html(string, strip_ansi=False, parser=HTML_PARSER, screenreader=False):
     """
     Parses a string, replace ANSI markup with html
+
+    Args:
+        string (str): Text to convert.
+        strip_ansi (bool, optional): Remove all ANSI markup instead of converting it.
+        parser (TextToHTMLparser, optional): The parser to use.
+        screenreader (bool, optional): Strip ANSI as well as decorations matching
+            `settings.SCREENREADER_REGEX_STRIP`, for the benefit of screen readers.
+
+    Returns:
+        str: The converted text.
+
+    Notes:
+        Texts converted with the default parser are cached (`settings.TEXT2HTML_CACHE_SIZE`),
+        so the same text sent to many sessions is only converted once.
+
     """
-    return parser.parse(string, strip_ansi=strip_ansi)
+    cache_key = None
+    if (
+        _PARSE_CACHE_SIZE > 0
+        and parser is HTML_PARSER
+        and type(string) is str
+        and len(string) <= _PARSE_CACHE_MAX_TEXT_LENGTH
+    ):
+        cache_key = (string, bool(strip_ansi), bool(screenreader))
+        html = _PARSE_CACHE.get(cache_key)
+        if html is not None:
+            _PARSE_CACHE.move_to_end(cache_key)
+            return html
+
+    if screenreader:
+        # screenreader mode cleans up output
+        string = parse_ansi(string, strip_ansi=True, xterm256=False, mxp=False)
+        string = _RE_SCREENREADER_REGEX.sub("", string)
+    html = parser.parse(string, strip_ansi=strip_ansi)
+
+    if cache_key:
+        _PARSE_CACHE[cache_key] = html
+        if len(_PARSE_CACHE) > _PARSE_CACHE_SIZE:
+            _PARSE_CACHE.popitem(last=False)
+    return html